@@ -1,30 +1,27 @@
-from dotenv import load_dotenv
 import os
-from neo4j import GraphDatabase
+import sys
 
-load_dotenv()
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from neo4j_connection import close_driver, get_driver
+from neo4j_schema import KG_SIMPLE_SCHEMA, ensure_schema
+from query_cache import bump_write_epoch
+from result_streams import DEFAULT_FETCH_SIZE, stream_records
+from triple_writer import write_triples
 
-AURA_INSTANCENAME = os.environ["AURA_INSTANCENAME"]
-NEO4J_URI = os.environ["NEO4J_URI"]
-NEO4J_USERNAME = os.environ["NEO4J_USERNAME"]
-NEO4J_PASSWORD = os.environ["NEO4J_PASSWORD"]
-AUTH = (NEO4J_USERNAME, NEO4J_PASSWORD)
- 
-driver = GraphDatabase.driver(NEO4J_URI, auth=AUTH) #This initializes a driver that will be used to send queries to the Neo4j database.
+# All functions below share one pooled driver (see neo4j_connection.py), so they can be
+# called any number of times without reconnecting.
 
 def connect_and_query():
     """
     This function connects to a Neo4j database, runs a query to count all the nodes,
-     prints the count, handles any errors that occur, and then closes the database connection."""
+     prints the count and handles any errors that occur. The connection goes back to the shared pool."""
     try:
-        with driver.session() as session:
+        with get_driver().session() as session:
             result = session.run("MATCH (n) RETURN count(n)")
             count = result.single().value()
             print(f"Number of nodes: {count}")
     except Exception as e:
         print(f"Error: {e}")
-    finally:
-        driver.close()
 
 def create_entities(tx):
     """
@@ -77,55 +74,68 @@ def create_relationships(tx):
     )
 
 # Function to connect and run a simple Cypher query
-def query_graph_simple(cypher_query):
+def query_graph_simple(cypher_query, fetch_size=DEFAULT_FETCH_SIZE):
     """
     This function connects to a Neo4j database, runs a provided Cypher query, and prints the value of the name 
-    field from each result. It handles errors gracefully and ensures the database connection is closed afterward."""
-    driver = GraphDatabase.driver(NEO4J_URI, auth=AUTH)
+    field from each result. It handles errors gracefully and uses a pooled connection from the shared driver.
+    Use result_streams.stream_records directly to consume the records instead of printing them."""
     try:
-        with driver.session() as session: #database=NEO4J_DATABASE
-            result = session.run(cypher_query)
-            for record in result:
-                print(record["name"])
+        for record in stream_records(cypher_query, fetch_size=fetch_size):
+            print(record["name"])
     except Exception as e:
         print(f"Error: {e}")
-    finally:
-        driver.close()
 
 # Function to connect and run a Cypher query
-def query_graph(cypher_query):
+def query_graph(cypher_query, fetch_size=DEFAULT_FETCH_SIZE):
     """
     This function connects to a Neo4j database, executes a given Cypher query, and prints the path field from each 
-    result. It includes error handling and ensures the database connection is properly closed after execution."""
-    driver = GraphDatabase.driver(NEO4J_URI, auth=AUTH)
+    result. It includes error handling and uses a pooled connection from the shared driver. Paths are
+    streamed fetch_size records at a time."""
     try:
-        with driver.session() as session: #database=NEO4J_DATABASE
-            result = session.run(cypher_query)
-            for record in result:
-                print(record["path"])
+        for record in stream_records(cypher_query, fetch_size=fetch_size):
+            print(record["path"])
     except Exception as e:
         print(f"Error: {e}")
-    finally:
-        driver.close()
 
 def build_knowledge_graph():
     """
     This function builds a knowledge graph in a Neo4j database. It opens a session, calls two functions to create 
-    entities (nodes) and their relationships, handles any errors that occur, and ensures the database connection is 
-    closed afterward."""
+    entities (nodes) and their relationships and handles any errors that occur."""
     # Open a session with the Neo4j database
 
     try:
+        driver = get_driver()
+        # Constraints first, so the MERGEs below are index seeks
+        ensure_schema(driver, KG_SIMPLE_SCHEMA)
         with driver.session() as session: #database=NEO4J_DATABASE
             # Create entities
             session.execute_write(create_entities)
             # Create relationships
             session.execute_write(create_relationships)
+        # Invalidate cached read queries (see query_cache.py)
+        bump_write_epoch()
+
+    except Exception as e:
+        print(f"Error: {e}")
+
+# The same facts as create_entities/create_relationships, as (subject, label, predicate, object, label) triples
+einstein_triples = [
+    ("Albert Einstein", "Person", "STUDIED", "Physics", "Subject"),
+    ("Albert Einstein", "Person", "WON", "Nobel Prize in Physics", "NobelPrize"),
+    ("Albert Einstein", "Person", "BORN_IN", "Germany", "Country"),
+    ("Albert Einstein", "Person", "DIED_IN", "USA", "Country"),
+]
 
+def build_knowledge_graph_batched(triples=einstein_triples):
+    """
+    This function builds the knowledge graph from triples with the batched triple writer: one UNWIND + MERGE
+    round trip per label and relationship type instead of one tx.run per node and per edge."""
+    try:
+        driver = get_driver()
+        ensure_schema(driver, KG_SIMPLE_SCHEMA)
+        return write_triples(driver, triples)
     except Exception as e:
         print(f"Error: {e}")
-    finally:
-        driver.close()
 
 # Cypher query to find paths related to Albert Einstein
 einstein_query = """
@@ -154,4 +164,5 @@ if __name__ == "__main__":
 
     query_graph_simple(
         simple_query)
-    query_graph(einstein_query)
\ No newline at end of file
+    query_graph(einstein_query)
+    close_driver()
\ No newline at end of file
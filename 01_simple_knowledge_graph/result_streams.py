@@ -0,0 +1,159 @@
+import keyword
+import os
+import re
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from neo4j_connection import get_driver
+
+DEFAULT_FETCH_SIZE = 1000
+DEFAULT_COLUMN_BATCH_SIZE = 10_000
+
+_record_types = {}
+
+
+def field_names(keys):
+    """
+    Turns result keys into attribute names: "n.name" -> "n_name", "count(*)" -> "count".
+    Names that would still be invalid get an "f_" prefix, and repeats a numeric suffix."""
+    names = []
+    for key in keys:
+        name = re.sub(r"\W+", "_", key).strip("_")
+        if not name.isidentifier() or keyword.iskeyword(name):
+            name = f"f_{name}"
+        unique, suffix = name, 2
+        while unique in names:
+            unique, suffix = f"{name}_{suffix}", suffix + 1
+        names.append(unique)
+    return tuple(names)
+
+
+def slots_record(fields, name="Record"):
+    """
+    Returns a lightweight record class with one __slots__ attribute per field. Instances
+    take no per-object __dict__, so millions of them stay cheap. Fields are result keys;
+    they become attributes via field_names, and _keys maps each attribute back to its key
+    (record._keys[i] is the key of record._fields[i]). Classes are cached by fields."""
+    keys = tuple(fields)
+    fields = field_names(keys)
+    key = (name, keys)
+    if key not in _record_types:
+
+        def __init__(self, *values):
+            for field, value in zip(fields, values):
+                setattr(self, field, value)
+
+        def __iter__(self):
+            return (getattr(self, field) for field in fields)
+
+        def __repr__(self):
+            values = ", ".join(f"{field}={getattr(self, field)!r}" for field in fields)
+            return f"{name}({values})"
+
+        _record_types[key] = type(
+            name,
+            (),
+            {
+                "__slots__": fields,
+                "_fields": fields,
+                "_keys": keys,
+                "__init__": __init__,
+                "__iter__": __iter__,
+                "__repr__": __repr__,
+            },
+        )
+    return _record_types[key]
+
+
+def stream_records(cypher_query, parameters=None, fetch_size=DEFAULT_FETCH_SIZE, projection=None, driver=None):
+    """
+    Lazily yields the records of a read query. Records are pulled from the server fetch_size
+    at a time, so memory stays constant however many rows the query returns. projection
+    can be None (neo4j Record), "dict", "tuple" or "slots" (a slots_record per row; keys
+    such as n.name become attributes such as n_name)."""
+    driver = driver or get_driver()
+    with driver.session(fetch_size=fetch_size) as session: #database=NEO4J_DATABASE
+        result = session.run(cypher_query, parameters)
+        if projection is None:
+            yield from result
+        elif projection == "dict":
+            for record in result:
+                yield record.data()
+        elif projection == "tuple":
+            for record in result:
+                yield tuple(record.values())
+        elif projection == "slots":
+            record_type = slots_record(result.keys())
+            for record in result:
+                yield record_type(*record.values())
+        else:
+            raise ValueError(f"Unknown projection: {projection!r}")
+
+
+def _plain(value):
+    """Turns nodes, relationships and paths into plain Python values for columnar output."""
+    if hasattr(value, "nodes") and hasattr(value, "relationships"):
+        return [dict(node) for node in value.nodes]
+    if hasattr(value, "element_id"):
+        return dict(value)
+    return value
+
+
+def _numpy_column(values):
+    """
+    A typed array when the column holds one scalar type (ints and floats may mix), otherwise
+    an object array, so [1, "a"] is not silently turned into strings."""
+    import numpy as np
+
+    types = {type(value) for value in values if value is not None}
+    if types <= {bool, int, float, str} and (len(types) <= 1 or types <= {int, float}):
+        return np.array(values)
+    column = np.empty(len(values), dtype=object)
+    column[:] = [_plain(value) for value in values]
+    return column
+
+
+def _arrow_batch(keys, columns):
+    import pyarrow as pa
+
+    return pa.RecordBatch.from_arrays(
+        [pa.array([_plain(value) for value in column]) for column in columns], names=list(keys)
+    )
+
+
+def stream_columns(
+    cypher_query,
+    parameters=None,
+    batch_size=DEFAULT_COLUMN_BATCH_SIZE,
+    fetch_size=DEFAULT_FETCH_SIZE,
+    format="numpy",
+    driver=None,
+):
+    """
+    Lazily yields the result in columnar batches of up to batch_size rows: a
+    {column: numpy array} dict with format="numpy", or a pyarrow.RecordBatch with
+    format="arrow". NumPy and PyArrow are only imported when they are asked for."""
+    if format not in ("numpy", "arrow"):
+        raise ValueError(f"Unknown format: {format!r}")
+    driver = driver or get_driver()
+    with driver.session(fetch_size=fetch_size) as session: #database=NEO4J_DATABASE
+        result = session.run(cypher_query, parameters)
+        keys = result.keys()
+        columns = [[] for _ in keys]
+        rows = 0
+        for record in result:
+            for column, value in zip(columns, record.values()):
+                column.append(value)
+            rows += 1
+            if rows == batch_size:
+                yield _columnar_batch(keys, columns, format)
+                columns = [[] for _ in keys]
+                rows = 0
+        if rows:
+            yield _columnar_batch(keys, columns, format)
+
+
+def _columnar_batch(keys, columns, format):
+    if format == "arrow":
+        return _arrow_batch(keys, columns)
+    return {key: _numpy_column(column) for key, column in zip(keys, columns)}
@@ -0,0 +1,138 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from neo4j_connection import close_driver, get_driver
+from query_cache import bump_write_epoch
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_PROGRESS_EVERY = 100_000
+
+# Labels and relationship types cannot be query parameters, so they are formatted into the
+# query and must be plain identifiers.
+IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+TRIPLE_FIELDS = ("subject", "subject_label", "predicate", "object", "object_label")
+
+
+def check_identifier(value):
+    if not IDENTIFIER.match(value):
+        raise ValueError(f"Not a valid label or relationship type: {value!r}")
+    return value
+
+
+def merge_query(subject_label, predicate, object_label):
+    """Returns the UNWIND + MERGE statement for one (subject label, predicate, object label) group."""
+    return f"""
+    UNWIND $rows AS row
+    MERGE (s:`{check_identifier(subject_label)}` {{name: row.subject}})
+    MERGE (o:`{check_identifier(object_label)}` {{name: row.object}})
+    MERGE (s)-[:`{check_identifier(predicate)}`]->(o)
+    """
+
+
+class TripleWriter:
+    """
+    Buffers triples per (subject label, predicate, object label) and writes every full buffer
+    with a single UNWIND + MERGE statement in its own transaction. Memory is bounded by
+    batch_size rows per group, whatever the number of triples."""
+
+    def __init__(self, driver, batch_size=DEFAULT_BATCH_SIZE, progress_every=DEFAULT_PROGRESS_EVERY):
+        self.driver = driver
+        self.batch_size = batch_size
+        self.progress_every = progress_every
+        self.groups = {}
+        self.triples = 0
+        self.batches = 0
+        self.start = time.perf_counter()
+
+    def add(self, subject, subject_label, predicate, object, object_label):
+        key = (subject_label, predicate, object_label)
+        rows = self.groups.setdefault(key, [])
+        rows.append({"subject": subject, "object": object})
+        if len(rows) >= self.batch_size:
+            self._flush(key)
+
+    def _flush(self, key):
+        rows = self.groups.pop(key, None)
+        if not rows:
+            return
+        query = merge_query(*key)
+        with self.driver.session() as session: #database=NEO4J_DATABASE
+            session.execute_write(lambda tx: tx.run(query, {"rows": rows}).consume())
+        self.batches += 1
+        before = self.triples
+        self.triples += len(rows)
+        if self.progress_every and before // self.progress_every != self.triples // self.progress_every:
+            print(f"  {self.triples} triples written ({self.rate():.0f} triples/sec)")
+
+    def rate(self):
+        elapsed = time.perf_counter() - self.start
+        return self.triples / elapsed if elapsed else 0.0
+
+    def close(self):
+        """Writes what is left in every group and returns the totals."""
+        for key in list(self.groups):
+            self._flush(key)
+        elapsed = time.perf_counter() - self.start
+        return {
+            "triples": self.triples,
+            "batches": self.batches,
+            "round_trips": self.batches * 2,  # one statement plus the commit per batch
+            "seconds": elapsed,
+            "triples_per_sec": self.rate(),
+        }
+
+
+def write_triples(driver, triples, batch_size=DEFAULT_BATCH_SIZE, progress_every=DEFAULT_PROGRESS_EVERY):
+    """
+    Writes an iterable of (subject, subject_label, predicate, object, object_label) triples,
+    one UNWIND + MERGE per batch of the same label and relationship type. Returns the totals."""
+    writer = TripleWriter(driver, batch_size, progress_every)
+    for triple in triples:
+        writer.add(*triple)
+    stats = writer.close()
+    bump_write_epoch()
+    print(
+        f"Wrote {stats['triples']} triples in {stats['batches']} batches "
+        f"at {stats['triples_per_sec']:.0f} triples/sec"
+    )
+    return stats
+
+
+def read_triples(path):
+    """
+    Streams triples from a TSV file (five tab-separated columns) or a JSONL file (one object
+    with subject, subject_label, predicate, object and object_label per line, or a 5-item list).
+    Blank lines and lines starting with # are skipped."""
+    jsonl = path.endswith((".jsonl", ".ndjson"))
+    with open(path, mode="r", encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            if jsonl:
+                item = json.loads(line)
+                fields = [item[name] for name in TRIPLE_FIELDS] if isinstance(item, dict) else item
+            else:
+                fields = line.split("\t")
+            if len(fields) != len(TRIPLE_FIELDS):
+                raise ValueError(f"{path}:{line_number}: expected {len(TRIPLE_FIELDS)} fields, got {len(fields)}")
+            yield tuple(fields)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write (subject, label, predicate, object, label) triples to Neo4j.")
+    parser.add_argument("path", help="TSV or JSONL triple file")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--progress-every", type=int, default=DEFAULT_PROGRESS_EVERY)
+    args = parser.parse_args()
+
+    try:
+        write_triples(get_driver(), read_triples(args.path), args.batch_size, args.progress_every)
+    finally:
+        close_driver()
@@ -1,17 +1,22 @@
+import argparse
 import csv
-from dotenv import load_dotenv
+import time
 import os
-from neo4j import GraphDatabase
+import sys
 
-# Load environment variables from .env file
-load_dotenv()
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from neo4j_connection import close_driver, get_driver
+from neo4j_schema import HEALTHCARE_SCHEMA, ensure_schema
+from query_cache import bump_write_epoch
 
-# Get environment variables
-AURA_INSTANCENAME = os.environ["AURA_INSTANCENAME"]
-NEO4J_URI = os.environ["NEO4J_URI"]
-NEO4J_USERNAME = os.environ["NEO4J_USERNAME"]
-NEO4J_PASSWORD = os.environ["NEO4J_PASSWORD"]
-AUTH = (NEO4J_USERNAME, NEO4J_PASSWORD)
+CSV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "healthcare.csv")
+DEFAULT_BATCH_SIZE = 1000
+
+# Columns every row needs, and the ones that name the merged nodes
+REQUIRED_COLUMNS = (
+    "Provider", "Bio", "Patient", "Patient_Age", "Patient_Gender", "Patient_Condition", "Specialization", "Location",
+)
+KEY_COLUMNS = ("Provider", "Patient")
 
 
 # Function to connect and run a Cypher query
@@ -106,11 +111,184 @@ HealthcareProvider → Location with LOCATED_AT
     execute_query(driver, create_relationships_query, parameters)
 
 
+# Cypher statements used by the bulk loader. Each one UNWINDs a whole batch, so a
+# batch costs one round trip per statement instead of five per CSV row.
+BULK_PROVIDERS_QUERY = """
+UNWIND $providers AS row
+MERGE (hp:HealthcareProvider {name: row.name})
+SET hp.bio = row.bio
+"""
+
+BULK_PATIENTS_QUERY = """
+UNWIND $patients AS row
+MERGE (p:Patient {name: row.name, age: row.age, gender: row.gender, condition: row.condition})
+"""
+
+BULK_TREATS_QUERY = """
+UNWIND $treats AS row
+MATCH (hp:HealthcareProvider {name: row.provider})
+MATCH (p:Patient {name: row.patient, age: row.age, gender: row.gender, condition: row.condition})
+MERGE (hp)-[:TREATS]->(p)
+"""
+
+BULK_SPECIALIZES_IN_QUERY = """
+UNWIND $specializes_in AS row
+MATCH (hp:HealthcareProvider {name: row.provider})
+MERGE (s:Specialization {name: row.specialization})
+MERGE (hp)-[:SPECIALIZES_IN]->(s)
+"""
+
+BULK_LOCATED_AT_QUERY = """
+UNWIND $located_at AS row
+MATCH (hp:HealthcareProvider {name: row.provider})
+MERGE (l:Location {name: row.location})
+MERGE (hp)-[:LOCATED_AT]->(l)
+"""
+
+
+def iter_batches(reader, batch_size):
+    """Yields lists of at most batch_size rows from reader without reading ahead."""
+    batch = []
+    for row in reader:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def is_complete(row):
+    """
+    False for a short or malformed row: csv.DictReader leaves the columns it lacks as None,
+    and a row without a provider or patient name cannot be merged."""
+    return all(row.get(column) is not None for column in REQUIRED_COLUMNS) and all(
+        row[column].strip() for column in KEY_COLUMNS
+    )
+
+
+def build_batch_parameters(rows):
+    """
+    Turns a list of CSV rows into the parameter lists used by the BULK_* queries. Nodes and
+    relationships that repeat inside the batch are sent once, so the payload shrinks with
+    the number of distinct providers, patients, specializations and locations. Incomplete
+    rows (see is_complete) are skipped."""
+    providers = {}
+    patients = {}
+    treats = {}
+    specializes_in = set()
+    located_at = set()
+
+    for row in rows:
+        if not is_complete(row):
+            continue
+        provider = row["Provider"]
+        patient = (
+            row["Patient"],
+            row["Patient_Age"],
+            row["Patient_Gender"],
+            row["Patient_Condition"],
+        )
+        providers[provider] = row["Bio"]
+        patients[patient] = None
+        treats[(provider,) + patient] = None
+        specializes_in.add((provider, row["Specialization"]))
+        located_at.add((provider, row["Location"]))
+
+    # Every list is sorted so that concurrent writers always lock nodes in the same order.
+    return {
+        "providers": [{"name": name, "bio": bio} for name, bio in sorted(providers.items())],
+        "patients": [
+            {"name": name, "age": age, "gender": gender, "condition": condition}
+            for name, age, gender, condition in sorted(patients)
+        ],
+        "treats": [
+            {"provider": provider, "patient": name, "age": age, "gender": gender, "condition": condition}
+            for provider, name, age, gender, condition in sorted(treats)
+        ],
+        "specializes_in": [
+            {"provider": provider, "specialization": specialization}
+            for provider, specialization in sorted(specializes_in)
+        ],
+        "located_at": [
+            {"provider": provider, "location": location}
+            for provider, location in sorted(located_at)
+        ],
+    }
+
+
+def write_batch(tx, parameters):
+    """
+    Writes one batch inside a single transaction. Nodes are merged before the relationships
+    that MATCH them. Returns the number of statements sent, which together with the commit
+    is the number of round trips for the batch."""
+    statements = [
+        (BULK_PROVIDERS_QUERY, "providers"),
+        (BULK_PATIENTS_QUERY, "patients"),
+        (BULK_TREATS_QUERY, "treats"),
+        (BULK_SPECIALIZES_IN_QUERY, "specializes_in"),
+        (BULK_LOCATED_AT_QUERY, "located_at"),
+    ]
+    sent = 0
+    for query, key in statements:
+        if parameters[key]:
+            tx.run(query, {key: parameters[key]}).consume()
+            sent += 1
+    return sent
+
+
+def bulk_load(driver, csv_path=CSV_PATH, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Reads the CSV file in batches of batch_size rows and writes each batch with a few UNWIND
+    statements in one transaction. Prints rows/sec and round trips per batch and returns the
+    totals so callers can compare runs."""
+    total_rows = 0
+    total_round_trips = 0
+    batches = 0
+    start = time.perf_counter()
+
+    with open(csv_path, mode="r", newline="") as file:
+        reader = csv.DictReader(file)
+        print(f"Bulk loading {csv_path} in batches of {batch_size} rows...")
+
+        with driver.session() as session: #database=NEO4J_DATABASE
+            for rows in iter_batches(reader, batch_size):
+                batch_start = time.perf_counter()
+                parameters = build_batch_parameters(rows)
+                statements = session.execute_write(write_batch, parameters)
+                elapsed = time.perf_counter() - batch_start
+
+                round_trips = statements + 1  # UNWIND statements plus the commit
+                batches += 1
+                total_rows += len(rows)
+                total_round_trips += round_trips
+                print(
+                    f"Batch {batches}: {len(rows)} rows, {round_trips} round trips, "
+                    f"{len(rows) / elapsed if elapsed else 0:.0f} rows/sec"
+                )
+
+    bump_write_epoch()
+    elapsed = time.perf_counter() - start
+    stats = {
+        "rows": total_rows,
+        "batches": batches,
+        "round_trips": total_round_trips,
+        "seconds": elapsed,
+        "rows_per_sec": total_rows / elapsed if elapsed else 0.0,
+    }
+    print(
+        f"Loaded {stats['rows']} rows in {stats['batches']} batches "
+        f"({stats['round_trips']} round trips) at {stats['rows_per_sec']:.0f} rows/sec"
+    )
+    return stats
+
+
 # Main function to read the CSV file and populate the graph
-def main():
-    driver = GraphDatabase.driver(NEO4J_URI, auth=AUTH)
+def main(csv_path=CSV_PATH):
+    driver = get_driver()
+    ensure_schema(driver, HEALTHCARE_SCHEMA)
 
-    with open("healthcare\healthcare.csv", mode="r") as file:
+    with open(csv_path, mode="r") as file:
         reader = csv.DictReader(file)
         print("Reading CSV file...")
 
@@ -132,10 +310,24 @@ def main():
             create_location_node(driver, location)
             create_relationships(driver, provider, patient, specialization, location)
 
-    driver.close()
+    bump_write_epoch()
     print("Graph populated successfully!")
 
 
 # Run the main function
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Populate the healthcare graph from a CSV file.")
+    parser.add_argument("--csv", default=CSV_PATH, help="path to the healthcare CSV file")
+    parser.add_argument("--bulk", action="store_true", help="load in batches with UNWIND statements")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    try:
+        if args.bulk:
+            driver = get_driver()
+            ensure_schema(driver, HEALTHCARE_SCHEMA)
+            bulk_load(driver, args.csv, args.batch_size)
+        else:
+            main(args.csv)
+    finally:
+        close_driver()
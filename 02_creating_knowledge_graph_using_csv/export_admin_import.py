@@ -0,0 +1,189 @@
+import argparse
+import csv
+import hashlib
+import heapq
+import os
+import tempfile
+import time
+
+CSV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "healthcare.csv")
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import")
+DEFAULT_SPILL_ROWS = 1_000_000
+
+# file name, label or relationship type, header
+NODE_FILES = {
+    "providers": ("healthcare_providers.csv", "HealthcareProvider", [":ID(HealthcareProvider)", "name", "bio"]),
+    "patients": ("patients.csv", "Patient", [":ID(Patient)", "name", "age", "gender", "condition"]),
+    "specializations": ("specializations.csv", "Specialization", [":ID(Specialization)", "name"]),
+    "locations": ("locations.csv", "Location", [":ID(Location)", "name"]),
+}
+RELATIONSHIP_FILES = {
+    "treats": ("treats.csv", "TREATS", [":START_ID(HealthcareProvider)", ":END_ID(Patient)"]),
+    "specializes_in": ("specializes_in.csv", "SPECIALIZES_IN", [":START_ID(HealthcareProvider)", ":END_ID(Specialization)"]),
+    "located_at": ("located_at.csv", "LOCATED_AT", [":START_ID(HealthcareProvider)", ":END_ID(Location)"]),
+}
+
+
+def stable_id(*key):
+    """
+    Returns an ID derived only from the node key, so the same provider, patient, specialization
+    or location gets the same ID in every export regardless of row order or file size."""
+    return hashlib.sha1("\x1f".join(key).encode("utf-8")).hexdigest()[:20]
+
+
+class MemoryDeduper:
+    """Writes a row the first time its key is seen. Only the keys are kept in memory."""
+
+    def __init__(self, writer, key_columns):
+        self.writer = writer
+        self.key_columns = key_columns
+        self.seen = set()
+        self.written = 0
+
+    def add(self, row):
+        key = tuple(row[: self.key_columns])
+        if key not in self.seen:
+            self.seen.add(key)
+            self.writer.writerow(row)
+            self.written += 1
+
+    def close(self):
+        self.seen.clear()
+
+
+class SpillingDeduper:
+    """
+    Deduplicates with an external merge sort and writes the same rows, in the same order, as
+    MemoryDeduper. Rows are tagged with their input position, buffered until max_rows, sorted
+    by (key, position) and spilled to temporary run files; close() merges the runs, keeps the
+    first occurrence of every key and sorts those back into input order through a second set
+    of runs. Memory is bounded by max_rows whatever the number of distinct keys."""
+
+    def __init__(self, writer, key_columns, max_rows=DEFAULT_SPILL_ROWS, tmp_dir=None):
+        self.writer = writer
+        self.key_columns = key_columns
+        self.max_rows = max_rows
+        self.tmp_dir = tmp_dir
+        self.buffer = []
+        self.runs = []
+        self.rows = 0
+        self.written = 0
+
+    def add(self, row):
+        self.buffer.append([self.rows, *row])
+        self.rows += 1
+        if len(self.buffer) >= self.max_rows:
+            self.runs.append(self._spill(self.buffer, self._by_key))
+            self.buffer = []
+
+    def _by_key(self, entry):
+        return entry[1 : 1 + self.key_columns], int(entry[0])
+
+    @staticmethod
+    def _by_position(entry):
+        return int(entry[0])
+
+    def _spill(self, entries, order):
+        entries.sort(key=order)
+        run = tempfile.TemporaryFile(mode="w+", newline="", encoding="utf-8", dir=self.tmp_dir)
+        csv.writer(run).writerows(entries)
+        run.seek(0)
+        return run
+
+    def close(self):
+        if self.buffer or not self.runs:
+            self.runs.append(self._spill(self.buffer, self._by_key))
+            self.buffer = []
+        # Within a key the lowest position comes first, so the first entry is the first occurrence
+        firsts, first_runs, previous = [], [], None
+        for entry in heapq.merge(*(csv.reader(run) for run in self.runs), key=self._by_key):
+            key = entry[1 : 1 + self.key_columns]
+            if key != previous:
+                firsts.append(entry)
+                previous = key
+                if len(firsts) >= self.max_rows:
+                    first_runs.append(self._spill(firsts, self._by_position))
+                    firsts = []
+        first_runs.append(self._spill(firsts, self._by_position))
+        for entry in heapq.merge(*(csv.reader(run) for run in first_runs), key=self._by_position):
+            self.writer.writerow(entry[1:])
+            self.written += 1
+        for run in self.runs + first_runs:
+            run.close()
+        self.runs = []
+
+
+def export(csv_path=CSV_PATH, output_dir=OUTPUT_DIR, spill=False, spill_rows=DEFAULT_SPILL_ROWS):
+    """
+    Converts the healthcare CSV into deduplicated node and relationship files for
+    neo4j-admin database import. With spill=True keys are deduplicated through an on-disk
+    sort instead of an in-memory set. Returns the number of rows written per file."""
+    os.makedirs(output_dir, exist_ok=True)
+    files = {}
+    dedupers = {}
+    for name, (file_name, _, header) in {**NODE_FILES, **RELATIONSHIP_FILES}.items():
+        handle = open(os.path.join(output_dir, file_name), mode="w", newline="", encoding="utf-8")
+        writer = csv.writer(handle)
+        writer.writerow(header)
+        key_columns = 1 if name in NODE_FILES else 2
+        if spill:
+            dedupers[name] = SpillingDeduper(writer, key_columns, spill_rows, tmp_dir=output_dir)
+        else:
+            dedupers[name] = MemoryDeduper(writer, key_columns)
+        files[name] = handle
+
+    print(f"Exporting {csv_path} to {output_dir} ({'disk-spilling sort' if spill else 'in-memory key index'})...")
+    start = time.perf_counter()
+    rows = 0
+    try:
+        with open(csv_path, mode="r", newline="") as file:
+            for row in csv.DictReader(file):
+                patient = (row["Patient"], row["Patient_Age"], row["Patient_Gender"], row["Patient_Condition"])
+                provider_id = stable_id(row["Provider"])
+                patient_id = stable_id(*patient)
+                specialization_id = stable_id(row["Specialization"])
+                location_id = stable_id(row["Location"])
+
+                dedupers["providers"].add([provider_id, row["Provider"], row["Bio"]])
+                dedupers["patients"].add([patient_id, *patient])
+                dedupers["specializations"].add([specialization_id, row["Specialization"]])
+                dedupers["locations"].add([location_id, row["Location"]])
+                dedupers["treats"].add([provider_id, patient_id])
+                dedupers["specializes_in"].add([provider_id, specialization_id])
+                dedupers["located_at"].add([provider_id, location_id])
+                rows += 1
+        for deduper in dedupers.values():
+            deduper.close()
+    finally:
+        for handle in files.values():
+            handle.close()
+
+    elapsed = time.perf_counter() - start
+    counts = {name: deduper.written for name, deduper in dedupers.items()}
+    print(f"Read {rows} rows in {elapsed:.2f}s ({rows / elapsed if elapsed else 0:.0f} rows/sec)")
+    for name, count in counts.items():
+        print(f"  {name}: {count}")
+    return counts
+
+
+def import_command(output_dir=OUTPUT_DIR, database="neo4j"):
+    """Returns the neo4j-admin command that loads the exported files into an empty database."""
+    parts = ["neo4j-admin database import full", database, "--overwrite-destination"]
+    for file_name, label, _ in NODE_FILES.values():
+        parts.append(f"--nodes={label}={os.path.join(output_dir, file_name)}")
+    for file_name, rel_type, _ in RELATIONSHIP_FILES.values():
+        parts.append(f"--relationships={rel_type}={os.path.join(output_dir, file_name)}")
+    return " ".join(parts)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the healthcare CSV for neo4j-admin database import.")
+    parser.add_argument("--csv", default=CSV_PATH, help="path to the healthcare CSV file")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--spill", action="store_true", help="deduplicate with an on-disk sort")
+    parser.add_argument("--spill-rows", type=int, default=DEFAULT_SPILL_ROWS, help="rows kept in memory per sort run")
+    args = parser.parse_args()
+
+    export(args.csv, args.output_dir, spill=args.spill, spill_rows=args.spill_rows)
+    print("\nLoad it with:")
+    print(import_command(args.output_dir))
@@ -1,158 +1,152 @@
-from dotenv import load_dotenv
 import os
-from langchain_neo4j import Neo4jGraph #GraphCypherQAChain
-# from langchain_community.graphs import Neo4jGraph
+import sys
 
-load_dotenv()
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from neo4j_connection import get_graph
+from query_batch import run_queries
+from query_cache import CachedGraph
 
-AURA_INSTANCENAME = os.environ["AURA_INSTANCENAME"]
-NEO4J_URI = os.environ["NEO4J_URI"]
-NEO4J_USERNAME = os.environ["NEO4J_USERNAME"]
-NEO4J_PASSWORD = os.environ["NEO4J_PASSWORD"]
-AUTH = (NEO4J_USERNAME, NEO4J_PASSWORD)
+# Neo4jGraph that runs on the shared pooled driver (see neo4j_connection.py). Read results
+# are cached until they expire or an ingest bumps the write epoch (see query_cache.py).
+kg = CachedGraph(get_graph())
 
+# The catalogue queries are independent, so they are all sent at once (see query_batch.py)
+# and printed afterwards in this order.
+catalogue_queries = {}
 
-kg = Neo4jGraph(
-    url=NEO4J_URI,
-    username=NEO4J_USERNAME,
-    password=NEO4J_PASSWORD,
-) # database=NEO4J_DATABASE,
-
-cypher = """
-  MATCH (n) 
+# count the nodes of the graph
+catalogue_queries["numberOfNodes"] = """
+  MATCH (n)
   RETURN count(n) as numberOfNodes
   """
 
-result = kg.query(cypher)
-print(f"There are {result[0]['numberOfNodes']} nodes in this graph.")
-
-
 # Match only the Providers nodes by specifying the node label
-cypher = """
-  MATCH (n:HealthcareProvider) 
+catalogue_queries["numberOfProviders"] = """
+  MATCH (n:HealthcareProvider)
   RETURN count(n) AS numberOfProviders
   """
-res = kg.query(cypher)
-print(f"There are {res[0]['numberOfProviders']} Healthcare Providers in this graph.")
-
 
 # return the names of the Healthcare Providers
-cypher = """
-  MATCH (n:HealthcareProvider) 
+catalogue_queries["providers"] = """
+  MATCH (n:HealthcareProvider)
   RETURN n.name AS ProviderName
   """
-res = kg.query(cypher)
-print("Healthcare Providers:")
-for r in res:
-    print(r["ProviderName"])
 
 # list all patients in the graph
-cypher = """
-  MATCH (n:Patient) 
+catalogue_queries["patients"] = """
+  MATCH (n:Patient)
   RETURN n.name AS PatientName
   LIMIT 10
   """
-res = kg.query(cypher)
-print("Patients:")
-for r in res:
-    print(r["PatientName"])
-
 
 # list all Specializations in the graph
-cypher = """
-  MATCH (n:Specialization) 
+catalogue_queries["specializations"] = """
+  MATCH (n:Specialization)
   RETURN n.name AS SpecializationName
   """
-res = kg.query(cypher)
-print("Specializations:")
-for r in res:
-    print(r["SpecializationName"])
-
 
 # list all Locations in the graph
-cypher = """
-  MATCH (n:Location) 
+catalogue_queries["locations"] = """
+  MATCH (n:Location)
   RETURN n.name AS LocationName
   """
-res = kg.query(cypher)
-
-print("Locations:")
-for r in res:
-    print(r["LocationName"])
-
 
 # list all patients treated by a specific provider
-cypher = """
-  MATCH (hp:HealthcareProvider {name: 'Dr. Smith'})-[:TREATS]->(p:Patient) 
+catalogue_queries["patientsOfDrSmith"] = """
+  MATCH (hp:HealthcareProvider {name: 'Dr. Smith'})-[:TREATS]->(p:Patient)
   RETURN p.name AS PatientName
   """
-res = kg.query(cypher)
-print("Patients treated by Dr. Smith:")
-for r in res:
-    print(r["PatientName"])
 
 # And More...
 # list all Specializations of a specific provider
-cypher = """
-  MATCH (hp:HealthcareProvider {name: 'Dr. Smith'})-[:SPECIALIZES_IN]->(s:Specialization) 
+catalogue_queries["specializationsOfDrSmith"] = """
+  MATCH (hp:HealthcareProvider {name: 'Dr. Smith'})-[:SPECIALIZES_IN]->(s:Specialization)
   RETURN s.name AS SpecializationName
   """
-res = kg.query(cypher)
-print("Specializations of Dr. Smith:")
-for r in res:
-    print(r["SpecializationName"])
 
 # 4. List All Healthcare Providers Located in a Specific Location
-cypher = """
-  MATCH (hp:HealthcareProvider)-[:LOCATED_AT]->(l:Location {name: 'Houston'}) 
+catalogue_queries["providersInHouston"] = """
+  MATCH (hp:HealthcareProvider)-[:LOCATED_AT]->(l:Location {name: 'Houston'})
   RETURN hp.name AS ProviderName
   """
-res = kg.query(cypher)
-print("Healthcare Providers located Houston:")
-for r in res:
-    print(r["ProviderName"])
-
 
 # 5. List All Patients Treated by a Provider Specializing in a Specific Specialization
-cypher = """
-  MATCH (hp:HealthcareProvider)-[:TREATS]->(p:Patient), 
-        (hp)-[:SPECIALIZES_IN]->(s:Specialization {name: 'Cardiology'}) 
+catalogue_queries["cardiologyPatients"] = """
+  MATCH (hp:HealthcareProvider)-[:TREATS]->(p:Patient),
+        (hp)-[:SPECIALIZES_IN]->(s:Specialization {name: 'Cardiology'})
   RETURN p.name AS PatientName
   """
-res = kg.query(cypher)
-print("Patients treated by a Cardiologist:")
-for r in res:
-    print(r["PatientName"])
 
 # 6. List All Healthcare Providers Located in a Specific Location Specializing in a Specific Specialization
-cypher = """
-  MATCH (hp:HealthcareProvider)-[:LOCATED_AT]->(l:Location {name: 'Houston'}), 
-        (hp)-[:SPECIALIZES_IN]->(s:Specialization {name: 'Cardiology'}) 
+catalogue_queries["cardiologistsInHouston"] = """
+  MATCH (hp:HealthcareProvider)-[:LOCATED_AT]->(l:Location {name: 'Houston'}),
+        (hp)-[:SPECIALIZES_IN]->(s:Specialization {name: 'Cardiology'})
   RETURN hp.name AS ProviderName
   """
-res = kg.query(cypher)
-print("\nCardiologists located in Houston:")
-for r in res:
-    print(r["ProviderName"])
 
 # 7. List All Patients Treated by a Provider Specializing in a Specific Specialization Located in a Specific Location
-cypher = """
-  MATCH (hp:HealthcareProvider)-[:TREATS]->(p:Patient), 
-        (hp)-[:SPECIALIZES_IN]->(s:Specialization {name: 'Cardiology'}), 
-        (hp)-[:LOCATED_AT]->(l:Location {name: 'Houston'}) 
+catalogue_queries["cardiologyPatientsInHouston"] = """
+  MATCH (hp:HealthcareProvider)-[:TREATS]->(p:Patient),
+        (hp)-[:SPECIALIZES_IN]->(s:Specialization {name: 'Cardiology'}),
+        (hp)-[:LOCATED_AT]->(l:Location {name: 'Houston'})
   RETURN p.name AS PatientName
   """
-res = kg.query(cypher)
-print("\nCardiology patients treated by providers in Houston:")
-for r in res:
-    print(r["PatientName"])
 
 # list all patients who have Parkinson's Disease
-cypher = """
-  MATCH (p:Patient {condition: 'Migraine'}) 
+catalogue_queries["migrainePatients"] = """
+  MATCH (p:Patient {condition: 'Migraine'})
   RETURN p.name AS PatientName
   """
-res = kg.query(cypher)
+
+results, timings, wall_seconds = run_queries(kg, catalogue_queries)
+
+print(f"There are {results['numberOfNodes'][0]['numberOfNodes']} nodes in this graph.")
+print(f"There are {results['numberOfProviders'][0]['numberOfProviders']} Healthcare Providers in this graph.")
+
+print("Healthcare Providers:")
+for r in results["providers"]:
+    print(r["ProviderName"])
+
+print("Patients:")
+for r in results["patients"]:
+    print(r["PatientName"])
+
+print("Specializations:")
+for r in results["specializations"]:
+    print(r["SpecializationName"])
+
+print("Locations:")
+for r in results["locations"]:
+    print(r["LocationName"])
+
+print("Patients treated by Dr. Smith:")
+for r in results["patientsOfDrSmith"]:
+    print(r["PatientName"])
+
+print("Specializations of Dr. Smith:")
+for r in results["specializationsOfDrSmith"]:
+    print(r["SpecializationName"])
+
+print("Healthcare Providers located Houston:")
+for r in results["providersInHouston"]:
+    print(r["ProviderName"])
+
+print("Patients treated by a Cardiologist:")
+for r in results["cardiologyPatients"]:
+    print(r["PatientName"])
+
+print("\nCardiologists located in Houston:")
+for r in results["cardiologistsInHouston"]:
+    print(r["ProviderName"])
+
+print("\nCardiology patients treated by providers in Houston:")
+for r in results["cardiologyPatientsInHouston"]:
+    print(r["PatientName"])
+
 print("\n \n****Patients with Migrane: ***")
-for r in res:
-    print(r["PatientName"])
\ No newline at end of file
+for r in results["migrainePatients"]:
+    print(r["PatientName"])
+
+print(f"\n{len(catalogue_queries)} queries in {wall_seconds * 1000:.1f} ms "
+      f"(sum of query times {sum(timings.values()) * 1000:.1f} ms, slowest {max(timings.values()) * 1000:.1f} ms)")
+print(f"Query cache: {kg.stats()}")
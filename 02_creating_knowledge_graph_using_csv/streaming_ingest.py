@@ -0,0 +1,252 @@
+import argparse
+import csv
+import queue
+import threading
+import time
+import zlib
+
+from neo4j.exceptions import ServiceUnavailable, SessionExpired, TransientError
+
+from creating_healthcare_KG import (
+    CSV_PATH,
+    DEFAULT_BATCH_SIZE,
+    build_batch_parameters,
+    is_complete,
+    write_batch,
+)
+from neo4j_connection import SETTINGS, close_driver, configure, get_driver
+from neo4j_schema import HEALTHCARE_SCHEMA, ensure_schema
+from query_cache import bump_write_epoch
+
+DEFAULT_WORKERS = 4
+DEFAULT_QUEUE_SIZE = 2
+DEFAULT_MAX_RETRIES = 5
+# How often a blocked put() checks whether the load was stopped
+PUT_POLL_SECONDS = 0.1
+
+RETRYABLE_ERRORS = (TransientError, ServiceUnavailable, SessionExpired)
+
+_DONE = object()
+
+
+def worker_for(provider, workers):
+    """
+    Picks the writer that owns a provider. All rows of one provider go to the same writer,
+    so two writers never MERGE the same HealthcareProvider node at the same time."""
+    return zlib.crc32(provider.encode("utf-8")) % workers
+
+
+class IngestStats:
+    """Counters shared by the reader and the writer threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.rows = 0
+        self.batches = 0
+        self.round_trips = 0
+        self.retries = 0
+        self.failed_batches = 0
+        self.failed_rows = 0
+        self.skipped_rows = 0
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def as_dict(self, seconds):
+        return {
+            "rows": self.rows,
+            "batches": self.batches,
+            "round_trips": self.round_trips,
+            "retries": self.retries,
+            "failed_batches": self.failed_batches,
+            "failed_rows": self.failed_rows,
+            "skipped_rows": self.skipped_rows,
+            "seconds": seconds,
+            "rows_per_sec": self.rows / seconds if seconds else 0.0,
+        }
+
+
+def put(batches, item, stop):
+    """
+    Puts item on a writer's queue, waiting while it is full. Returns False without putting
+    it once stop is set (a writer failed or the load was interrupted)."""
+    while not stop.is_set():
+        try:
+            batches.put(item, timeout=PUT_POLL_SECONDS)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def finish(batches, stop):
+    """Puts _DONE on a writer's queue. After a stop, pending batches are dropped to make room, so this never blocks."""
+    while not put(batches, _DONE, stop):
+        try:
+            batches.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            batches.put_nowait(_DONE)
+            return
+        except queue.Full:
+            pass
+
+
+def read_batches(csv_path, queues, batch_size, stop):
+    """
+    Reader stage. Streams the CSV file, routes every row to its provider's writer and puts
+    full batches on that writer's bounded queue. put() waits while a writer is behind, which
+    is what keeps memory flat: at most (queue size + 2) batches per writer are alive at once.
+    It stops as soon as stop is set, e.g. by a writer that failed."""
+    workers = len(queues)
+    pending = [[] for _ in range(workers)]
+    try:
+        with open(csv_path, mode="r", newline="") as file:
+            for row in csv.DictReader(file):
+                if stop.is_set():
+                    return
+                index = worker_for(row["Provider"] or "", workers)
+                pending[index].append(row)
+                if len(pending[index]) >= batch_size:
+                    if not put(queues[index], pending[index], stop):
+                        return
+                    pending[index] = []
+        for index, rows in enumerate(pending):
+            if rows and not put(queues[index], rows, stop):
+                return
+    finally:
+        for batches in queues:
+            finish(batches, stop)
+
+
+def write_batches(driver, batches, stats, max_retries, stop, errors):
+    """
+    Writer stage. Commits batches from its queue on its own session. A batch that fails with
+    a retryable error is retried with exponential backoff; after max_retries, or on any other
+    error, it is counted as failed and the writer moves on to the next batch. Incomplete rows
+    are skipped and counted. If the writer itself fails, the error goes to errors and stop is
+    set, so the reader does not wait on this writer's queue."""
+    try:
+        _write_batches(driver, batches, stats, max_retries, stop)
+    except BaseException as e:
+        errors.append(e)
+        stop.set()
+
+
+def _write_batches(driver, batches, stats, max_retries, stop):
+    with driver.session() as session: #database=NEO4J_DATABASE
+        while True:
+            rows = batches.get()
+            if rows is _DONE:
+                return
+            if stop.is_set():
+                continue
+            skipped = sum(not is_complete(row) for row in rows)
+            if skipped:
+                stats.add(skipped_rows=skipped)
+                rows = [row for row in rows if is_complete(row)]
+                if not rows:
+                    continue
+            for attempt in range(max_retries + 1):
+                try:
+                    parameters = build_batch_parameters(rows)
+                    statements = session.execute_write(write_batch, parameters)
+                except RETRYABLE_ERRORS as e:
+                    if attempt == max_retries:
+                        print(f"Error: batch of {len(rows)} rows failed after {attempt + 1} attempts: {e}")
+                        stats.add(failed_batches=1, failed_rows=len(rows))
+                        break
+                    stats.add(retries=1)
+                    time.sleep(min(0.1 * 2 ** attempt, 5.0))
+                except Exception as e:
+                    # Keep draining the queue so the reader never blocks on a dead writer.
+                    print(f"Error: batch of {len(rows)} rows failed: {e}")
+                    stats.add(failed_batches=1, failed_rows=len(rows))
+                    break
+                else:
+                    stats.add(rows=len(rows), batches=1, round_trips=statements + 1)
+                    break
+
+
+def streaming_load(
+    driver,
+    csv_path=CSV_PATH,
+    batch_size=DEFAULT_BATCH_SIZE,
+    workers=DEFAULT_WORKERS,
+    queue_size=DEFAULT_QUEUE_SIZE,
+    max_retries=DEFAULT_MAX_RETRIES,
+):
+    """
+    Loads the CSV file with one reader thread and a pool of writer threads connected by
+    bounded queues. Returns the same totals as bulk_load plus retry, failure and skipped-row
+    counts. If a writer thread dies, the load stops and its exception is raised here."""
+    stats = IngestStats()
+    stop = threading.Event()
+    errors = []
+    queues = [queue.Queue(maxsize=queue_size) for _ in range(workers)]
+    writers = [
+        threading.Thread(
+            target=write_batches,
+            args=(driver, batches, stats, max_retries, stop, errors),
+            name=f"writer-{index}",
+            daemon=True,
+        )
+        for index, batches in enumerate(queues)
+    ]
+
+    print(f"Streaming {csv_path} to {workers} writers in batches of {batch_size} rows...")
+    start = time.perf_counter()
+    for writer in writers:
+        writer.start()
+    try:
+        read_batches(csv_path, queues, batch_size, stop)
+    except BaseException:
+        stop.set()
+        raise
+    finally:
+        for writer in writers:
+            writer.join()
+        bump_write_epoch()
+    if errors:
+        raise errors[0]
+
+    result = stats.as_dict(time.perf_counter() - start)
+    print(
+        f"Loaded {result['rows']} rows in {result['batches']} batches "
+        f"({result['round_trips']} round trips, {result['retries']} retries, "
+        f"{result['failed_batches']} failed batches, {result['skipped_rows']} incomplete rows skipped) "
+        f"at {result['rows_per_sec']:.0f} rows/sec"
+    )
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream the healthcare CSV into Neo4j with parallel writers.")
+    parser.add_argument("--csv", default=CSV_PATH, help="path to the healthcare CSV file")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE)
+    parser.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES)
+    args = parser.parse_args()
+
+    # At least one pooled connection per writer, opened before the reader starts
+    configure(
+        max_connection_pool_size=max(SETTINGS["max_connection_pool_size"], args.workers + 1),
+        warm_up_connections=args.workers,
+    )
+    try:
+        driver = get_driver()
+        ensure_schema(driver, HEALTHCARE_SCHEMA)
+        streaming_load(
+            driver,
+            args.csv,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            queue_size=args.queue_size,
+            max_retries=args.max_retries,
+        )
+    finally:
+        close_driver()
@@ -1,29 +1,31 @@
 from dotenv import load_dotenv
 import os
-from langchain_neo4j import Neo4jGraph
+import sys
 from langchain_openai import ChatOpenAI
 
-load_dotenv()
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from embed_providers import embed_providers
+from embedders import get_embedder
+from embedding_cache import CachedEmbedder, QuestionEmbeddingCache
+from filtered_search import filtered_search
+from local_vector_index import LocalVectorIndex
+from neo4j_connection import get_driver, get_graph
 
-AURA_INSTANCENAME = os.environ["AURA_INSTANCENAME"]
-NEO4J_URI = os.environ["NEO4J_URI"]
-NEO4J_USERNAME = os.environ["NEO4J_USERNAME"]
-NEO4J_PASSWORD = os.environ["NEO4J_PASSWORD"]
-AUTH = (NEO4J_USERNAME, NEO4J_PASSWORD)
+load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-OPENAI_ENDPOINT = os.getenv("OPENAI_ENDPOINT")
 
 chat = ChatOpenAI(api_key=OPENAI_API_KEY)
+# Embeds the provider bios and the questions below, so both are in the same vector space.
+# Vectors are cached on disk by content (see embedding_cache.py), so unchanged bios are never re-embedded.
+embedder = CachedEmbedder(get_embedder())
+# Questions are embedded on the client too; repeated questions are answered from memory
+# (and from QUESTION_CACHE_PATH across restarts, when it is set).
+question_cache = QuestionEmbeddingCache(embedder)
 
 # lets you run Cypher queries against Neo4j using LangChain.
-kg = Neo4jGraph(               
-    url=NEO4J_URI,
-    username=NEO4J_USERNAME,
-    password=NEO4J_PASSWORD,
-) 
-#database=NEO4J_DATABASE,
-## Creates a Neo4jGraph object kg, which allows you to query the Neo4j database using LangChain.
+kg = get_graph()
+## Creates a Neo4jGraph object kg on the shared pooled driver (see neo4j_connection.py).
 kg.query(
     """
      CREATE VECTOR INDEX health_providers_embeddings IF NOT EXISTS
@@ -59,32 +61,15 @@ print(res)
 # Runs the Cypher query SHOW VECTOR INDEXES, which lists all vector indexes in the database.
 # Prints the result to confirm the vector index was successfully created.
 
-kg.query(
-     """
-     MATCH (hp:HealthcareProvider)-[:TREATS]->(p:Patient)
-     WHERE hp.bio IS NOT NULL
-     WITH hp, genai.vector.encode(
-         hp.bio,
-         "OpenAI",
-         {
-           token: $openAiApiKey,
-           endpoint: $openAiEndpoint
-         }) AS vector
-     WITH hp, vector
-     WHERE vector IS NOT NULL
-     CALL db.create.setNodeVectorProperty(hp, "comprehensiveEmbedding", vector)
-     """,
-     params={
-         "openAiApiKey": OPENAI_API_KEY,
-         "openAiEndpoint": OPENAI_ENDPOINT,
-     },
- )
+embed_providers(get_driver(), embedder)
 '''
-You're finding all healthcare providers with a non-null bio.
+You're finding all healthcare providers with a non-null bio (each provider once, not once per patient).
 
-Using genai.vector.encode() to call OpenAI’s embedding API and convert each bio into a vector.
+Embedding the bios on the client in large batches (see embed_providers.py) with the OpenAI embedding API,
+or a local stand-in when EMBEDDER=local. Providers whose bio has not changed since the last run are skipped.
 
-Storing the result in the comprehensiveEmbedding property of each node using db.create.setNodeVectorProperty().
+Storing the result in the comprehensiveEmbedding property of each node using one UNWIND +
+db.create.setNodeVectorProperty() per batch.
 
 This means each HealthcareProvider node now holds a semantic vector that represents the meaning of their bio.'''
 
@@ -96,37 +81,30 @@ result = kg.query(
      LIMIT 5
      """
  )
- '''Retrieves the bio, name, and comprehensiveEmbedding for 5 healthcare providers.
+'''Retrieves the bio, name, and comprehensiveEmbedding for 5 healthcare providers.
 
 Useful for debugging to check that embeddings were correctly added.'''
 # # loop through the results
 for record in result:
-     print(f" bio: {record["hp.bio"]}, name: {record["hp.name"]}")
+     print(f" bio: {record['hp.bio']}, name: {record['hp.name']}")
 
 # == Queerying the graph for a healthcare provider
 question = "give me a list of healthcare providers in the area of dermatology"
 
 # # Execute the query
+# The question vector comes from the question cache, so a repeated question costs no embedding call.
+question_embedding = question_cache.embed_query(question)
 result = kg.query(
     """
-    WITH genai.vector.encode(
-        $question,
-        "OpenAI",
-        {
-          token: $openAiApiKey,
-          endpoint: $openAiEndpoint
-        }) AS question_embedding
     CALL db.index.vector.queryNodes(
         'health_providers_embeddings',
         $top_k,
-        question_embedding
+        $question_embedding
         ) YIELD node AS healthcare_provider, score
     RETURN healthcare_provider.name, healthcare_provider.bio, score
     """,
     params={
-        "openAiApiKey": OPENAI_API_KEY,
-        "openAiEndpoint": OPENAI_ENDPOINT,
-        "question": question,
+        "question_embedding": question_embedding,
         "top_k": 3,
     },
 )
@@ -150,4 +128,31 @@ You're asking: “Which healthcare provider bios are most semantically similar t
 
 It's ignoring relationships, and focusing only on the content (bio) + vector similarity.
 
-💡 No actual graph traversal like (a)-[:RELATION]->(b) is involved here.'''
\ No newline at end of file
+💡 No actual graph traversal like (a)-[:RELATION]->(b) is involved here.'''
+
+# == The same search against an in-process copy of the vector index (see local_vector_index.py).
+# The snapshot is refreshed from the graph (only changed providers are fetched), and the question
+# vector is the one computed above.
+local_index = LocalVectorIndex.open(get_driver())
+for record in local_index.search(question_embedding, top_k=3):
+    print(f"Name: {record['healthcare_provider.name']}")
+    print(f"Bio: {record['healthcare_provider.bio']}")
+    print(f"Score: {record['score']}")
+    print("---")
+
+# == Graph-filtered search (see filtered_search.py): only providers that SPECIALIZES_IN Dermatology
+# are ranked, instead of over-fetching a large top_k from the whole index and filtering afterwards.
+result, plan = filtered_search(
+    get_driver(),
+    question_cache.embed_query("dermatology providers"),
+    top_k=3,
+    specialization="Dermatology",
+)
+for record in result:
+    print(f"Name: {record['healthcare_provider.name']}")
+    print(f"Bio: {record['healthcare_provider.bio']}")
+    print(f"Score: {record['score']}")
+    print("---")
+print(f"Filtered search plan: {plan}")
+
+print(f"Question embedding cache: {question_cache.stats()}")
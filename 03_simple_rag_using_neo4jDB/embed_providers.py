@@ -0,0 +1,90 @@
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from embedders import get_embedder
+from embedding_cache import CachedEmbedder
+from embedding_job import DEFAULT_BATCH_SIZE, DEFAULT_MAX_CONCURRENCY, DEFAULT_MAX_RETRIES, run_embedding_job
+from neo4j_connection import close_driver, get_driver
+
+# One row per provider: matching through TREATS would return a provider once per patient.
+# embeddingHash is the content key (model, dimensions, bio) of the stored vector.
+PROVIDERS_QUERY = """
+MATCH (hp:HealthcareProvider)
+WHERE hp.bio IS NOT NULL
+RETURN hp.name AS name, hp.bio AS bio,
+       CASE WHEN hp.comprehensiveEmbedding IS NULL THEN null ELSE hp.embeddingHash END AS embedding_hash
+"""
+
+WRITE_VECTORS_QUERY = """
+UNWIND $rows AS row
+MATCH (hp:HealthcareProvider {name: row.key})
+CALL db.create.setNodeVectorProperty(hp, $property, row.vector)
+SET hp.embeddingHash = row.hash
+"""
+
+
+def fetch_providers(driver, query=PROVIDERS_QUERY):
+    """Streams (name, bio, embedding hash) for every provider with a bio."""
+    with driver.session() as session: #database=NEO4J_DATABASE
+        for record in session.run(query):
+            yield record["name"], record["bio"], record["embedding_hash"]
+
+
+def write_vectors(driver, rows, property="comprehensiveEmbedding"):
+    """Writes [{key (provider name), vector, hash}] rows with one UNWIND + setNodeVectorProperty statement."""
+    with driver.session() as session: #database=NEO4J_DATABASE
+        session.execute_write(
+            lambda tx: tx.run(WRITE_VECTORS_QUERY, {"rows": rows, "property": property}).consume()
+        )
+
+
+def embed_providers(
+    driver,
+    embedder,
+    providers=None,
+    batch_size=DEFAULT_BATCH_SIZE,
+    max_concurrency=DEFAULT_MAX_CONCURRENCY,
+    max_retries=DEFAULT_MAX_RETRIES,
+):
+    """
+    Embeds provider bios on the client in batches of batch_size and writes the vectors back
+    (see embedding_job.py). Providers whose embeddingHash matches their current bio are
+    skipped without embedding or writing anything. providers defaults to every provider with
+    a bio, as (name, bio, embedding hash) tuples. Returns the totals, including embeddings/sec."""
+    providers = fetch_providers(driver) if providers is None else providers
+    stats = run_embedding_job(
+        providers,
+        embedder,
+        lambda rows: write_vectors(driver, rows),
+        batch_size=batch_size,
+        max_concurrency=max_concurrency,
+        max_retries=max_retries,
+    )
+    print(
+        f"Embedded {stats['embedded']} providers in {stats['batches']} batches "
+        f"at {stats['embeddings_per_sec']:.1f} embeddings/sec, skipped {stats['skipped']} unchanged"
+        + (f" (embedding cache: {stats['cache']})" if "cache" in stats else "")
+    )
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Embed HealthcareProvider bios on the client.")
+    parser.add_argument("--embedder", default=None, help="openai or local (default: $EMBEDDER or openai)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY)
+    parser.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES)
+    args = parser.parse_args()
+
+    try:
+        embed_providers(
+            get_driver(),
+            CachedEmbedder(get_embedder(args.embedder)),
+            batch_size=args.batch_size,
+            max_concurrency=args.max_concurrency,
+            max_retries=args.max_retries,
+        )
+    finally:
+        close_driver()
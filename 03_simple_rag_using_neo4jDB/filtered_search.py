@@ -0,0 +1,158 @@
+import argparse
+import math
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from embedders import get_embedder
+from embedding_cache import CachedEmbedder, QuestionEmbeddingCache
+from neo4j_connection import close_driver, get_driver
+
+DEFAULT_MAX_EXACT_CANDIDATES = 5000
+DEFAULT_MIN_SELECTIVITY = 0.05
+DEFAULT_OVERFETCH = 2.0
+
+# Graph filters on a provider, as patterns anchored on hp. The parameter has the filter's name.
+FILTER_PATTERNS = {
+    "location": "(hp)-[:LOCATED_AT]->(:Location {name: $location})",
+    "specialization": "(hp)-[:SPECIALIZES_IN]->(:Specialization {name: $specialization})",
+    "condition": "(hp)-[:TREATS]->(:Patient {condition: $condition})",
+}
+
+COUNT_QUERY = """
+CALL {{
+  MATCH (hp:HealthcareProvider)
+  WHERE hp.comprehensiveEmbedding IS NOT NULL
+  RETURN count(hp) AS total
+}}
+CALL {{
+  {matches}
+  WHERE hp.comprehensiveEmbedding IS NOT NULL
+  RETURN count(DISTINCT hp) AS candidates
+}}
+RETURN total, candidates
+"""
+
+# Exact cosine over the candidate set; vector.similarity.cosine uses the same [0, 1] scale as the index
+PRE_FILTER_QUERY = """
+{matches}
+WHERE hp.comprehensiveEmbedding IS NOT NULL
+WITH DISTINCT hp
+WITH hp, vector.similarity.cosine(hp.comprehensiveEmbedding, $question_embedding) AS score
+ORDER BY score DESC
+LIMIT $top_k
+RETURN hp.name AS `healthcare_provider.name`, hp.bio AS `healthcare_provider.bio`, score
+"""
+
+# Approximate top-k from the vector index, then the graph filters on what it returned
+POST_FILTER_QUERY = """
+CALL db.index.vector.queryNodes('health_providers_embeddings', $k, $question_embedding)
+YIELD node AS hp, score
+WHERE {predicates}
+RETURN hp.name AS `healthcare_provider.name`, hp.bio AS `healthcare_provider.bio`, score
+ORDER BY score DESC
+LIMIT $top_k
+"""
+
+
+def active_filters(filters):
+    return {name: value for name, value in filters.items() if value is not None}
+
+
+def match_clauses(filters):
+    """One MATCH per filter, so the planner can start from the filter nodes and their name indexes."""
+    return "\n".join(["MATCH (hp:HealthcareProvider)"] + [f"MATCH {FILTER_PATTERNS[name]}" for name in filters])
+
+
+def where_predicates(filters):
+    return " AND ".join(f"EXISTS {{ {FILTER_PATTERNS[name]} }}" for name in filters) or "true"
+
+
+def choose_strategy(candidates, total, top_k, max_exact_candidates, min_selectivity, overfetch):
+    """
+    Returns ("pre-filter", None) or ("post-filter", k). Small or very selective candidate sets
+    are ranked exactly; otherwise the vector index is asked for enough neighbours that about
+    overfetch * top_k of them are expected to pass the filters."""
+    selectivity = candidates / total if total else 0.0
+    if candidates <= max_exact_candidates or selectivity < min_selectivity:
+        return "pre-filter", None
+    return "post-filter", min(total, math.ceil(top_k * overfetch / selectivity))
+
+
+def filtered_search(
+    driver,
+    question_embedding,
+    top_k=3,
+    location=None,
+    specialization=None,
+    condition=None,
+    max_exact_candidates=DEFAULT_MAX_EXACT_CANDIDATES,
+    min_selectivity=DEFAULT_MIN_SELECTIVITY,
+    overfetch=DEFAULT_OVERFETCH,
+):
+    """
+    Top-k providers by similarity to question_embedding among those that match the graph
+    filters (Location name, Specialization name, condition of a treated Patient). Returns
+    (rows, plan): rows are shaped like the health_providers_embeddings query in app.py, and
+    plan records the candidate count, selectivity and the strategy that was used. A
+    post-filter search that finds fewer than top_k rows falls back to the exact pre-filter."""
+    filters = active_filters({"location": location, "specialization": specialization, "condition": condition})
+    parameters = {**filters, "question_embedding": list(question_embedding), "top_k": top_k}
+    with driver.session() as session: #database=NEO4J_DATABASE
+        counts = session.run(COUNT_QUERY.format(matches=match_clauses(filters)), filters).single()
+        total, candidates = counts["total"], counts["candidates"]
+        plan = {
+            "filters": filters,
+            "total": total,
+            "candidates": candidates,
+            "selectivity": candidates / total if total else 0.0,
+        }
+        if not candidates:
+            plan["strategy"] = "empty"
+            return [], plan
+
+        strategy, k = choose_strategy(candidates, total, top_k, max_exact_candidates, min_selectivity, overfetch)
+        if strategy == "post-filter":
+            query = POST_FILTER_QUERY.format(predicates=where_predicates(filters))
+            rows = session.run(query, {**parameters, "k": k}).data()
+            plan["k"] = k
+            if len(rows) >= min(top_k, candidates):
+                plan["strategy"] = strategy
+                return rows, plan
+            strategy = "pre-filter (post-filter fallback)"
+
+        rows = session.run(PRE_FILTER_QUERY.format(matches=match_clauses(filters)), parameters).data()
+        plan["strategy"] = strategy
+        return rows, plan
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vector search over providers restricted by graph filters.")
+    parser.add_argument("question")
+    parser.add_argument("--location")
+    parser.add_argument("--specialization")
+    parser.add_argument("--condition", help="condition of a patient the provider treats")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--embedder", default=None, help="openai or local (default: $EMBEDDER or openai)")
+    args = parser.parse_args()
+
+    try:
+        question_cache = QuestionEmbeddingCache(CachedEmbedder(get_embedder(args.embedder)))
+        rows, plan = filtered_search(
+            get_driver(),
+            question_cache.embed_query(args.question),
+            top_k=args.top_k,
+            location=args.location,
+            specialization=args.specialization,
+            condition=args.condition,
+        )
+        for record in rows:
+            print(f"Name: {record['healthcare_provider.name']}")
+            print(f"Bio: {record['healthcare_provider.bio']}")
+            print(f"Score: {record['score']}")
+            print("---")
+        print(f"Plan: {plan}")
+    except Exception as e:
+        print(f"Error: {e}")
+    finally:
+        close_driver()
@@ -0,0 +1,200 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from neo4j_connection import close_driver, get_driver
+
+SNAPSHOT_DIR = os.getenv(
+    "PROVIDER_INDEX_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".cache", "health_providers_embeddings"),
+)
+
+# Cheap listing used to find what changed since the snapshot; vectors are not transferred.
+VERSIONS_QUERY = """
+MATCH (hp:HealthcareProvider)
+WHERE hp.comprehensiveEmbedding IS NOT NULL
+RETURN hp.name AS name, hp.embeddingHash AS embedding_hash
+"""
+
+VECTORS_QUERY = """
+UNWIND $names AS name
+MATCH (hp:HealthcareProvider {name: name})
+WHERE hp.comprehensiveEmbedding IS NOT NULL
+RETURN hp.name AS name, hp.bio AS bio, hp.embeddingHash AS embedding_hash,
+       hp.comprehensiveEmbedding AS vector
+"""
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class LocalVectorIndex:
+    """
+    In-process mirror of the health_providers_embeddings vector index. The comprehensiveEmbedding
+    vectors are kept L2-normalized in one contiguous float32 matrix, so cosine top-k is a single
+    matrix product followed by argpartition. Snapshots are saved as a .npy file that is
+    memory-mapped on load, plus a JSON file with the names, bios and embedding hashes."""
+
+    def __init__(self, names, bios, hashes, matrix):
+        self.names = list(names)
+        self.bios = list(bios)
+        self.hashes = list(hashes)
+        self.matrix = matrix
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def empty(cls, dimensions=1536):
+        return cls([], [], [], np.zeros((0, dimensions), dtype=np.float32))
+
+    @classmethod
+    def load(cls, path=SNAPSHOT_DIR):
+        with open(os.path.join(path, "meta.json"), mode="r", encoding="utf-8") as file:
+            meta = json.load(file)
+        matrix = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        return cls(meta["names"], meta["bios"], meta["hashes"], matrix)
+
+    def save(self, path=SNAPSHOT_DIR):
+        """Writes the snapshot next to the old one and swaps it in, so readers never see half a file."""
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "vectors.tmp.npy"), np.ascontiguousarray(self.matrix, dtype=np.float32))
+        self._swap_in(path)
+
+    def _swap_in(self, path):
+        """Writes meta.tmp.json and replaces the snapshot with the two .tmp files."""
+        with open(os.path.join(path, "meta.tmp.json"), mode="w", encoding="utf-8") as file:
+            json.dump({"names": self.names, "bios": self.bios, "hashes": self.hashes}, file)
+        os.replace(os.path.join(path, "vectors.tmp.npy"), os.path.join(path, "vectors.npy"))
+        os.replace(os.path.join(path, "meta.tmp.json"), os.path.join(path, "meta.json"))
+
+    def _write_matrix(self, path, keep, blocks, chunk_size):
+        """
+        Writes the kept rows of the current matrix, chunk_size rows at a time, followed by the
+        new blocks to path's snapshot and reopens it memory-mapped. Only the new rows are
+        ever held in memory."""
+        os.makedirs(path, exist_ok=True)
+        dimensions = blocks[0].shape[1] if blocks else self.matrix.shape[1]
+        rows = len(keep) + sum(len(block) for block in blocks)
+        tmp_path = os.path.join(path, "vectors.tmp.npy")
+        matrix = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(rows, dimensions))
+        position = 0
+        for offset in range(0, len(keep), chunk_size):
+            chunk = keep[offset : offset + chunk_size]
+            matrix[position : position + len(chunk)] = self.matrix[chunk]
+            position += len(chunk)
+        for block in blocks:
+            matrix[position : position + len(block)] = block
+            position += len(block)
+        matrix.flush()
+        del matrix
+        self._swap_in(path)
+        # The old map stays valid until it is dropped here: os.replace only unlinked its file
+        self.matrix = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+
+    def refresh(self, driver, chunk_size=1000, path=None):
+        """
+        Brings the snapshot up to date with the graph: only providers that are new or whose
+        embeddingHash changed are fetched with their vectors, and providers that lost their
+        embedding are dropped. With path, a changed snapshot is written there and the matrix
+        is reopened from it memory-mapped; without, the matrix is rebuilt in memory.
+        Returns {"added", "updated", "removed", "unchanged"}."""
+        with driver.session() as session: #database=NEO4J_DATABASE
+            current = {record["name"]: record["embedding_hash"] for record in session.run(VERSIONS_QUERY)}
+
+        known = dict(zip(self.names, self.hashes))
+        # Vectors written without a hash (e.g. by genai.vector.encode) are always refetched
+        stale = [name for name, h in current.items() if name not in known or h is None or known[name] != h]
+        stale_names = set(stale)
+        keep = [i for i, name in enumerate(self.names) if name in current and name not in stale_names]
+
+        names = [self.names[i] for i in keep]
+        bios = [self.bios[i] for i in keep]
+        hashes = [self.hashes[i] for i in keep]
+        blocks = []
+        with driver.session() as session: #database=NEO4J_DATABASE
+            for offset in range(0, len(stale), chunk_size):
+                rows = list(session.run(VECTORS_QUERY, {"names": stale[offset : offset + chunk_size]}))
+                if rows:
+                    names += [row["name"] for row in rows]
+                    bios += [row["bio"] for row in rows]
+                    hashes += [row["embedding_hash"] for row in rows]
+                    blocks.append(normalize([row["vector"] for row in rows]))
+
+        stats = {
+            "added": sum(1 for name in stale if name not in known),
+            "updated": sum(1 for name in stale if name in known),
+            "removed": sum(1 for name in known if name not in current),
+            "unchanged": len(keep),
+        }
+        changed = stats["added"] or stats["updated"] or stats["removed"]
+        self.names, self.bios, self.hashes = names, bios, hashes
+        if path is not None and changed:
+            self._write_matrix(path, keep, blocks, chunk_size)
+        elif path is None:
+            kept = [np.asarray(self.matrix[keep], dtype=np.float32)] if keep else []
+            blocks = kept + blocks
+            self.matrix = np.concatenate(blocks) if blocks else np.zeros((0, self.matrix.shape[1]), dtype=np.float32)
+        return stats
+
+    @classmethod
+    def open(cls, driver, path=SNAPSHOT_DIR, refresh=True):
+        """
+        Loads the snapshot in path (or starts empty) and refreshes it from the graph, writing
+        the changes back to path; the matrix stays memory-mapped."""
+        index = cls.load(path) if os.path.exists(os.path.join(path, "meta.json")) else cls.empty()
+        if refresh:
+            stats = index.refresh(driver, path=path)
+            print(f"Local vector index: {len(index)} providers ({stats})")
+        return index
+
+    def search_many(self, query_vectors, top_k=3):
+        """
+        Cosine top-k for a batch of query vectors with one matrix product. Returns one list of
+        rows per query, shaped like the Cypher query's (name, bio, score) rows; scores use
+        the vector index's (1 + cosine) / 2 scale."""
+        if not len(self):
+            return [[] for _ in query_vectors]
+        queries = normalize(np.atleast_2d(query_vectors))
+        similarities = queries @ self.matrix.T
+        k = min(top_k, len(self))
+        top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in zip(similarities, top):
+            ranked = candidates[np.argsort(-row[candidates])]
+            results.append(
+                [
+                    {
+                        "healthcare_provider.name": self.names[i],
+                        "healthcare_provider.bio": self.bios[i],
+                        "score": float((1.0 + row[i]) / 2.0),
+                    }
+                    for i in ranked
+                ]
+            )
+        return results
+
+    def search(self, query_vector, top_k=3):
+        return self.search_many([query_vector], top_k)[0]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh the local snapshot of health_providers_embeddings.")
+    parser.add_argument("--path", default=SNAPSHOT_DIR)
+    args = parser.parse_args()
+
+    try:
+        start = time.perf_counter()
+        LocalVectorIndex.open(get_driver(), args.path)
+        print(f"Refreshed in {time.perf_counter() - start:.2f}s")
+    finally:
+        close_driver()
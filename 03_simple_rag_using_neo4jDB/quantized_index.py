@@ -0,0 +1,131 @@
+import numpy as np
+
+from local_vector_index import normalize
+
+MODES = ("float32", "float16", "int8", "pq")
+CHUNK_ROWS = 16384
+
+
+def kmeans(vectors, clusters, iterations=10, seed=0):
+    """Plain Lloyd's k-means; returns the (clusters, dims) centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=clusters, replace=len(vectors) < clusters)].copy()
+    for _ in range(iterations):
+        distances = (
+            (vectors ** 2).sum(axis=1, keepdims=True) - 2 * vectors @ centroids.T + (centroids ** 2).sum(axis=1)
+        )
+        assignment = distances.argmin(axis=1)
+        for c in range(clusters):
+            members = vectors[assignment == c]
+            if len(members):
+                centroids[c] = members.mean(axis=0)
+    return centroids
+
+
+class QuantizedVectorIndex:
+    """
+    Compact, approximate copy of a LocalVectorIndex. The vectors are kept in memory as
+    float16, as int8 with one float32 scale per vector, or as product-quantization codes
+    (pq_subspaces bytes per vector). A search scores every vector on the compact codes, keeps
+    the best top_k * rerank_factor candidates and reranks them on the full-precision vectors
+    of the wrapped index, which stay in its memory-mapped snapshot. rerank_factor=0 returns
+    the approximate ranking as is."""
+
+    def __init__(self, index, mode="int8", rerank_factor=4, pq_subspaces=96, pq_centroids=256, pq_sample=20000):
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode: {mode!r} (expected one of {MODES})")
+        self.index = index
+        self.mode = mode
+        self.rerank_factor = rerank_factor
+        matrix = index.matrix
+        if mode == "float32":
+            self.codes = np.ascontiguousarray(matrix, dtype=np.float32)
+        elif mode == "float16":
+            self.codes = np.asarray(matrix, dtype=np.float16)
+        elif mode == "int8":
+            self.scales = np.abs(matrix).max(axis=1).astype(np.float32) / 127.0
+            self.scales[self.scales == 0] = 1.0
+            self.codes = np.rint(matrix / self.scales[:, None]).astype(np.int8)
+        else:
+            self._train_pq(np.asarray(matrix, dtype=np.float32), pq_subspaces, pq_centroids, pq_sample)
+
+    def _train_pq(self, matrix, subspaces, centroids, sample):
+        dimensions = matrix.shape[1]
+        if dimensions % subspaces:
+            raise ValueError(f"pq_subspaces must divide the vector dimensions ({dimensions})")
+        if centroids > 256:
+            raise ValueError("pq_centroids must fit in one byte (at most 256)")
+        self.subspace_dims = dimensions // subspaces
+        rng = np.random.default_rng(0)
+        training = matrix[rng.choice(len(matrix), size=min(sample, len(matrix)), replace=False)]
+        self.codebooks = np.empty((subspaces, centroids, self.subspace_dims), dtype=np.float32)
+        self.codes = np.empty((len(matrix), subspaces), dtype=np.uint8)
+        for s in range(subspaces):
+            part = slice(s * self.subspace_dims, (s + 1) * self.subspace_dims)
+            self.codebooks[s] = kmeans(training[:, part], centroids, seed=s)
+            for offset in range(0, len(matrix), CHUNK_ROWS):
+                block = matrix[offset : offset + CHUNK_ROWS, part]
+                distances = -2 * block @ self.codebooks[s].T + (self.codebooks[s] ** 2).sum(axis=1)
+                self.codes[offset : offset + CHUNK_ROWS, s] = distances.argmin(axis=1)
+
+    def __len__(self):
+        return len(self.index)
+
+    def bytes_per_vector(self):
+        size = self.codes.nbytes + (self.scales.nbytes if self.mode == "int8" else 0)
+        return size / max(len(self), 1)
+
+    def approximate_scores(self, queries):
+        """Cosine similarities of (n, dims) normalized queries to every vector, on the compact codes."""
+        scores = np.empty((len(queries), len(self)), dtype=np.float32)
+        if self.mode == "pq":
+            # Asymmetric distance: one (subspaces, centroids) table of partial dot products per query
+            subspaces = self.codes.shape[1]
+            tables = np.einsum(
+                "qsd,scd->qsc", queries.reshape(len(queries), subspaces, self.subspace_dims), self.codebooks
+            )
+            columns = np.arange(subspaces)
+            for offset in range(0, len(self), CHUNK_ROWS):
+                # The looked-up partial products are (rows, subspaces) floats, so they are gathered per chunk
+                block = self.codes[offset : offset + CHUNK_ROWS]
+                for scores_row, table in zip(scores, tables):
+                    scores_row[offset : offset + CHUNK_ROWS] = table[columns, block].sum(axis=1)
+            return scores
+        for offset in range(0, len(self), CHUNK_ROWS):
+            # NumPy has no fast float16/int8 matmul, so each chunk is widened to float32 on the fly
+            block = self.codes[offset : offset + CHUNK_ROWS].astype(np.float32)
+            scores[:, offset : offset + CHUNK_ROWS] = queries @ block.T
+        if self.mode == "int8":
+            scores *= self.scales
+        return scores
+
+    def search_many(self, query_vectors, top_k=3):
+        """Same rows as LocalVectorIndex.search_many, with approximate candidates reranked exactly."""
+        if not len(self):
+            return [[] for _ in query_vectors]
+        queries = normalize(np.atleast_2d(query_vectors))
+        scores = self.approximate_scores(queries)
+        shortlist = min(max(top_k * self.rerank_factor, top_k), len(self))
+        candidates = np.argpartition(-scores, shortlist - 1, axis=1)[:, :shortlist]
+        results = []
+        for query, row, ids in zip(queries, scores, candidates):
+            if self.rerank_factor:
+                ids = np.sort(ids)  # memmap reads in file order
+                similarities = np.asarray(self.index.matrix[ids], dtype=np.float32) @ query
+            else:
+                similarities = row[ids]
+            order = np.argsort(-similarities)[:top_k]
+            results.append(
+                [
+                    {
+                        "healthcare_provider.name": self.index.names[i],
+                        "healthcare_provider.bio": self.index.bios[i],
+                        "score": float((1.0 + similarity) / 2.0),
+                    }
+                    for i, similarity in zip(ids[order], similarities[order])
+                ]
+            )
+        return results
+
+    def search(self, query_vector, top_k=3):
+        return self.search_many([query_vector], top_k)[0]
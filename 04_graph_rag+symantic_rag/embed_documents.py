@@ -0,0 +1,138 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from embedders import get_embedder
+from embedding_cache import CachedEmbedder, content_key_prefix
+from embedding_job import DEFAULT_BATCH_SIZE, DEFAULT_MAX_CONCURRENCY, DEFAULT_MAX_RETRIES, run_embedding_job
+from neo4j_connection import close_driver, get_driver
+
+# Same names Neo4jVector.from_existing_graph uses by default, so the retriever finds them
+VECTOR_INDEX = "vector"
+KEYWORD_INDEX = "keyword"
+
+# embeddingHash is the content key (model, dimensions, embedded text) of the stored vector.
+# The server recomputes it from the current text ($prefix + text hashes to the content key,
+# see embedding_cache.content_key), so only new or changed chunks are sent back.
+DOCUMENTS_QUERY = """
+MATCH (d:Document)
+WHERE d.text IS NOT NULL
+  AND (d.embedding IS NULL OR d.embeddingHash IS NULL
+       OR d.embeddingHash <> apoc.util.sha256([$prefix + d.text]))
+RETURN elementId(d) AS id, d.text AS text, d.embeddingHash AS embedding_hash
+"""
+
+COUNT_DOCUMENTS_QUERY = "MATCH (d:Document) WHERE d.text IS NOT NULL RETURN count(d) AS documents"
+
+WRITE_VECTORS_QUERY = """
+UNWIND $rows AS row
+MATCH (d:Document)
+WHERE elementId(d) = row.key
+CALL db.create.setNodeVectorProperty(d, 'embedding', row.vector)
+SET d.embeddingHash = row.hash
+"""
+
+
+def embedding_text(text):
+    """The string from_existing_graph embeds for text_node_properties=["text"], so vectors stay comparable."""
+    return f"\ntext:{text}"
+
+
+def ensure_indexes(driver, dimensions):
+    """Creates the Document vector index and the keyword (fulltext) index for hybrid search if missing."""
+    with driver.session() as session: #database=NEO4J_DATABASE
+        session.run(
+            f"CREATE VECTOR INDEX {VECTOR_INDEX} IF NOT EXISTS FOR (d:Document) ON (d.embedding) "
+            f"OPTIONS {{indexConfig: {{`vector.dimensions`: {int(dimensions)}, `vector.similarity_function`: 'cosine'}}}}"
+        ).consume()
+        session.run(
+            f"CREATE FULLTEXT INDEX {KEYWORD_INDEX} IF NOT EXISTS FOR (d:Document) ON EACH [d.text]"
+        ).consume()
+
+
+def fetch_documents(driver, embedder, query=DOCUMENTS_QUERY):
+    """
+    Streams (element id, text to embed, embedding hash) for the Document chunks whose stored
+    vector was not made from their current text by embedder. The comparison runs on the
+    server (apoc.util.sha256), so unchanged chunks never leave the database."""
+    prefix = content_key_prefix(embedder.model, embedder.dimensions) + embedding_text("")
+    with driver.session() as session: #database=NEO4J_DATABASE
+        for record in session.run(query, {"prefix": prefix}):
+            yield record["id"], embedding_text(record["text"]), record["embedding_hash"]
+
+
+def count_documents(driver):
+    with driver.session() as session: #database=NEO4J_DATABASE
+        return session.run(COUNT_DOCUMENTS_QUERY).single()["documents"]
+
+
+def write_vectors(driver, rows):
+    with driver.session() as session: #database=NEO4J_DATABASE
+        session.execute_write(lambda tx: tx.run(WRITE_VECTORS_QUERY, {"rows": rows}).consume())
+
+
+def embed_documents(
+    driver,
+    embedder,
+    batch_size=DEFAULT_BATCH_SIZE,
+    max_concurrency=DEFAULT_MAX_CONCURRENCY,
+    max_retries=DEFAULT_MAX_RETRIES,
+):
+    """
+    Indexing job for the Document chunks written by the ingest: embeds only the chunks that
+    have no embedding or whose text changed since it was embedded, in concurrent batches,
+    and writes them back with one UNWIND per batch. Query serving does not need to run it.
+    Returns the totals (embedded, skipped, batches, embeddings/sec)."""
+    ensure_indexes(driver, embedder.dimensions)
+    documents = count_documents(driver)
+    stats = run_embedding_job(
+        fetch_documents(driver, embedder),
+        embedder,
+        lambda rows: write_vectors(driver, rows),
+        batch_size=batch_size,
+        max_concurrency=max_concurrency,
+        max_retries=max_retries,
+    )
+    # Unchanged chunks are filtered out by the server, so they are counted rather than seen
+    stats["skipped"] = max(documents - stats["embedded"], stats["skipped"])
+    print(
+        f"Embedded {stats['embedded']} documents in {stats['batches']} batches "
+        f"at {stats['embeddings_per_sec']:.1f} embeddings/sec, skipped {stats['skipped']} unchanged"
+        + (f" (embedding cache: {stats['cache']})" if "cache" in stats else "")
+    )
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Embed new and changed Document chunks.")
+    parser.add_argument("--embedder", default=None, help="openai or local (default: $EMBEDDER or openai)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY)
+    parser.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES)
+    parser.add_argument(
+        "--interval", type=float, default=None, help="keep running, every INTERVAL seconds (e.g. under a scheduler)"
+    )
+    args = parser.parse_args()
+
+    embedder = CachedEmbedder(get_embedder(args.embedder))
+    try:
+        while True:
+            try:
+                embed_documents(
+                    get_driver(),
+                    embedder,
+                    batch_size=args.batch_size,
+                    max_concurrency=args.max_concurrency,
+                    max_retries=args.max_retries,
+                )
+            except Exception as e:
+                if args.interval is None:
+                    raise
+                print(f"Error: {e}")
+            if args.interval is None:
+                break
+            time.sleep(args.interval)
+    finally:
+        close_driver()
@@ -0,0 +1,218 @@
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from entity_resolution import normalize_id, normalize_tokens
+from query_cache import DEFAULT_EPOCH_CHECK_INTERVAL, read_write_epoch
+
+DEFAULT_MIN_FUZZY_LENGTH = 5
+
+ENTITY_IDS_QUERY = "MATCH (e:__Entity__) WHERE e.id IS NOT NULL RETURN e.id AS id"
+
+# Names made only of these would match almost every question
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "did", "do", "for", "from", "he", "her", "him", "his",
+    "how", "i", "in", "is", "it", "its", "of", "on", "or", "she", "that", "the", "their", "they", "this",
+    "to", "was", "we", "were", "what", "when", "where", "which", "who", "why", "with", "you",
+}
+
+
+def deletions(token):
+    return {token[:i] + token[i + 1 :] for i in range(len(token))}
+
+
+def within_one_edit(a, b):
+    """True when a and b differ by at most one insertion, deletion, substitution or adjacent swap."""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diff = [i for i, (x, y) in enumerate(zip(a, b)) if x != y]
+        if len(diff) == 2 and diff[1] == diff[0] + 1:
+            return a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]]
+        return len(diff) == 1
+    if len(a) > len(b):
+        a, b = b, a
+    i = next((i for i, (x, y) in enumerate(zip(a, b)) if x != y), len(a))
+    return a[i:] == b[i + 1 :]
+
+
+class EntityGazetteer:
+    """
+    Finds the graph's entities in a question without an LLM call. Entity ids are normalized
+    like the entity resolver does (accents, case, punctuation, leading titles) and compiled
+    into a word-level Aho-Corasick automaton, so one pass over the question finds every
+    known name in it; overlapping matches keep the leftmost, longest one. With fuzzy, a
+    question word of at least min_fuzzy_length characters that is not in the vocabulary is
+    corrected to a vocabulary word one edit away ("agustus" -> "augustus"). Entities can be
+    added at any time (add, add_graph_documents); refresh replaces them all with the graph's.
+    The automaton's failure links are rebuilt on the next extract."""
+
+    def __init__(self, ids=(), fuzzy=True, min_fuzzy_length=DEFAULT_MIN_FUZZY_LENGTH):
+        self.fuzzy = fuzzy
+        self.min_fuzzy_length = min_fuzzy_length
+        self._goto = [{}]  # state -> {word: state}
+        self._fail = [0]
+        self._output = [None]  # state -> (words in the name, graph id) for states that end a name
+        self._ids = {}  # normalized name -> graph id
+        self._vocabulary = set()
+        self._deletions = defaultdict(set)  # word with one character deleted -> vocabulary words
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._epoch = None
+        self._epoch_checked_at = float("-inf")
+        self.extractions = 0
+        self.matched = 0
+        self.seconds = 0.0
+        self.add(ids)
+
+    @classmethod
+    def from_graph(cls, kg, **kwargs):
+        """Builds the gazetteer from every __Entity__ id in the graph."""
+        gazetteer = cls(**kwargs)
+        gazetteer.refresh(kg, force=True)
+        return gazetteer
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, ids):
+        """Adds entity ids to the automaton; returns how many names were new."""
+        added = 0
+        with self._lock:
+            for entity_id in ids:
+                words = normalize_id(entity_id).split()
+                if not words or all(word in STOPWORDS for word in words) or (len(words) == 1 and len(words[0]) < 3):
+                    continue
+                name = " ".join(words)
+                if name in self._ids:
+                    continue
+                self._ids[name] = entity_id
+                state = 0
+                for word in words:
+                    next_state = self._goto[state].get(word)
+                    if next_state is None:
+                        next_state = len(self._goto)
+                        self._goto.append({})
+                        self._fail.append(0)
+                        self._output.append(None)
+                        self._goto[state][word] = next_state
+                        self._add_word(word)
+                    state = next_state
+                self._output[state] = (len(words), entity_id)
+                added += 1
+            self._dirty = self._dirty or bool(added)
+        return added
+
+    def replace(self, ids):
+        """Rebuilds the automaton from ids alone, dropping every name not in them; returns the entity count."""
+        fresh = EntityGazetteer(ids, fuzzy=self.fuzzy, min_fuzzy_length=self.min_fuzzy_length)
+        with self._lock:
+            self._goto, self._fail, self._output = fresh._goto, fresh._fail, fresh._output
+            self._ids, self._vocabulary, self._deletions = fresh._ids, fresh._vocabulary, fresh._deletions
+            self._dirty = True
+        return len(fresh)
+
+    def add_graph_documents(self, graph_documents):
+        """Adds the node ids of graph documents as they are written (see ingest_pipeline.py)."""
+        return self.add(node.id for graph_document in graph_documents for node in graph_document.nodes)
+
+    def refresh(self, kg, force=False):
+        """
+        Rebuilds the automaton from every __Entity__ id in the graph, so deleted entities drop
+        out. Checks the write epoch at most every DEFAULT_EPOCH_CHECK_INTERVAL seconds and
+        reloads only when it changed, which ingest runs in any process bump. Returns the entity
+        count after a reload, else None."""
+        now = time.monotonic()
+        if not force and now - self._epoch_checked_at < DEFAULT_EPOCH_CHECK_INTERVAL:
+            return None
+        self._epoch_checked_at = now
+        epoch = read_write_epoch()
+        if not force and epoch == self._epoch:
+            return None
+        self._epoch = epoch
+        return self.replace(row["id"] for row in kg.query(ENTITY_IDS_QUERY))
+
+    def _add_word(self, word):
+        if word in self._vocabulary:
+            return
+        self._vocabulary.add(word)
+        if len(word) >= self.min_fuzzy_length - 1:
+            self._deletions[word].add(word)
+            for deleted in deletions(word):
+                self._deletions[deleted].add(word)
+
+    def _build_failure_links(self):
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+        while queue:
+            state = queue.popleft()
+            for word, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and word not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(word, 0)
+        self._dirty = False
+
+    def _correct(self, word):
+        """The vocabulary word one edit away from word, or word itself."""
+        if not self.fuzzy or word in self._vocabulary or len(word) < self.min_fuzzy_length:
+            return word
+        candidates = set(self._deletions.get(word, ()))
+        for deleted in deletions(word):
+            candidates.update(self._deletions.get(deleted, ()))
+        candidates = sorted(candidate for candidate in candidates if within_one_edit(word, candidate))
+        return candidates[0] if candidates else word
+
+    def _matches(self, words):
+        """(start, end, graph id) of every name ending at every position."""
+        matches = []
+        state = 0
+        for end, word in enumerate(words, 1):
+            while state and word not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(word, 0)
+            match_state = state
+            while match_state:
+                if self._output[match_state] is not None:
+                    length, entity_id = self._output[match_state]
+                    matches.append((end - length, end, entity_id))
+                match_state = self._fail[match_state]
+        return matches
+
+    def extract(self, text):
+        """Returns the graph ids of the entities named in text, in order of appearance."""
+        start = time.perf_counter()
+        with self._lock:
+            if self._dirty:
+                self._build_failure_links()
+            words = [self._correct(word) for word in normalize_tokens(text)]
+            matches = self._matches(words)
+        # Leftmost, then longest; a match inside an earlier one is dropped
+        matches.sort(key=lambda match: (match[0], -(match[1] - match[0])))
+        names, covered = [], 0
+        for begin, end, entity_id in matches:
+            if begin >= covered:
+                names.append(entity_id)
+                covered = end
+        names = list(dict.fromkeys(names))
+        self.extractions += 1
+        self.matched += bool(names)
+        self.seconds += time.perf_counter() - start
+        return names
+
+    def stats(self):
+        return {
+            "entities": len(self._ids),
+            "states": len(self._goto),
+            "extractions": self.extractions,
+            "matched": self.matched,
+            "mean_ms": self.seconds / self.extractions * 1000 if self.extractions else 0.0,
+        }
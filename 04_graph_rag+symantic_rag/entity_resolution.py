@@ -0,0 +1,281 @@
+import re
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+import numpy as np
+
+from langchain_community.graphs.graph_document import GraphDocument, Node, Relationship
+
+DEFAULT_THRESHOLD = 0.9
+DEFAULT_EMBEDDING_THRESHOLD = 0.93
+DEFAULT_MAX_BLOCK_SIZE = 500
+
+# Existing entities with the type add_graph_documents gave them (the label besides __Entity__)
+ENTITIES_QUERY = """
+MATCH (e:__Entity__)
+WHERE e.id IS NOT NULL
+RETURN e.id AS id, head([label IN labels(e) WHERE label <> '__Entity__'] + ['__Entity__']) AS type
+"""
+
+# Honorifics and articles the LLM puts in front of names ("Emperor Augustus", "the Senate")
+TITLES = {
+    "the", "emperor", "empress", "king", "queen", "prince", "princess", "saint", "st", "pope", "general",
+    "consul", "dictator", "senator", "lord", "lady", "sir", "dr", "mr", "mrs", "ms",
+}
+# Regnal numbers ("Constantine II") and other numbers tell apart people with the same name
+ROMAN_NUMERAL = re.compile(r"^m{0,3}(cm|cd|d?c{0,3})(xc|xl|l?x{0,3})(ix|iv|v?i{0,3})$")
+SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"), **dict.fromkeys("cgjkqsxz", "2"), **dict.fromkeys("dt", "3"),
+    "l": "4", **dict.fromkeys("mn", "5"), "r": "6",
+}
+
+
+def normalize_tokens(text):
+    """Words with accents, case and punctuation removed: "Trajan's Column" -> ["trajan", "s", "column"]."""
+    text = unicodedata.normalize("NFKD", str(text))
+    text = "".join(char for char in text if not unicodedata.combining(char)).lower()
+    return re.sub(r"[^\w\s]", " ", text).split()
+
+
+def normalize_id(entity_id):
+    """Accents, case, punctuation and leading titles removed: "Emperor  Augustus." -> "augustus"."""
+    tokens = normalize_tokens(entity_id)
+    while len(tokens) > 1 and tokens[0] in TITLES:
+        tokens = tokens[1:]
+    return " ".join(tokens)
+
+
+@lru_cache(maxsize=65536)
+def numbers(normalized):
+    """Digit tokens and Roman numerals after the first word: "constantine ii" -> {"ii"}."""
+    tokens = normalized.split()
+    return frozenset(
+        token for position, token in enumerate(tokens)
+        if token.isdigit() or (position > 0 and ROMAN_NUMERAL.match(token))
+    )
+
+
+def soundex(token):
+    codes = [SOUNDEX_CODES.get(char, "") for char in token]
+    result, previous = token[0], codes[0]
+    for char, code in zip(token[1:], codes[1:]):
+        if code and code != previous:
+            result += code
+        if char not in "hw":
+            previous = code
+    return (result + "000")[:4]
+
+
+def blocking_keys(normalized):
+    """Phonetic and prefix keys of each token; only entities that share a key are compared."""
+    keys = set()
+    for token in normalized.split():
+        if len(token) >= 3:
+            keys.add(f"s:{soundex(token)}")
+            keys.add(f"p:{token[:4]}")
+    return keys or {f"x:{normalized}"}
+
+
+def similarity(new, known, threshold=0.0):
+    """
+    Returns (score, contained). score is the string similarity of two normalized ids in
+    [0, 1], or 0 when the cheap upper bounds already show it is below threshold. contained
+    says all words of new appear in known ("augustus" in "caesar augustus"), which the
+    resolver only accepts when it is unambiguous. Names whose numbers differ
+    ("constantine i" / "constantine ii", "constantine" / "constantine i") score 0."""
+    if new == known:
+        return 1.0, False
+    new_tokens, known_tokens = set(new.split()), set(known.split())
+    contained = new_tokens < known_tokens and any(len(token) >= 4 for token in new_tokens)
+    matcher = SequenceMatcher(None, new, known)
+    if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+        score = 0.0
+    else:
+        score = matcher.ratio()
+    if (score or contained) and numbers(new) != numbers(known):
+        return 0.0, False
+    return score, contained
+
+
+class EntityResolver:
+    """
+    Merges near-duplicate entities of extracted graph documents before they are written.
+    Entities are matched against the canonical entities seen so far (across calls, so it
+    can run batch by batch in a streaming ingest): ids are normalized, candidates come from
+    blocks of shared phonetic/prefix keys instead of all pairs, and an entity joins a
+    canonical one of the same type when their string similarity reaches threshold, when
+    all of its words appear in exactly one candidate, or (with an embedder) when the
+    embeddings of the two ids reach embedding_threshold. Names with different regnal or
+    other numbers are never merged. The first id of a group is kept as its canonical id,
+    and relationships are rewritten to it. from_graph seeds the canonical entities with the
+    __Entity__ nodes already in the graph, so later ingest runs merge into them."""
+
+    def __init__(
+        self,
+        threshold=DEFAULT_THRESHOLD,
+        embedder=None,
+        embedding_threshold=DEFAULT_EMBEDDING_THRESHOLD,
+        max_block_size=DEFAULT_MAX_BLOCK_SIZE,
+        match_types=True,
+    ):
+        self.threshold = threshold
+        self.embedder = embedder
+        self.embedding_threshold = embedding_threshold
+        self.max_block_size = max_block_size
+        self.match_types = match_types
+        self._canonical = []  # [(id, type, normalized, vector)]
+        self._numbers = []  # canonical index -> numbers(normalized)
+        self._by_normalized = {}  # (type, normalized) -> canonical index
+        self._blocks = defaultdict(list)  # (type, key) -> canonical indexes
+        self._mapping = {}  # (id, type) -> canonical index
+        self.entities = 0
+        self.merged = 0
+        self.comparisons = 0
+        self.seconds = 0.0
+
+    @classmethod
+    def from_graph(cls, kg, **kwargs):
+        """A resolver whose canonical entities start as the graph's existing __Entity__ nodes."""
+        resolver = cls(**kwargs)
+        resolver.seed((row["id"], row["type"]) for row in kg.query(ENTITIES_QUERY))
+        return resolver
+
+    def seed(self, entities):
+        """
+        Registers existing (id, type) entities as canonical without counting them as resolved,
+        so new ids are merged into them. Returns how many were registered."""
+        entities = [(str(entity_id), entity_type) for entity_id, entity_type in entities if entity_id is not None]
+        vectors = self._embed([entity_id for entity_id, _ in entities])
+        registered = 0
+        for entity_id, entity_type in entities:
+            if (entity_id, entity_type) in self._mapping:
+                continue
+            normalized = normalize_id(entity_id)
+            type_key = self._type_key(entity_type)
+            index = self._by_normalized.get((type_key, normalized))
+            if index is None:
+                index = self._register(Node(id=entity_id, type=entity_type), type_key, normalized, vectors.get(entity_id))
+                registered += 1
+            self._mapping[(entity_id, entity_type)] = index
+        return registered
+
+    def _type_key(self, node_type):
+        return node_type.lower() if self.match_types else ""
+
+    def _embed(self, ids):
+        if self.embedder is None or not ids:
+            return {}
+        vectors = np.asarray(self.embedder.embed(ids), dtype=np.float32)
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return dict(zip(ids, vectors))
+
+    def _match(self, type_key, normalized, vector):
+        new_numbers = numbers(normalized)
+        candidates = set()
+        for key in blocking_keys(normalized):
+            block = self._blocks.get((type_key, key), ())
+            if len(block) <= self.max_block_size:  # a huge block is a common word, not a name
+                candidates.update(block)
+        best, best_score, containing = None, 0.0, []
+        for index in candidates:
+            self.comparisons += 1
+            if new_numbers != self._numbers[index]:
+                continue  # never merged, not even on embeddings
+            known = self._canonical[index]
+            # With embeddings every candidate needs its score; otherwise below threshold is as good as 0
+            score, contained = similarity(normalized, known[2], 0.0 if vector is not None else self.threshold)
+            if contained:
+                containing.append(index)
+            if vector is not None and known[3] is not None and score < self.threshold:
+                if float(vector @ known[3]) >= self.embedding_threshold:
+                    score = max(score, self.threshold)
+            if score > best_score:
+                best, best_score = index, score
+        if best_score >= self.threshold:
+            return best
+        if len(containing) == 1:
+            return containing[0]
+        return None
+
+    def _register(self, node, type_key, normalized, vector):
+        index = len(self._canonical)
+        self._canonical.append((node.id, node.type, normalized, vector))
+        self._numbers.append(numbers(normalized))
+        self._by_normalized[(type_key, normalized)] = index
+        for key in blocking_keys(normalized):
+            self._blocks[(type_key, key)].append(index)
+        return index
+
+    def _resolve_nodes(self, graph_documents):
+        nodes = Counter()
+        for graph_document in graph_documents:
+            for node in graph_document.nodes:
+                nodes[(node.id, node.type)] += 1
+            for rel in graph_document.relationships:
+                nodes[(rel.source.id, rel.source.type)] += 0
+                nodes[(rel.target.id, rel.target.type)] += 0
+        new = [key for key in nodes if key not in self._mapping]
+        # Longer names first, so shorter forms can be matched into them; then the most mentioned
+        new.sort(key=lambda key: (-len(normalize_id(key[0]).split()), -nodes[key]))
+        vectors = self._embed([entity_id for entity_id, _ in new])
+        for entity_id, entity_type in new:
+            self.entities += 1
+            normalized = normalize_id(entity_id)
+            type_key = self._type_key(entity_type)
+            index = self._by_normalized.get((type_key, normalized))
+            if index is None:
+                index = self._match(type_key, normalized, vectors.get(entity_id))
+            if index is None:
+                index = self._register(Node(id=entity_id, type=entity_type), type_key, normalized, vectors.get(entity_id))
+            else:
+                self.merged += 1
+            self._mapping[(entity_id, entity_type)] = index
+
+    def _canonical_node(self, node):
+        canonical_id, canonical_type, _, _ = self._canonical[self._mapping[(node.id, node.type)]]
+        return Node(id=canonical_id, type=canonical_type, properties=dict(node.properties))
+
+    def resolve(self, graph_documents):
+        """Returns the graph documents with every entity replaced by its canonical entity."""
+        start = time.perf_counter()
+        graph_documents = list(graph_documents)
+        self._resolve_nodes(graph_documents)
+        resolved = []
+        for graph_document in graph_documents:
+            nodes = {}
+            for node in graph_document.nodes:
+                canonical = self._canonical_node(node)
+                key = (canonical.id, canonical.type)
+                if key in nodes:
+                    nodes[key].properties.update(node.properties)
+                else:
+                    nodes[key] = canonical
+            relationships = {}
+            for rel in graph_document.relationships:
+                source, target = self._canonical_node(rel.source), self._canonical_node(rel.target)
+                if (source.id, source.type) == (target.id, target.type):
+                    continue  # "Augustus" -> "Emperor Augustus" became a self-loop
+                key = (source.id, source.type, rel.type, target.id, target.type)
+                if key not in relationships:
+                    relationships[key] = Relationship(
+                        source=source, target=target, type=rel.type, properties=dict(rel.properties)
+                    )
+            resolved.append(
+                GraphDocument(nodes=list(nodes.values()), relationships=list(relationships.values()),
+                              source=graph_document.source)
+            )
+        self.seconds += time.perf_counter() - start
+        return resolved
+
+    def stats(self):
+        return {
+            "entities": self.entities,
+            "canonical": len(self._canonical),
+            "merged": self.merged,
+            "comparisons": self.comparisons,
+            "all_pairs_comparisons": self.entities * (self.entities - 1) // 2,
+            "seconds": self.seconds,
+        }
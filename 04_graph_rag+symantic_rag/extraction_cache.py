@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from importlib.metadata import version
+
+from langchain_community.graphs.graph_document import GraphDocument, Node, Relationship
+
+DEFAULT_CACHE_DIR = os.getenv(
+    "EXTRACTION_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".cache", "extractions"),
+)
+
+
+def digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def transformer_config(
+    allowed_nodes=(),
+    allowed_relationships=(),
+    prompt=None,
+    strict_mode=True,
+    node_properties=False,
+    relationship_properties=False,
+    ignore_tool_usage=False,
+    additional_instructions="",
+):
+    """
+    The LLMGraphTransformer arguments that change what is extracted from a chunk, as the
+    caller passes them. A custom prompt is keyed by its text; the default prompt and output
+    schema by the langchain-experimental version that builds them."""
+    return {
+        "allowed_nodes": list(allowed_nodes),
+        "allowed_relationships": [list(r) if isinstance(r, tuple) else r for r in allowed_relationships],
+        "prompt": digest(prompt.pretty_repr()) if prompt is not None else None,
+        "strict_mode": strict_mode,
+        "node_properties": node_properties,
+        "relationship_properties": relationship_properties,
+        "ignore_tool_usage": ignore_tool_usage,
+        "additional_instructions": additional_instructions,
+        "langchain_experimental": version("langchain-experimental"),
+    }
+
+
+def model_name(llm):
+    return getattr(llm, "model_name", None) or getattr(llm, "model", None) or llm._llm_type
+
+
+def node_dict(node):
+    return {"id": node.id, "type": node.type, "properties": node.properties}
+
+
+def to_json(graph_document):
+    """Nodes and relationships only: the source chunk is the document the entry is looked up with."""
+    return json.dumps(
+        {
+            "nodes": [node_dict(node) for node in graph_document.nodes],
+            "relationships": [
+                {
+                    "source": node_dict(rel.source),
+                    "target": node_dict(rel.target),
+                    "type": rel.type,
+                    "properties": rel.properties,
+                }
+                for rel in graph_document.relationships
+            ],
+        },
+        default=str,
+    )
+
+
+def from_json(payload, document):
+    data = json.loads(payload)
+    return GraphDocument(
+        nodes=[Node(**node) for node in data["nodes"]],
+        relationships=[
+            Relationship(source=Node(**rel["source"]), target=Node(**rel["target"]), type=rel["type"],
+                         properties=rel["properties"])
+            for rel in data["relationships"]
+        ],
+        source=document,
+    )
+
+
+class ExtractionCache:
+    """
+    SQLite-backed cache of LLMGraphTransformer results. Entries are keyed by the hash of the
+    chunk text, the model and the transformer arguments (see transformer_config), so a chunk
+    is only extracted again when one of them changes. Every entry is committed as soon as it
+    is stored, so an interrupted run resumes from the chunks it had not finished."""
+
+    def __init__(self, model, config, path=DEFAULT_CACHE_DIR):
+        os.makedirs(path, exist_ok=True)
+        self.context = json.dumps({"model": model, "config": config}, sort_keys=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(path, "extractions.sqlite"), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS extractions (key TEXT PRIMARY KEY, graph TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        self._db.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def for_transformer(cls, llm, path=DEFAULT_CACHE_DIR, **transformer_kwargs):
+        """The cache for LLMGraphTransformer(llm=llm, **transformer_kwargs)."""
+        return cls(model_name(llm), transformer_config(**transformer_kwargs), path)
+
+    def key(self, document):
+        return hashlib.sha256(f"{self.context}\x1f{document.page_content}".encode("utf-8")).hexdigest()
+
+    def get(self, document):
+        """Returns the cached GraphDocument for document, or None."""
+        with self._lock:
+            row = self._db.execute("SELECT graph FROM extractions WHERE key = ?", (self.key(document),)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return from_json(row[0], document)
+
+    def put(self, document, graph_document):
+        payload = to_json(graph_document)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO extractions (key, graph, created) VALUES (?, ?, ?)",
+                (self.key(document), payload, time.time()),
+            )
+            self._db.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT count(*) FROM extractions").fetchone()[0]
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self)}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,85 @@
+import asyncio
+import json
+import random
+import re
+import time
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+# Runs of capitalized words ("Roman Empire", "Augustus") stand in for the entities an LLM would find
+ENTITY = re.compile(r"\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b")
+SENTENCE = re.compile(r"(?<=[.!?])\s+")
+
+
+class RateLimitError(Exception):
+    """Raised by FakeExtractionLLM to simulate an HTTP 429 from the provider."""
+
+    status_code = 429
+
+
+class FakeExtractionLLM(BaseChatModel):
+    """
+    Offline stand-in for the chat model behind LLMGraphTransformer. It has no tool calling,
+    so the transformer uses its JSON prompt, and it answers with head/relation/tail triples
+    linking the capitalized phrases of each sentence of the text. Each call takes latency
+    seconds (plus seconds_per_1k_chars of input), and a rate_limit_rate fraction of calls
+    raise RateLimitError, so extraction throughput and retries can be measured without an API."""
+
+    latency: float = 0.5
+    seconds_per_1k_chars: float = 0.0
+    rate_limit_rate: float = 0.0
+    max_entities: int = 12
+    seed: int = 0
+    _random: Any = PrivateAttr(default=None)
+    _calls: int = PrivateAttr(default=0)
+
+    @property
+    def _llm_type(self):
+        return "fake-extraction"
+
+    @property
+    def calls(self):
+        return self._calls
+
+    def _text(self, messages):
+        content = messages[-1].content
+        return content.rsplit("\nText: ", 1)[-1]
+
+    def _answer(self, messages):
+        if self._random is None:
+            self._random = random.Random(self.seed)
+        self._calls += 1
+        if self.rate_limit_rate and self._random.random() < self.rate_limit_rate:
+            raise RateLimitError("Rate limit reached for requests (fake)")
+        triples = []
+        seen = set()
+        for sentence in SENTENCE.split(self._text(messages)):
+            entities = list(dict.fromkeys(ENTITY.findall(sentence)))
+            for head, tail in zip(entities, entities[1:]):
+                seen.update((head, tail))
+                triples.append(
+                    {"head": head, "head_type": "Entity", "relation": "RELATED_TO", "tail": tail, "tail_type": "Entity"}
+                )
+            if len(seen) >= self.max_entities:
+                break
+        message = AIMessage(content=json.dumps(triples))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _delay(self, messages):
+        return self.latency + self.seconds_per_1k_chars * len(self._text(messages)) / 1000
+
+    def _generate(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs
+    ) -> ChatResult:
+        time.sleep(self._delay(messages))
+        return self._answer(messages)
+
+    async def _agenerate(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs
+    ) -> ChatResult:
+        await asyncio.sleep(self._delay(messages))
+        return self._answer(messages)
@@ -0,0 +1,139 @@
+import asyncio
+import os
+import random
+import time
+
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("EXTRACTION_MAX_CONCURRENCY", "8"))
+DEFAULT_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+DEFAULT_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "200000"))
+DEFAULT_MAX_RETRIES = 6
+# LLMGraphTransformer's instructions plus the extracted JSON, on top of the chunk itself
+PROMPT_TOKENS = 1000
+
+# Matched by class name, so the check does not depend on which LLM client raised them
+RETRYABLE_ERRORS = {"RateLimitError", "APITimeoutError", "APIConnectionError", "InternalServerError"}
+
+
+class TokenBucket:
+    """Allows rate_per_minute units per minute, in bursts of at most capacity units."""
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount):
+        """Seconds until amount units are available (0 if they are); a request above capacity waits for a full bucket."""
+        self._refill()
+        return max(0.0, (min(amount, self.capacity) - self.tokens) / self.rate)
+
+    def take(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute buckets; callers are served in arrival order."""
+
+    def __init__(self, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.waited = 0.0
+        self._lock = None
+
+    async def acquire(self, tokens):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                delay = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                if not delay:
+                    break
+                self.waited += delay
+                await asyncio.sleep(delay)
+            self.requests.take(1)
+            self.tokens.take(tokens)
+
+
+def estimate_tokens(text):
+    """Rough token count of one extraction call (about 4 characters per token)."""
+    return len(text) // 4 + PROMPT_TOKENS
+
+
+def is_retryable(error):
+    return type(error).__name__ in RETRYABLE_ERRORS or getattr(error, "status_code", None) == 429
+
+
+async def aextract_one(transformer, document, limiter, stats, cache=None, max_retries=DEFAULT_MAX_RETRIES):
+    """
+    Graph document for one chunk: from the cache if it is there, otherwise from the LLM under
+    the limiter, retrying rate-limit and transient errors with jittered exponential backoff.
+    Counts cache_hits, extracted and retries in stats."""
+    cached = cache.get(document) if cache is not None else None
+    if cached is not None:
+        stats["cache_hits"] += 1
+        return cached
+    for attempt in range(max_retries + 1):
+        await limiter.acquire(estimate_tokens(document.page_content))
+        try:
+            graph_document = await transformer.aprocess_response(document)
+            if cache is not None:
+                cache.put(document, graph_document)
+            stats["extracted"] += 1
+            return graph_document
+        except Exception as e:
+            if attempt == max_retries or not is_retryable(e):
+                raise
+            stats["retries"] += 1
+            await asyncio.sleep(min(2 ** attempt, 60) * (0.5 + random.random()))
+
+
+async def aextract_graph_documents(
+    transformer,
+    documents,
+    max_concurrency=DEFAULT_MAX_CONCURRENCY,
+    requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE,
+    tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE,
+    max_retries=DEFAULT_MAX_RETRIES,
+    limiter=None,
+    cache=None,
+):
+    """
+    Runs transformer.aprocess_response (LLMGraphTransformer's async path) over documents with
+    at most max_concurrency calls in flight, under the request and token rate limits (see
+    aextract_one for retries). With a cache (see extraction_cache.py), cached chunks skip the
+    LLM and each new result is stored as soon as it arrives. Returns (graph_documents, stats);
+    graph_documents are in the order of documents."""
+    documents = list(documents)
+    limiter = limiter or RateLimiter(requests_per_minute, tokens_per_minute)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    stats = {"documents": len(documents), "cache_hits": 0, "extracted": 0, "retries": 0}
+
+    async def extract(document):
+        async with semaphore:
+            return await aextract_one(transformer, document, limiter, stats, cache, max_retries)
+
+    start = time.perf_counter()
+    graph_documents = await asyncio.gather(*(extract(document) for document in documents))
+    elapsed = time.perf_counter() - start
+    stats["seconds"] = elapsed
+    stats["documents_per_sec"] = len(documents) / elapsed if elapsed else 0.0
+    stats["rate_limit_wait_seconds"] = limiter.waited
+    return list(graph_documents), stats
+
+
+def extract_graph_documents(transformer, documents, **kwargs):
+    """Blocking wrapper around aextract_graph_documents for scripts; prints the stats."""
+    graph_documents, stats = asyncio.run(aextract_graph_documents(transformer, documents, **kwargs))
+    print(
+        f"Graph documents for {stats['documents']} chunks in {stats['seconds']:.1f}s: "
+        f"{stats['cache_hits']} from the extraction cache, {stats['extracted']} extracted by the LLM "
+        f"({stats['documents_per_sec']:.2f} chunks/sec, {stats['retries']} retries, "
+        f"{stats['rate_limit_wait_seconds']:.1f}s waiting on rate limits)"
+    )
+    return graph_documents
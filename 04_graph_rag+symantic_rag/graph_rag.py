@@ -0,0 +1,386 @@
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+from langchain_core.runnables import (
+    RunnableBranch,
+    RunnableLambda,
+    RunnableParallel,
+    RunnablePassthrough,
+)
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.prompts.prompt import PromptTemplate
+from pydantic import BaseModel, Field
+from typing import Tuple, List
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.output_parsers import StrOutputParser
+from langchain_openai import ChatOpenAI
+
+from langchain_neo4j import Neo4jVector
+from langchain_neo4j.vectorstores.neo4j_vector import remove_lucene_chars
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from embedders import LangChainEmbeddings, get_embedder
+from embed_documents import KEYWORD_INDEX, VECTOR_INDEX
+from embedding_cache import CachedEmbedder, QuestionEmbeddingCache
+from entity_gazetteer import EntityGazetteer
+from neo4j_connection import get_graph, load_schema_snapshot
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+# Fulltext index over the __Entity__ ids, created by the ingest
+ENTITY_INDEX = "entity"
+
+# How structured_retriever finds the entities of a question: "llm" (entity_chain), "local"
+# (the gazetteer of graph entity ids, see entity_gazetteer.py) or "fallback" (the gazetteer,
+# and entity_chain only when it finds nothing)
+ENTITY_EXTRACTION = os.getenv("ENTITY_EXTRACTION", "fallback")
+ENTITY_EXTRACTION_MODES = ("llm", "local", "fallback")
+
+# Seconds the retriever waits for each side; past that it answers from the other side alone
+GRAPH_RETRIEVAL_TIMEOUT = float(os.getenv("GRAPH_RETRIEVAL_TIMEOUT", "10"))
+VECTOR_RETRIEVAL_TIMEOUT = float(os.getenv("VECTOR_RETRIEVAL_TIMEOUT", "10"))
+
+
+# Extract entities from text
+#Specifies output format of entity extraction
+class Entities(BaseModel):
+    """Identifying information about entities.
+    Uses GPT to extract entities like people and organizations from the user query."""
+
+    names: List[str] = Field(
+        ...,
+        description="All the person, organization, or business entities that "
+        "appear in the text",
+    )
+
+
+ENTITY_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            "You are extracting organization and person entities from the text.",
+        ),
+        (
+            "human",
+            "Use the given format to extract information from the following "
+            "input: {question}",
+        ),
+    ]
+)
+
+# Who is Ceaser?
+# In the year of 123 there was an emperor who did not like to rule.
+
+# Define the RAG chain
+# Condense a chat history and follow-up question into a standalone question
+_template = """Given the following conversation and a follow up question, rephrase the follow up question to be a standalone question,
+in its original language.
+Chat History:
+{chat_history}
+Follow Up Input: {question}
+Standalone question:"""  # noqa: E501
+CONDENSE_QUESTION_PROMPT = PromptTemplate.from_template(_template)
+
+template = """Answer the question based only on the following context:
+{context}
+
+Question: {question}
+Use natural language and be concise.
+Answer:"""
+ANSWER_PROMPT = ChatPromptTemplate.from_template(template)
+
+
+def generate_full_text_query(input: str) -> str:
+    """
+    Generate a full-text search query for a given input string.
+
+    This function constructs a query string suitable for a full-text search.
+    It processes the input string by splitting it into words and appending a
+    similarity threshold (~2 changed characters) to each word, then combines
+    them using the AND operator. Useful for mapping entities from user questions
+    to database values, and allows for some misspelings.
+    """
+    full_text_query = ""
+    words = [el for el in remove_lucene_chars(input).split() if el]
+    for word in words[:-1]:
+        full_text_query += f" {word}~2 AND"
+    full_text_query += f" {words[-1]}~2"
+    return full_text_query.strip()
+
+
+# Fulltext index query for all the entities of a question in one round trip. The lookup and the
+# neighborhood expansion run once per entity inside CALL {}, so both limits apply per entity.
+ENTITY_NEIGHBORHOOD_QUERY = """
+UNWIND $entities AS entity
+CALL {
+  WITH entity
+  CALL db.index.fulltext.queryNodes('entity', entity.query, {limit: $node_limit})
+  YIELD node, score
+  CALL {
+    WITH node
+    MATCH (node)-[r:!MENTIONS]->(neighbor)
+    RETURN node.id + ' - ' + type(r) + ' -> ' + neighbor.id AS output
+    UNION ALL
+    WITH node
+    MATCH (node)<-[r:!MENTIONS]-(neighbor)
+    RETURN neighbor.id + ' - ' + type(r) + ' -> ' +  node.id AS output
+  }
+  RETURN output LIMIT $triple_limit
+}
+RETURN entity.index AS index, collect(output) AS outputs
+"""
+
+# Matched nodes and neighborhood triples per entity of the question
+ENTITY_NODE_LIMIT = 2
+ENTITY_TRIPLE_LIMIT = 50
+
+
+def entity_neighborhoods(kg, names, node_limit=ENTITY_NODE_LIMIT, triple_limit=ENTITY_TRIPLE_LIMIT):
+    """
+    Looks up all the entity names with a single ENTITY_NEIGHBORHOOD_QUERY and returns
+    {name: [triples]} in the order of names. A triple is listed once, under the first entity
+    that reached it, and entities without a match (or without searchable words) are left out."""
+    names = [name for name in dict.fromkeys(names) if remove_lucene_chars(name).split()]
+    if not names:
+        return {}
+    rows = kg.query(
+        ENTITY_NEIGHBORHOOD_QUERY,
+        {
+            "entities": [{"index": i, "query": generate_full_text_query(name)} for i, name in enumerate(names)],
+            "node_limit": node_limit,
+            "triple_limit": triple_limit,
+        },
+    )
+    seen = set()
+    neighborhoods = {}
+    for row in sorted(rows, key=lambda row: row["index"]):
+        outputs = []
+        for output in row["outputs"]:
+            if output not in seen:
+                seen.add(output)
+                outputs.append(output)
+        if outputs:
+            neighborhoods[names[row["index"]]] = outputs
+    return neighborhoods
+
+
+def _format_chat_history(chat_history: List[Tuple[str, str]]) -> List:
+    buffer = []
+    for human, ai in chat_history:
+        buffer.append(HumanMessage(content=human))
+        buffer.append(AIMessage(content=ai))
+    return buffer
+'''
+It converts:
+[("Who was the first emperor?", "Augustus was the first emperor.")]
+into LangChain messages:
+[HumanMessage("Who was..."), AIMessage("Augustus was...")]
+'''
+
+
+class GraphRAG:
+    """
+    The question-answering side of the Roman Empire graph: entity lookup in the graph,
+    hybrid vector search over the Document chunks, and the chain that answers from both.
+    It only reads what the ingest wrote (see roman_emp_graph_rag.py ingest). The graph and
+    vector sides are retrieved concurrently, each within its timeout, and chain supports
+    ainvoke/abatch, so one process can answer many questions at once."""
+
+    def __init__(
+        self,
+        kg,
+        vector_index,
+        chat,
+        gazetteer=None,
+        entity_extraction="llm",
+        graph_timeout=GRAPH_RETRIEVAL_TIMEOUT,
+        vector_timeout=VECTOR_RETRIEVAL_TIMEOUT,
+    ):
+        if entity_extraction not in ENTITY_EXTRACTION_MODES:
+            raise ValueError(f"entity_extraction must be one of {ENTITY_EXTRACTION_MODES}")
+        if entity_extraction != "llm" and gazetteer is None:
+            raise ValueError(f"entity_extraction={entity_extraction!r} needs a gazetteer")
+        self.kg = kg
+        self.vector_index = vector_index
+        self.chat = chat
+        self.gazetteer = gazetteer
+        self.entity_extraction = entity_extraction
+        self.graph_timeout = graph_timeout
+        self.vector_timeout = vector_timeout
+        self.retrieval_failures = {"graph": 0, "vector": 0}
+        self.entity_chain = ENTITY_PROMPT | chat.with_structured_output(Entities)
+        self.chain = self._build_chain()
+
+    def entity_names(self, question: str) -> List[str]:
+        """The entities of the question, from the gazetteer and/or entity_chain (see ENTITY_EXTRACTION)."""
+        if self.entity_extraction != "llm":
+            self.gazetteer.refresh(self.kg)
+            names = self.gazetteer.extract(question)
+            if names or self.entity_extraction == "local":
+                return names
+        return self.entity_chain.invoke({"question": question}).names
+
+    async def aentity_names(self, question: str) -> List[str]:
+        if self.entity_extraction != "llm":
+            await asyncio.to_thread(self.gazetteer.refresh, self.kg)
+            names = self.gazetteer.extract(question)
+            if names or self.entity_extraction == "local":
+                return names
+        return (await self.entity_chain.ainvoke({"question": question})).names
+
+    # Fulltext index query
+    def structured_retriever(self, question: str) -> str:
+        """
+        Collects the neighborhood of entities mentioned
+        in the question
+        """
+        names = self.entity_names(question)
+        print(f" Getting Entities: {names}")
+        neighborhoods = entity_neighborhoods(self.kg, names)
+        return "\n".join("\n".join(outputs) for outputs in neighborhoods.values())
+    '''
+    Extracts entities (people, organizations) from the user's question using the gazetteer of graph entities and/or the entity_chain.
+
+    Searches Neo4j for all of those entities at once using full-text index and the fuzzy query from the previous function.
+
+    Finds their relationships in the graph (what they’re connected to).
+
+    Returns text output showing those connections.'''
+
+    async def astructured_retriever(self, question: str) -> str:
+        names = await self.aentity_names(question)
+        print(f" Getting Entities: {names}")
+        # All the entities go in one query (see entity_neighborhoods), so there is one lookup to await
+        neighborhoods = await asyncio.to_thread(entity_neighborhoods, self.kg, names)
+        return "\n".join("\n".join(outputs) for outputs in neighborhoods.values())
+
+    def _dropped(self, side, reason):
+        print(f"{side.capitalize()} retrieval {reason}; answering without it")
+        self.retrieval_failures[side] += 1
+
+    async def _within(self, side, awaitable, timeout, default):
+        """The result of awaitable, or default (logged) when it fails or takes longer than timeout."""
+        try:
+            return await asyncio.wait_for(awaitable, timeout)
+        except TimeoutError:
+            self._dropped(side, f"took over {timeout}s")
+        except Exception as e:
+            self._dropped(side, f"failed: {e!r}")
+        return default
+
+    def _result(self, side, future, started, timeout, default):
+        """Blocking _within for a concurrent.futures future submitted at started (time.monotonic())."""
+        try:
+            return future.result(timeout=max(started + timeout - time.monotonic(), 0))
+        except FuturesTimeoutError:
+            self._dropped(side, f"took over {timeout}s")
+        except Exception as e:
+            self._dropped(side, f"failed: {e!r}")
+        return default
+
+    def _context(self, structured_data, documents):
+        unstructured_data = [
+            el.page_content for el in documents
+        ]
+        final_data = f"""Structured data:
+{structured_data}
+Unstructured data:
+{"#Document ". join(unstructured_data)}
+    """
+        print(f"\nFinal Data::: ==>{final_data}")
+        return final_data
+
+    # Final retrieval step
+    def retriever(self, question: str):
+        print(f"Search query: {question}")
+        # Not a with block: leaving it would wait for a side that is past its timeout
+        pool = ThreadPoolExecutor(max_workers=2)
+        try:
+            started = time.monotonic()
+            structured = pool.submit(self.structured_retriever, question)
+            documents = pool.submit(self.vector_index.similarity_search, question)
+            return self._context(
+                self._result("graph", structured, started, self.graph_timeout, ""),
+                self._result("vector", documents, started, self.vector_timeout, []),
+            )
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    '''Gets structured data using the structured_retriever() → from Neo4j Graph.
+
+    Gets unstructured data using vector search from vector_index.similarity_search(question) → from Wikipedia chunks,
+    at the same time, in two threads.
+
+    Combines both and prints it. A side that fails or times out is logged and contributes nothing.'''
+
+    async def aretriever(self, question: str):
+        """retriever for chain.ainvoke/abatch: both sides are awaited concurrently on the caller's loop."""
+        print(f"Search query: {question}")
+        structured_data, documents = await asyncio.gather(
+            self._within("graph", self.astructured_retriever(question), self.graph_timeout, ""),
+            self._within("vector", self.vector_index.asimilarity_search(question), self.vector_timeout, []),
+        )
+        return self._context(structured_data, documents)
+
+    def _build_chain(self):
+        _search_query = RunnableBranch(
+            # If input includes chat_history, we condense it with the follow-up question
+            (
+                RunnableLambda(lambda x: bool(x.get("chat_history"))).with_config(
+                    run_name="HasChatHistoryCheck"
+                ),  # Condense follow-up question and chat into a standalone_question
+                RunnablePassthrough.assign(
+                    chat_history=lambda x: _format_chat_history(x["chat_history"])
+                )
+                | CONDENSE_QUESTION_PROMPT
+                | ChatOpenAI(temperature=0)
+                | StrOutputParser(),
+            ),
+            # Else, we have no chat history, so just pass through the question
+            RunnableLambda(lambda x: x["question"]),
+        )
+        return (
+            RunnableParallel(
+                {
+                    "context": _search_query | RunnableLambda(self.retriever, afunc=self.aretriever),
+                    "question": RunnablePassthrough(),
+                }
+            )
+            | ANSWER_PROMPT
+            | self.chat
+            | StrOutputParser()
+        )
+
+
+def connect(refresh_schema=False, embedder=None, entity_extraction=ENTITY_EXTRACTION):
+    """
+    Builds a GraphRAG on the existing graph and indexes, without writing anything: the
+    Neo4jGraph schema comes from the snapshot the ingest saved instead of an apoc.meta
+    refresh (unless refresh_schema), the vector store attaches to the existing indexes and,
+    unless entity_extraction is "llm", the gazetteer loads the __Entity__ ids.
+    Returns (rag, question cache)."""
+    kg = get_graph(refresh_schema=refresh_schema)
+    if not refresh_schema and not load_schema_snapshot(kg):
+        print("No graph schema snapshot found; run the ingest command to write one")
+    embedder = embedder or CachedEmbedder(get_embedder())
+    # Questions repeat a lot, so similarity_search looks their embeddings up in memory first
+    question_cache = QuestionEmbeddingCache(embedder)
+    try:
+        vector_index = Neo4jVector.from_existing_index(
+            # Shares the on-disk embedding cache with the provider embeddings in app.py
+            LangChainEmbeddings(embedder, question_cache=question_cache),
+            index_name=VECTOR_INDEX,
+            keyword_index_name=KEYWORD_INDEX,
+            search_type="hybrid",
+            text_node_properties=["text"],
+            graph=kg,
+        )
+    except ValueError as e:
+        raise RuntimeError(f"The Document indexes are missing; run the ingest command first ({e})") from e
+    chat = ChatOpenAI(api_key=OPENAI_API_KEY, temperature=0, model="gpt-4o-mini")
+    gazetteer = EntityGazetteer.from_graph(kg) if entity_extraction != "llm" else None
+    return GraphRAG(kg, vector_index, chat, gazetteer, entity_extraction), question_cache
@@ -0,0 +1,187 @@
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from graph_extraction import (
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MAX_RETRIES,
+    RateLimiter,
+    aextract_one,
+)
+from query_cache import bump_write_epoch
+
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_WRITE_BATCH_SIZE = 32
+
+_DONE = object()
+
+
+def wikipedia_pages(queries, max_pages=25, doc_content_chars_max=4000):
+    """
+    Yields Wikipedia pages as Documents (like WikipediaLoader), one page at a time, for each
+    query in turn; max_pages is per query."""
+    from langchain_community.utilities.wikipedia import WikipediaAPIWrapper
+
+    for query in queries:
+        client = WikipediaAPIWrapper(top_k_results=max_pages, doc_content_chars_max=doc_content_chars_max)
+        yield from client.lazy_load(query)
+
+
+class StageMetrics:
+    """Items in and out of one stage, the time it spent working and its deepest input queue."""
+
+    def __init__(self, name):
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.busy_seconds = 0.0
+        self.max_queue = 0
+
+    def saw_queue(self, queue):
+        self.max_queue = max(self.max_queue, queue.qsize())
+
+    def as_dict(self, seconds):
+        return {
+            "stage": self.name,
+            "in": self.items_in,
+            "out": self.items_out,
+            "busy_seconds": self.busy_seconds,
+            "out_per_sec": self.items_out / seconds if seconds else 0.0,
+            "max_queue": self.max_queue,
+        }
+
+
+async def run_pipeline(
+    pages,
+    splitter,
+    transformer,
+    graph,
+    extract_workers=DEFAULT_MAX_CONCURRENCY,
+    write_batch_size=DEFAULT_WRITE_BATCH_SIZE,
+    queue_size=DEFAULT_QUEUE_SIZE,
+    limiter=None,
+    cache=None,
+    max_retries=DEFAULT_MAX_RETRIES,
+    resolver=None,
+    gazetteer=None,
+):
+    """
+    Streams pages through load -> split -> extract -> write. Every stage runs concurrently
+    and hands work to the next through a bounded queue, so memory stays flat however many
+    pages there are: a slow stage blocks the one before it instead of letting work pile up.
+    pages is any iterable of Documents (e.g. wikipedia_pages), read in a worker thread.
+    extract_workers chunks are extracted at once (see graph_extraction.py), and graph
+    documents are written with graph.add_graph_documents in batches of write_batch_size.
+    An optional resolver (entity_resolution.py) merges duplicate entities before each write,
+    and an optional gazetteer (entity_gazetteer.py) learns the written entities. Returns
+    {"seconds", "stages": [per-stage metrics], "extraction": cache/retry counts}."""
+    limiter = limiter or RateLimiter()
+    page_queue = asyncio.Queue(queue_size)
+    chunk_queue = asyncio.Queue(queue_size)
+    graph_queue = asyncio.Queue(queue_size)
+    load, split, extract, write = (StageMetrics(name) for name in ("load", "split", "extract", "write"))
+    extraction = {"cache_hits": 0, "extracted": 0, "retries": 0}
+
+    async def load_pages():
+        iterator = iter(pages)
+        while True:
+            start = time.perf_counter()
+            page = await asyncio.to_thread(next, iterator, _DONE)
+            load.busy_seconds += time.perf_counter() - start
+            if page is _DONE:
+                break
+            load.items_in += 1
+            load.items_out += 1
+            await page_queue.put(page)
+        await page_queue.put(_DONE)
+
+    async def split_pages():
+        while (page := await page_queue.get()) is not _DONE:
+            split.saw_queue(page_queue)
+            split.items_in += 1
+            start = time.perf_counter()
+            chunks = splitter.split_documents([page])
+            split.busy_seconds += time.perf_counter() - start
+            for chunk in chunks:
+                split.items_out += 1
+                await chunk_queue.put(chunk)
+        for _ in range(extract_workers):
+            await chunk_queue.put(_DONE)
+
+    async def extract_chunks():
+        while (chunk := await chunk_queue.get()) is not _DONE:
+            extract.saw_queue(chunk_queue)
+            extract.items_in += 1
+            start = time.perf_counter()
+            graph_document = await aextract_one(transformer, chunk, limiter, extraction, cache, max_retries)
+            extract.busy_seconds += time.perf_counter() - start
+            extract.items_out += 1
+            await graph_queue.put(graph_document)
+
+    async def extract_all():
+        await asyncio.gather(*(extract_chunks() for _ in range(extract_workers)))
+        await graph_queue.put(_DONE)
+
+    async def flush(batch):
+        start = time.perf_counter()
+        if resolver is not None:
+            # Resolution is CPU-bound; off the event loop, extraction keeps the LLM busy meanwhile
+            batch = await asyncio.to_thread(resolver.resolve, batch)
+        await asyncio.to_thread(graph.add_graph_documents, batch, include_source=True, baseEntityLabel=True)
+        if gazetteer is not None:
+            gazetteer.add_graph_documents(batch)
+        write.busy_seconds += time.perf_counter() - start
+        write.items_out += len(batch)
+
+    async def write_batches():
+        batch = []
+        while (graph_document := await graph_queue.get()) is not _DONE:
+            write.saw_queue(graph_queue)
+            write.items_in += 1
+            batch.append(graph_document)
+            if len(batch) >= write_batch_size:
+                await flush(batch)
+                batch = []
+        if batch:
+            await flush(batch)
+
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(stage()) for stage in (load_pages, split_pages, extract_all, write_batches)]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    finally:
+        if write.items_out:
+            await asyncio.to_thread(bump_write_epoch)
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": elapsed,
+        "stages": [stage.as_dict(elapsed) for stage in (load, split, extract, write)],
+        "extraction": {**extraction, "rate_limit_wait_seconds": limiter.waited},
+        "entity_resolution": resolver.stats() if resolver is not None else None,
+    }
+
+
+def print_metrics(stats):
+    print(f"Ingested in {stats['seconds']:.1f}s; extraction: {stats['extraction']}")
+    if stats["entity_resolution"] is not None:
+        print(f"Entity resolution: {stats['entity_resolution']}")
+    print("| stage | in | out | busy s | out/sec | max queue |")
+    print("|---|---|---|---|---|---|")
+    for s in stats["stages"]:
+        print(
+            f"| {s['stage']} | {s['in']} | {s['out']} | {s['busy_seconds']:.2f} | "
+            f"{s['out_per_sec']:.2f} | {s['max_queue']} |"
+        )
+
+
+def ingest(pages, splitter, transformer, graph, **kwargs):
+    """Blocking wrapper around run_pipeline for scripts; prints the per-stage metrics."""
+    stats = asyncio.run(run_pipeline(pages, splitter, transformer, graph, **kwargs))
+    print_metrics(stats)
+    return stats
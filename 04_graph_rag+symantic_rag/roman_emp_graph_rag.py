@@ -1,300 +1,202 @@
-from dotenv import load_dotenv
+"""
+Graph RAG over the Wikipedia pages about the Roman Empire.
+
+    python roman_emp_graph_rag.py ingest          # load, extract and index the pages
+    python roman_emp_graph_rag.py ask "Who was the first emperor?"
+    python roman_emp_graph_rag.py serve           # answer questions read from stdin, concurrently
+
+ask and serve only connect to the existing graph and indexes, so they start in seconds; the
+LangChain modules each command needs are imported inside it. Running without a command does
+both, like the original script: ingest, then the sample follow-up question.
+"""
+import argparse
+import asyncio
 import os
-from langchain_neo4j import Neo4jGraph
-
-from langchain_core.runnables import (
-    RunnableBranch,
-    RunnableLambda,
-    RunnableParallel,
-    RunnablePassthrough,
-)
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.prompts.prompt import PromptTemplate
-from pydantic import BaseModel, Field
-# from langchain_core.pydantic_v1 import BaseModel, Field
-from typing import Tuple, List
-from langchain_core.messages import AIMessage, HumanMessage
-from langchain_core.output_parsers import StrOutputParser
-from langchain_community.document_loaders import WikipediaLoader
-from langchain.text_splitter import TokenTextSplitter
-from langchain_openai import ChatOpenAI
-from langchain_experimental.graph_transformers import LLMGraphTransformer
-
-from langchain_neo4j import Neo4jVector
-from langchain_openai import OpenAIEmbeddings
-from langchain_neo4j.vectorstores.neo4j_vector import remove_lucene_chars
+import sys
+import time
 
-load_dotenv()
+from dotenv import load_dotenv
 
-AURA_INSTANCENAME = os.environ["AURA_INSTANCENAME"]
-NEO4J_URI = os.environ["NEO4J_URI"]
-NEO4J_USERNAME = os.environ["NEO4J_USERNAME"]
-NEO4J_PASSWORD = os.environ["NEO4J_PASSWORD"]
-AUTH = (NEO4J_USERNAME, NEO4J_PASSWORD)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from neo4j_connection import close_driver
+
+load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-OPENAI_ENDPOINT = os.getenv("OPENAI_ENDPOINT")
-
-chat = ChatOpenAI(api_key=OPENAI_API_KEY, temperature=0, model="gpt-4o-mini")
-
-
-kg = Neo4jGraph(
-    url=NEO4J_URI,
-    username=NEO4J_USERNAME,
-    password=NEO4J_PASSWORD,
-) #database=NEO4J_DATABASE,
-# Connects to the Neo4j database where the graph data will be stored.
-# # # read the wikipedia page for the Roman Empire
-raw_documents = WikipediaLoader(query="The Roman empire").load()
-
-# # # # # Define chunking strategy
-text_splitter = TokenTextSplitter(chunk_size=512, chunk_overlap=24)
-documents = text_splitter.split_documents(raw_documents[:3])
-print(documents)
-'''Retrieves Wikipedia content related to “The Roman Empire.”
-
-Splits into chunks for better LLM handling (512 token chunks, overlapping by 24).'''
-
-# Convert Text to Graph Structure
-llm_transformer = LLMGraphTransformer(llm=chat)
-graph_documents = llm_transformer.convert_to_graph_documents(documents)
-'''Uses LLM to identify entities, relationships, and structure.
-
-Converts text chunks into graph documents.
-LLMGraphTransformer uses GPT to convert text chunks into graph structures—identifying nodes (entities) and edges (relations).
-
-These graph docs are then saved into Neo4j.'''
-
-# # store to neo4j
-res = kg.add_graph_documents(
-     graph_documents,
-     include_source=True,
-     baseEntityLabel=True,
- )
- '''Stores the graph in Neo4j.
-
-Includes source text and labels for querying later.'''
-
-# # MATCH (n) DETACH DELETE n - use this cyper command to delete the Graphs present in neo4j
-
-# Hybrid Retrieval for RAG
-# create vector index
-vector_index = Neo4jVector.from_existing_graph(
-    OpenAIEmbeddings(),
-    search_type="hybrid",
-    node_label="Document",
-    text_node_properties=["text"],
-    embedding_node_property="embedding",
-)
-'''
-Creates a hybrid vector retriever using Neo4jVector.
-
-Stores embeddings (via OpenAIEmbeddings) inside Neo4j.
-
-Allows semantic search over the unstructured chunks.
-'''
-
-
-# Extract entities from text
-#Specifies output format of entity extraction
-class Entities(BaseModel):
-    """Identifying information about entities.
-    Uses GPT to extract entities like people and organizations from the user query."""
-
-    names: List[str] = Field(
-        ...,
-        description="All the person, organization, or business entities that "
-        "appear in the text",
-    )
+# How many questions serve answers at once; their retrieval and LLM calls overlap
+SERVE_MAX_CONCURRENCY = int(os.getenv("SERVE_MAX_CONCURRENCY", "8"))
+# Pages are streamed and extracted concurrently now (see ingest_pipeline.py), so more are affordable
+WIKIPEDIA_MAX_PAGES = int(os.getenv("WIKIPEDIA_MAX_PAGES", "3"))
 
 
-prompt = ChatPromptTemplate.from_messages(
-    [
-        (
-            "system",
-            "You are extracting organization and person entities from the text.",
-        ),
-        (
-            "human",
-            "Use the given format to extract information from the following "
-            "input: {question}",
-        ),
-    ]
-)
-entity_chain = prompt | chat.with_structured_output(Entities)
-
-# # Test it out:
-# res = entity_chain.invoke(
-#     {"question": "In the year of 123 there was an emperor who did not like to rule"}
-# ).names
-# print(res)
-
-# Who is Ceaser?
-# In the year of 123 there was an emperor who did not like to rule. 
-
-# Retriever
-kg.query("CREATE FULLTEXT INDEX entity IF NOT EXISTS FOR (e:__Entity__) ON EACH [e.id]")
-# You're creating a search index for all the entity names in your Neo4j database, 
-# so you can quickly search for things like “Caesar” or “Roman Empire” later.
-
-def generate_full_text_query(input: str) -> str:
+def run_ingest(max_pages=WIKIPEDIA_MAX_PAGES):
     """
-    Generate a full-text search query for a given input string.
+    Builds everything ask/serve read: the entity graph, the Document embeddings and indexes,
+    the entity fulltext index and the graph schema snapshot."""
+    from langchain_text_splitters import TokenTextSplitter
+    from langchain_experimental.graph_transformers import LLMGraphTransformer
+    from langchain_openai import ChatOpenAI
+
+    from embedders import get_embedder
+    from embed_documents import embed_documents
+    from embedding_cache import CachedEmbedder
+    from entity_resolution import EntityResolver
+    from extraction_cache import ExtractionCache
+    from fake_llm import FakeExtractionLLM
+    from graph_rag import ENTITY_INDEX
+    from ingest_pipeline import ingest, wikipedia_pages
+    from neo4j_connection import get_driver, get_graph, save_schema_snapshot
+
+    chat = ChatOpenAI(api_key=OPENAI_API_KEY, temperature=0, model="gpt-4o-mini")
+
+    kg = get_graph()
+    # Connects to the Neo4j database where the graph data will be stored, through the shared pooled driver.
+    # # # read the wikipedia pages for the Roman Empire, one at a time
+    pages = wikipedia_pages(["The Roman empire"], max_pages=max_pages)
+
+    # # # # # Define chunking strategy
+    text_splitter = TokenTextSplitter(chunk_size=512, chunk_overlap=24)
+    '''Retrieves Wikipedia content related to “The Roman Empire.”
+
+    Splits into chunks for better LLM handling (512 token chunks, overlapping by 24).'''
+
+    # Convert Text to Graph Structure
+    # EXTRACTION_LLM=fake extracts offline with a stand-in model (see fake_llm.py)
+    extraction_llm = FakeExtractionLLM() if os.getenv("EXTRACTION_LLM") == "fake" else chat
+    # Extra LLMGraphTransformer arguments (allowed_nodes, prompt, ...) go here; the extraction cache is keyed on them
+    transformer_kwargs = {}
+    llm_transformer = LLMGraphTransformer(llm=extraction_llm, **transformer_kwargs)
+    '''Uses LLM to identify entities, relationships, and structure.
+
+    Converts text chunks into graph documents.
+    LLMGraphTransformer uses GPT to convert text chunks into graph structures—identifying nodes (entities) and edges (relations).
+
+    These graph docs are then saved into Neo4j.'''
+
+    # # store to neo4j
+    # Loading, splitting, extraction and writing overlap (see ingest_pipeline.py): pages stream through
+    # bounded queues, chunks are extracted concurrently under the LLM_REQUESTS_PER_MINUTE /
+    # LLM_TOKENS_PER_MINUTE limits, and graph documents are written in batches as they arrive.
+    # Extractions are cached on disk by chunk text, model and transformer arguments, so a re-run (or a
+    # run resumed after a crash) only sends new or changed chunks to the LLM.
+    # Before each batch is written, variants of one entity ("Augustus", "Emperor Augustus") are merged
+    # into a single canonical __Entity__ node, including the ones earlier runs wrote (see entity_resolution.py).
+    ingest(
+        pages,
+        text_splitter,
+        llm_transformer,
+        kg,
+        cache=ExtractionCache.for_transformer(extraction_llm, **transformer_kwargs),
+        resolver=EntityResolver.from_graph(kg),
+    )
+    '''Stores the graph in Neo4j.
 
-    This function constructs a query string suitable for a full-text search.
-    It processes the input string by splitting it into words and appending a
-    similarity threshold (~2 changed characters) to each word, then combines
-    them using the AND operator. Useful for mapping entities from user questions
-    to database values, and allows for some misspelings.
-    """
-    full_text_query = ""
-    words = [el for el in remove_lucene_chars(input).split() if el]
-    for word in words[:-1]:
-        full_text_query += f" {word}~2 AND"
-    full_text_query += f" {words[-1]}~2"
-    return full_text_query.strip()
+    Includes source text and labels for querying later.'''
 
+    # # MATCH (n) DETACH DELETE n - use this cyper command to delete the Graphs present in neo4j
 
-# Fulltext index query
-def structured_retriever(question: str) -> str:
-    """
-    Collects the neighborhood of entities mentioned
-    in the question
-    """
-    result = ""
-    entities = entity_chain.invoke({"question": question})
-    for entity in entities.names:
-        print(f" Getting Entity: {entity}")
-        response = kg.query(
-            """CALL db.index.fulltext.queryNodes('entity', $query, {limit:2})
-            YIELD node,score
-            CALL {
-              WITH node
-              MATCH (node)-[r:!MENTIONS]->(neighbor)
-              RETURN node.id + ' - ' + type(r) + ' -> ' + neighbor.id AS output
-              UNION ALL
-              WITH node
-              MATCH (node)<-[r:!MENTIONS]-(neighbor)
-              RETURN neighbor.id + ' - ' + type(r) + ' -> ' +  node.id AS output
-            }
-            RETURN output LIMIT 50
-            """,
-            {"query": generate_full_text_query(entity)},
-        )
-        # print(response)
-        result += "\n".join([el["output"] for el in response])
-    return result
-'''
-Extracts entities (people, organizations) from the user's question using the entity_chain.
-
-Searches Neo4j for those entities using full-text index and the fuzzy query from the previous function.
-
-Finds their relationships in the graph (what they’re connected to).
-
-Returns text output showing those connections.'''
-
-# print(structured_retriever("Who is Aurelian?"))
-
-
-# Final retrieval step
-def retriever(question: str):
-    print(f"Search query: {question}")
-    structured_data = structured_retriever(question)
-    unstructured_data = [
-        el.page_content for el in vector_index.similarity_search(question)
-    ]
-    final_data = f"""Structured data:
-{structured_data}
-Unstructured data:
-{"#Document ". join(unstructured_data)}
+    # Hybrid Retrieval for RAG
+    # Embeds only the chunks that are new or changed since the last run, in large batches (see
+    # embed_documents.py, which can also run on its own schedule), and creates the indexes if missing.
+    embed_documents(get_driver(), CachedEmbedder(get_embedder()))
+
+    # Retriever
+    kg.query(f"CREATE FULLTEXT INDEX {ENTITY_INDEX} IF NOT EXISTS FOR (e:__Entity__) ON EACH [e.id]")
+    # You're creating a search index for all the entity names in your Neo4j database,
+    # so you can quickly search for things like “Caesar” or “Roman Empire” later.
+
+    # ask/serve load this instead of running the apoc.meta schema refresh on every start
+    kg.refresh_schema()
+    save_schema_snapshot(kg)
+
+
+def start(refresh_schema=False, entity_extraction=None):
+    """Imports the query-side modules and connects; returns (rag, question cache, seconds taken)."""
+    start_time = time.perf_counter()
+    from graph_rag import ENTITY_EXTRACTION, connect
+
+    rag, question_cache = connect(
+        refresh_schema=refresh_schema, entity_extraction=entity_extraction or ENTITY_EXTRACTION
+    )
+    return rag, question_cache, time.perf_counter() - start_time
+
+
+def ask(rag, question, chat_history=None):
+    inputs = {"question": question}
+    if chat_history:
+        inputs["chat_history"] = chat_history
+    return rag.chain.invoke(inputs)
+
+
+async def answer_lines(rag, lines, max_concurrency=SERVE_MAX_CONCURRENCY):
     """
-    print(f"\nFinal Data::: ==>{final_data}")
-    return final_data
-
-'''Gets structured data using the structured_retriever() → from Neo4j Graph.
-
-Gets unstructured data using vector search from vector_index.similarity_search(question) → from Wikipedia chunks.
-
-Combines both and prints it.'''
-
-# Define the RAG chain
-# Condense a chat history and follow-up question into a standalone question
-_template = """Given the following conversation and a follow up question, rephrase the follow up question to be a standalone question,
-in its original language.
-Chat History:
-{chat_history}
-Follow Up Input: {question}
-Standalone question:"""  # noqa: E501
-CONDENSE_QUESTION_PROMPT = PromptTemplate.from_template(_template)
-
-
-def _format_chat_history(chat_history: List[Tuple[str, str]]) -> List:
-    buffer = []
-    for human, ai in chat_history:
-        buffer.append(HumanMessage(content=human))
-        buffer.append(AIMessage(content=ai))
-    return buffer
-'''
-It converts:
-[("Who was the first emperor?", "Augustus was the first emperor.")]
-into LangChain messages:
-[HumanMessage("Who was..."), AIMessage("Augustus was...")]
-'''
-
-
-_search_query = RunnableBranch(
-    # If input includes chat_history, we condense it with the follow-up question
-    (
-        RunnableLambda(lambda x: bool(x.get("chat_history"))).with_config(
-            run_name="HasChatHistoryCheck"
-        ),  # Condense follow-up question and chat into a standalone_question
-        RunnablePassthrough.assign(
-            chat_history=lambda x: _format_chat_history(x["chat_history"])
-        )
-        | CONDENSE_QUESTION_PROMPT
-        | ChatOpenAI(temperature=0)
-        | StrOutputParser(),
-    ),
-    # Else, we have no chat history, so just pass through the question
-    RunnableLambda(lambda x: x["question"]),
-)
-
-template = """Answer the question based only on the following context:
-{context}
-
-Question: {question}
-Use natural language and be concise.
-Answer:"""
-prompt = ChatPromptTemplate.from_template(template)
-
-chain = (
-    RunnableParallel(
-        {
-            "context": _search_query | retriever,
-            "question": RunnablePassthrough(),
-        }
+    Answers each question line with chain.ainvoke as soon as it is read, max_concurrency at
+    a time, and prints every answer (after its question) when it is ready."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def answer(question):
+        async with semaphore:
+            try:
+                print(f"\n === {question}\n{await rag.chain.ainvoke({'question': question})}\n\n", flush=True)
+            except Exception as e:
+                print(f"Error: {e}")
+
+    tasks = []
+    iterator = iter(lines)
+    while (line := await asyncio.to_thread(next, iterator, None)) is not None:
+        question = line.strip()
+        if question:
+            tasks.append(asyncio.create_task(answer(question)))
+    await asyncio.gather(*tasks)
+
+
+def serve(refresh_schema=False, entity_extraction=None, max_concurrency=SERVE_MAX_CONCURRENCY):
+    """Connects once, then answers the questions read from stdin (one per line) until EOF."""
+    rag, question_cache, seconds = start(refresh_schema, entity_extraction)
+    print(f"Ready in {seconds:.2f}s", file=sys.stderr, flush=True)
+    asyncio.run(answer_lines(rag, sys.stdin, max_concurrency))
+    print(f"Question embedding cache: {question_cache.stats()}")
+    print(f"Retrieval sides dropped (timeout or error): {rag.retrieval_failures}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Graph RAG over the Roman Empire Wikipedia pages.")
+    parser.add_argument(
+        "--refresh-schema", action="store_true", help="ask/serve: refresh the graph schema instead of loading the snapshot"
+    )
+    parser.add_argument(
+        "--entity-extraction",
+        choices=["llm", "local", "fallback"],
+        default=None,
+        help="ask/serve: how question entities are found (default: $ENTITY_EXTRACTION or fallback)",
     )
-    | prompt
-    | chat
-    | StrOutputParser()
-)
-
-# # TEST it all out!
-# res_simple = chain.invoke(
-#     {
-#         "question": "How did the Roman empire fall?",
-#     }
-# )
-
-# print(f"\n Results === {res_simple}\n\n")
-
-res_hist = chain.invoke(
-    {
-        "question": "When did he become the first emperor?",
-        "chat_history": [
-            ("Who was the first emperor?", "Augustus was the first emperor.")
-        ],
-    }
-)
-
-print(f"\n === {res_hist}\n\n")
\ No newline at end of file
+    commands = parser.add_subparsers(dest="command")
+    ingest_parser = commands.add_parser("ingest", help="load, extract and index the Wikipedia pages")
+    ingest_parser.add_argument("--max-pages", type=int, default=WIKIPEDIA_MAX_PAGES)
+    ask_parser = commands.add_parser("ask", help="answer one question from the existing graph and indexes")
+    ask_parser.add_argument("question")
+    serve_parser = commands.add_parser("serve", help="answer questions read from stdin, one per line")
+    serve_parser.add_argument("--max-concurrency", type=int, default=SERVE_MAX_CONCURRENCY)
+    args = parser.parse_args()
+
+    try:
+        if args.command == "ingest":
+            run_ingest(args.max_pages)
+        elif args.command == "ask":
+            rag, question_cache, _ = start(args.refresh_schema, args.entity_extraction)
+            print(f"\n === {ask(rag, args.question)}\n\n")
+        elif args.command == "serve":
+            serve(args.refresh_schema, args.entity_extraction, args.max_concurrency)
+        else:
+            run_ingest()
+            rag, question_cache, _ = start()
+            # # TEST it all out!
+            res_hist = ask(
+                rag,
+                "When did he become the first emperor?",
+                chat_history=[("Who was the first emperor?", "Augustus was the first emperor.")],
+            )
+            print(f"\n === {res_hist}\n\n")
+            print(f"Question embedding cache: {question_cache.stats()}")
+    finally:
+        close_driver()
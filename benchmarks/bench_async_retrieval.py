@@ -0,0 +1,154 @@
+"""
+Retrieval and answer latency of GraphRAG (04_graph_rag+symantic_rag/graph_rag.py) with
+stand-ins that sleep like the graph, the vector index and the chat model do: graph then
+vector retrieval one after the other versus retriever (threads) and aretriever running both
+at once, aretriever
+when the vector side is past its timeout (the graph context still comes back), and many
+questions answered with chain.invoke in a loop versus chain.abatch.
+
+    python benchmarks/bench_async_retrieval.py --graph-ms 120 --vector-ms 180 --llm-ms 600 --questions 32
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+import warnings
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(BENCH_DIR, "..")
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "04_graph_rag+symantic_rag"))
+
+# GraphRAG builds the ChatOpenAI that condenses chat histories; no question here has one
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+from langchain_core.documents import Document
+from langchain_core.runnables import RunnableLambda
+
+from entity_gazetteer import EntityGazetteer
+from graph_rag import GraphRAG
+
+ENTITIES = ["Augustus", "Tiberius", "Nero", "Marcus Aurelius", "Roman Senate"]
+
+
+class SlowGraph:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def query(self, query, params=None):
+        time.sleep(self.latency)
+        if "__Entity__" in query:
+            return [{"id": entity} for entity in ENTITIES]
+        return [
+            {"index": entity["index"], "outputs": [f"{entity['query']} - RULED -> Rome"]}
+            for entity in params["entities"]
+        ]
+
+
+class SlowVectorIndex:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def documents(self, question, k):
+        return [Document(page_content=f"chunk {i} about {question}") for i in range(k)]
+
+    def similarity_search(self, question, k=4):
+        time.sleep(self.latency)
+        return self.documents(question, k)
+
+    async def asimilarity_search(self, question, k=4):
+        await asyncio.sleep(self.latency)
+        return self.documents(question, k)
+
+
+def slow_chat(latency):
+    async def answer(_):
+        await asyncio.sleep(latency)
+        return "An answer."
+
+    def answer_sync(_):
+        time.sleep(latency)
+        return "An answer."
+
+    chat = RunnableLambda(answer_sync, afunc=answer)
+    chat.with_structured_output = lambda schema: RunnableLambda(lambda _: schema(names=[]))
+    return chat
+
+
+def build(graph_ms, vector_ms, llm_ms, vector_timeout):
+    kg = SlowGraph(graph_ms / 1000)
+    return GraphRAG(
+        kg,
+        SlowVectorIndex(vector_ms / 1000),
+        slow_chat(llm_ms / 1000),
+        EntityGazetteer.from_graph(kg),
+        entity_extraction="local",
+        vector_timeout=vector_timeout,
+    )
+
+
+def timed(function, repeats):
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies), result
+
+
+def questions(count):
+    return [f"What did {ENTITIES[i % len(ENTITIES)]} do in year {i}?" for i in range(count)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark concurrent graph + vector retrieval.")
+    parser.add_argument("--graph-ms", type=float, default=120)
+    parser.add_argument("--vector-ms", type=float, default=180)
+    parser.add_argument("--llm-ms", type=float, default=600)
+    parser.add_argument("--questions", type=int, default=32)
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    rag = build(args.graph_ms, args.vector_ms, args.llm_ms, vector_timeout=10)
+    question = questions(1)[0]
+    with contextlib.redirect_stdout(io.StringIO()):
+        sequential_ms, _ = timed(
+            lambda: (rag.structured_retriever(question), rag.vector_index.similarity_search(question)), args.repeats
+        )
+        concurrent_ms, _ = timed(lambda: asyncio.run(rag.aretriever(question)), args.repeats)
+        threads_ms, _ = timed(lambda: rag.retriever(question), args.repeats)
+        # The vector side now takes longer than its timeout: the answer waits for the timeout only
+        slow = build(args.graph_ms, args.vector_ms * 10, args.llm_ms, vector_timeout=args.vector_ms * 2 / 1000)
+        partial_ms, partial = timed(lambda: asyncio.run(slow.aretriever(question)), args.repeats)
+
+        batch = [{"question": q} for q in questions(args.questions)]
+        start = time.perf_counter()
+        for inputs in batch:
+            rag.chain.invoke(inputs)
+        invoke_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        asyncio.run(rag.chain.abatch(batch, config={"max_concurrency": args.max_concurrency}))
+        abatch_seconds = time.perf_counter() - start
+
+    print("| retrieval | p50 ms | graph context | vector context |")
+    print("|---|---|---|---|")
+    print(f"| graph then vector | {sequential_ms:.0f} | yes | yes |")
+    print(f"| aretriever (concurrent) | {concurrent_ms:.0f} | yes | yes |")
+    print(f"| retriever (concurrent, threads) | {threads_ms:.0f} | yes | yes |")
+    print(
+        f"| aretriever, vector past timeout | {partial_ms:.0f} | {'yes' if 'RULED' in partial else 'no'} | "
+        f"{'yes' if 'chunk' in partial else 'no'} |"
+    )
+    print()
+    print("| answering | questions | seconds | questions/sec |")
+    print("|---|---|---|---|")
+    print(f"| chain.invoke loop | {len(batch)} | {invoke_seconds:.2f} | {len(batch) / invoke_seconds:.1f} |")
+    print(
+        f"| chain.abatch (max_concurrency {args.max_concurrency}) | {len(batch)} | {abatch_seconds:.2f} | "
+        f"{len(batch) / abatch_seconds:.1f} |"
+    )
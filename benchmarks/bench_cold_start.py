@@ -0,0 +1,104 @@
+"""
+Cold-start benchmark for roman_emp_graph_rag.py. Each measurement is a fresh Python process:
+the imports the query side needs (graph_rag.py) versus the ones the old all-in-one script
+loaded before it could answer anything, and the CLI itself. With --live it also starts
+`serve` against the database in .env (which must have been ingested) and reports the time
+to ready with the schema snapshot and with a full schema refresh.
+
+    python benchmarks/bench_cold_start.py --runs 5
+    python benchmarks/bench_cold_start.py --runs 5 --live
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(BENCH_DIR, "..")
+GRAPH_RAG_DIR = os.path.join(ROOT, "04_graph_rag+symantic_rag")
+SCRIPT = os.path.join(GRAPH_RAG_DIR, "roman_emp_graph_rag.py")
+
+IMPORTS = {
+    # What ask/serve import before connecting
+    "serve (graph_rag)": ["graph_rag"],
+    # What the script imported at the top before the split, ingest included
+    "all-in-one (ingest + serve)": [
+        "langchain_text_splitters",
+        "langchain_experimental.graph_transformers",
+        "ingest_pipeline",
+        "entity_resolution",
+        "extraction_cache",
+        "fake_llm",
+        "embed_documents",
+        "graph_rag",
+    ],
+}
+
+IMPORT_SNIPPET = """
+import sys, time
+sys.path[:0] = [{root!r}, {graph_rag_dir!r}]
+start = time.perf_counter()
+for module in {modules!r}:
+    __import__(module)
+print(time.perf_counter() - start)
+"""
+
+
+def run(command, stdin=subprocess.DEVNULL):
+    """Returns (wall seconds, completed process) for one fresh process."""
+    start = time.perf_counter()
+    process = subprocess.run(command, stdin=stdin, capture_output=True, text=True, cwd=GRAPH_RAG_DIR)
+    elapsed = time.perf_counter() - start
+    if process.returncode != 0:
+        raise RuntimeError(f"{command} failed:\n{process.stderr[-2000:]}")
+    return elapsed, process
+
+
+def time_imports(modules, runs):
+    snippet = IMPORT_SNIPPET.format(root=ROOT, graph_rag_dir=GRAPH_RAG_DIR, modules=modules)
+    walls, imports = [], []
+    for _ in range(runs):
+        wall, process = run([sys.executable, "-c", snippet])
+        walls.append(wall)
+        imports.append(float(process.stdout.strip().splitlines()[-1]))
+    return statistics.median(imports), statistics.median(walls)
+
+
+def time_serve(runs, refresh_schema):
+    """Starts serve with no questions (stdin at EOF): time to "Ready" and to process exit."""
+    command = [sys.executable, SCRIPT] + (["--refresh-schema"] if refresh_schema else []) + ["serve"]
+    walls, ready = [], []
+    for _ in range(runs):
+        wall, process = run(command)
+        walls.append(wall)
+        ready.append(float(re.search(r"Ready in ([\d.]+)s", process.stderr).group(1)))
+    return statistics.median(ready), statistics.median(walls)
+
+
+def print_table(results):
+    print("| startup | ready / import s (median) | process wall s (median) |")
+    print("|---|---|---|")
+    for label, inner, wall in results:
+        print(f"| {label} | {inner:.2f} | {wall:.2f} |")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the cold start of the Roman Empire graph RAG.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--live", action="store_true", help="also start serve against the database in .env")
+    args = parser.parse_args()
+
+    results = []
+    for label, modules in IMPORTS.items():
+        results.append((f"import {label}", *time_imports(modules, args.runs)))
+        print(f"{label}: {results[-1][1]:.2f}s", file=sys.stderr)
+    _, cli_wall = time_imports([], 1)
+    wall = statistics.median(run([sys.executable, SCRIPT, "--help"])[0] for _ in range(args.runs))
+    results.append(("CLI --help", wall - cli_wall, wall))
+    if args.live:
+        results.append(("serve, schema snapshot", *time_serve(args.runs, refresh_schema=False)))
+        results.append(("serve, schema refresh", *time_serve(args.runs, refresh_schema=True)))
+    print_table(results)
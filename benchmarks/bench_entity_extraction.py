@@ -0,0 +1,154 @@
+"""
+Question entity extraction: the local gazetteer (04_graph_rag+symantic_rag/entity_gazetteer.py)
+versus the entity_chain LLM call. Generates questions that mention one to three synthetic
+entities, written the way users do (lower case, titles, possessives, a dropped letter), and
+reports build time, incremental-update time, per-question latency and recall/precision
+against the known entities. With --llm it also runs the same questions through entity_chain
+(gpt-4o-mini, needs OPENAI_API_KEY).
+
+    python benchmarks/bench_entity_extraction.py --entities 1000 10000 50000 --questions 2000
+    python benchmarks/bench_entity_extraction.py --entities 1000 --questions 50 --llm
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import warnings
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(BENCH_DIR, "..")
+sys.path.append(BENCH_DIR)
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "04_graph_rag+symantic_rag"))
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+from bench_entity_resolution import name
+from entity_gazetteer import EntityGazetteer
+from entity_resolution import normalize_id, similarity
+
+TEMPLATES = [
+    "Who was {0}?",
+    "What did {0} do after the death of {1}?",
+    "How was {0} related to {1} and {2}?",
+    "Tell me about {0}'s campaigns.",
+    "When did {0} meet {1}?",
+]
+
+
+def mention(entity, rng):
+    """The entity as a user might write it."""
+    choice = rng.random()
+    if choice < 0.3:
+        return entity.lower()
+    if choice < 0.45:
+        return f"{rng.choice(['Emperor', 'General', 'Consul'])} {entity}"
+    if choice < 0.6:
+        # A dropped letter in the longest word
+        words = entity.split()
+        longest = max(range(len(words)), key=lambda i: len(words[i]))
+        i = rng.randrange(1, len(words[longest]))
+        words[longest] = words[longest][:i] + words[longest][i + 1 :]
+        return " ".join(words)
+    return entity
+
+
+def synthetic_entities(count, seed=0):
+    rng = random.Random(seed)
+    return list(dict.fromkeys(name(rng) for _ in range(count)))
+
+
+def synthetic_questions(entities, count, seed=1):
+    """Returns [(question, [entities mentioned])]."""
+    rng = random.Random(seed)
+    questions = []
+    for _ in range(count):
+        template = rng.choice(TEMPLATES)
+        mentioned = rng.sample(entities, template.count("{"))
+        questions.append((template.format(*(mention(entity, rng) for entity in mentioned)), mentioned))
+    return questions
+
+
+def score(found, expected, matches):
+    correct = sum(any(matches(name, entity) for name in found) for entity in expected)
+    relevant = sum(any(matches(name, entity) for entity in expected) for name in found)
+    return correct, relevant
+
+
+def run(extract, questions, matches):
+    latencies, correct, relevant, found_total, expected_total = [], 0, 0, 0, 0
+    for question, expected in questions:
+        start = time.perf_counter()
+        found = extract(question)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits, right = score(found, expected, matches)
+        correct += hits
+        relevant += right
+        found_total += len(found)
+        expected_total += len(expected)
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0],
+        "recall": correct / expected_total,
+        "precision": relevant / found_total if found_total else 1.0,
+    }
+
+
+def llm_matches(found, entity):
+    normalized = normalize_id(found)
+    return normalized == normalize_id(entity) or similarity(normalized, normalize_id(entity), 0.85)[0] >= 0.85
+
+
+def print_table(results):
+    print("| extractor | entities | build s | add 1% s | p50 ms | p95 ms | recall | precision |")
+    print("|---|---|---|---|---|---|---|---|")
+    for r in results:
+        print(
+            f"| {r['extractor']} | {r['entities']} | {r.get('build_seconds', 0):.2f} | {r.get('add_seconds', 0):.3f} | "
+            f"{r['p50_ms']:.3f} | {r['p95_ms']:.3f} | {r['recall']:.3f} | {r['precision']:.3f} |"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the entity gazetteer against LLM entity extraction.")
+    parser.add_argument("--entities", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--questions", type=int, default=1000)
+    parser.add_argument("--llm", action="store_true", help="also run entity_chain on the questions")
+    args = parser.parse_args()
+
+    results = []
+    for count in args.entities:
+        entities = synthetic_entities(count)
+        questions = synthetic_questions(entities, args.questions)
+        start = time.perf_counter()
+        gazetteer = EntityGazetteer(entities)
+        gazetteer.extract("")  # compiles the failure links
+        build_seconds = time.perf_counter() - start
+        # An ingest batch adding 1% more entities, then the next question rebuilds the links
+        start = time.perf_counter()
+        gazetteer.add(synthetic_entities(max(count // 100, 1), seed=2))
+        gazetteer.extract("")
+        add_seconds = time.perf_counter() - start
+        results.append({
+            "extractor": "gazetteer",
+            "entities": len(entities),
+            "build_seconds": build_seconds,
+            "add_seconds": add_seconds,
+            **run(gazetteer.extract, questions, lambda found, entity: found == entity),
+        })
+        print(f"{count} entities: gazetteer done", file=sys.stderr)
+        if args.llm:
+            from langchain_openai import ChatOpenAI
+
+            from graph_rag import ENTITY_PROMPT, OPENAI_API_KEY, Entities
+
+            chat = ChatOpenAI(api_key=OPENAI_API_KEY, temperature=0, model="gpt-4o-mini")
+            entity_chain = ENTITY_PROMPT | chat.with_structured_output(Entities)
+            results.append({
+                "extractor": "entity_chain (LLM)",
+                "entities": len(entities),
+                **run(lambda question: entity_chain.invoke({"question": question}).names, questions, llm_matches),
+            })
+    print_table(results)
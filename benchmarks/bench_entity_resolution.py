@@ -0,0 +1,159 @@
+"""
+Entity-resolution benchmark. Generates graph documents over synthetic person names with
+the variants LLM extraction produces (titles, case, punctuation, typos, surname only) and
+reports merges, merge precision/recall against the known truth, comparisons made versus
+all pairs, and time. It also checks named cases (regnal numbers, dynasties, titles) against
+their expected outcome, with the first name already in the graph (seeded) as on a re-run.
+
+    python benchmarks/bench_entity_resolution.py --entities 1000 10000 50000
+"""
+import argparse
+import os
+import random
+import sys
+import warnings
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(BENCH_DIR, "..")
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "04_graph_rag+symantic_rag"))
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+from langchain_community.graphs.graph_document import GraphDocument, Node, Relationship
+from langchain_core.documents import Document
+
+from entity_resolution import EntityResolver
+
+SYLLABLES = ["au", "gus", "tus", "ma", "rcus", "ju", "li", "us", "ti", "be", "ri", "ne", "ro", "cla", "di",
+             "ha", "dri", "an", "tra", "ja", "ver", "pa", "sia", "cor", "ne", "li", "quin", "tus", "fa", "bi"]
+
+
+# (name already in the graph, name extracted later, type, should they be one entity)
+CASES = [
+    ("Constantine I", "Constantine II", "Person", False),
+    ("Theodosius I", "Theodosius II", "Person", False),
+    ("Valentinian II", "Valentinian III", "Person", False),
+    ("Constantine I", "Constantine", "Person", False),
+    ("Legio X", "Legio IX", "Organization", False),
+    ("Constantine II", "Emperor Constantine II", "Person", True),
+    ("Constantine II", "constantine ii.", "Person", True),
+    ("Julio-Claudian dynasty", "Julio-Claudian Dynasty", "Organization", True),
+    ("Julio-Claudian dynasty", "Julio Claudian dynasty", "Organization", True),
+    ("Flavian dynasty", "Severan dynasty", "Organization", False),
+    ("Theodosian dynasty", "Theodosius I", "Organization", False),
+    ("Nerva-Antonine dynasty", "Antonine dynasty", "Organization", True),
+    ("Marcus Aurelius Antoninus", "Marcus Aurelius", "Person", True),
+    ("Augustus", "Emperor Augustus", "Person", True),
+]
+
+
+def run_cases(threshold):
+    """Returns [(case, merged)], each resolved by a resolver seeded with the case's first name."""
+    results = []
+    for known, new, entity_type, expected in CASES:
+        resolver = EntityResolver(threshold=threshold)
+        resolver.seed([(known, entity_type)])
+        document = GraphDocument(nodes=[Node(id=new, type=entity_type)], relationships=[],
+                                 source=Document(page_content=""))
+        merged = resolver.resolve([document])[0].nodes[0].id == known
+        results.append(((known, new, entity_type, expected), merged))
+    return results
+
+
+def print_cases(results):
+    print("| in graph | extracted | expected | got | ok |")
+    print("|---|---|---|---|---|")
+    for (known, new, _, expected), merged in results:
+        outcome = lambda value: "merge" if value else "keep apart"
+        print(f"| {known} | {new} | {outcome(expected)} | {outcome(merged)} | {'yes' if merged == expected else 'NO'} |")
+
+
+def name(rng):
+    return " ".join(
+        "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize() for _ in range(2)
+    )
+
+
+def variant(base, rng):
+    choice = rng.random()
+    if choice < 0.25:
+        return f"{rng.choice(['Emperor', 'General', 'Consul'])} {base}"
+    if choice < 0.45:
+        return base.upper() if rng.random() < 0.5 else base.lower()
+    if choice < 0.6:
+        return base.replace(" ", ". ", 1) + "."
+    if choice < 0.8:
+        i = rng.randrange(1, len(base) - 1)
+        return base[:i] + base[i + 1 :] if base[i] != " " else base
+    return base
+
+
+def synthetic_documents(entities, variants_per_entity=3, nodes_per_document=20, seed=0):
+    """Returns (graph documents, {surface id: base name})."""
+    rng = random.Random(seed)
+    bases = list(dict.fromkeys(name(rng) for _ in range(entities)))
+    truth = {}
+    mentions = []
+    for base in bases:
+        for surface in {base, *(variant(base, rng) for _ in range(variants_per_entity))}:
+            truth.setdefault(surface, base)
+            mentions.append(surface)
+    rng.shuffle(mentions)
+    documents = []
+    for offset in range(0, len(mentions), nodes_per_document):
+        nodes = [Node(id=surface, type="Person") for surface in mentions[offset : offset + nodes_per_document]]
+        relationships = [Relationship(source=a, target=b, type="KNEW") for a, b in zip(nodes, nodes[1:])]
+        documents.append(GraphDocument(nodes=nodes, relationships=relationships, source=Document(page_content="")))
+    return documents, truth
+
+
+def evaluate(resolver, truth):
+    """Merge precision: merged ids that joined the right group; recall: duplicates that were merged."""
+    groups = {}
+    for (surface, _), index in resolver._mapping.items():
+        groups.setdefault(index, []).append(surface)
+    merged = correct = 0
+    for members in groups.values():
+        canonical_base = truth[resolver._canonical[resolver._mapping[(members[0], "Person")]][0]]
+        for surface in members:
+            if surface == resolver._canonical[resolver._mapping[(surface, "Person")]][0]:
+                continue
+            merged += 1
+            correct += truth[surface] == canonical_base
+    duplicates = len(truth) - len(set(truth.values()))
+    return correct / merged if merged else 1.0, correct / duplicates if duplicates else 1.0
+
+
+def print_table(results):
+    print("| entities | surface ids | canonical | merged | precision | recall | comparisons | all pairs | seconds |")
+    print("|---|---|---|---|---|---|---|---|---|")
+    for r in results:
+        print(
+            f"| {r['bases']} | {r['entities']} | {r['canonical']} | {r['merged']} | {r['precision']:.3f} | "
+            f"{r['recall']:.3f} | {r['comparisons']} | {r['all_pairs_comparisons']} | {r['seconds']:.2f} |"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark entity resolution on synthetic name variants.")
+    parser.add_argument("--entities", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--threshold", type=float, default=0.9)
+    parser.add_argument("--batch-documents", type=int, default=32, help="documents per resolve() call")
+    args = parser.parse_args()
+
+    results = []
+    for entities in args.entities:
+        documents, truth = synthetic_documents(entities)
+        resolver = EntityResolver(threshold=args.threshold)
+        for offset in range(0, len(documents), args.batch_documents):
+            resolver.resolve(documents[offset : offset + args.batch_documents])
+        precision, recall = evaluate(resolver, truth)
+        results.append({"bases": len(set(truth.values())), **resolver.stats(), "precision": precision, "recall": recall})
+        print(f"{entities} entities: {results[-1]['seconds']:.2f}s", file=sys.stderr)
+    print_table(results)
+    print()
+    cases = run_cases(args.threshold)
+    print_cases(cases)
+    failed = sum(merged != case[3] for case, merged in cases)
+    if failed:
+        sys.exit(f"{failed} named case(s) resolved against expectation")
@@ -0,0 +1,97 @@
+"""
+Offline graph-extraction benchmark. Runs LLMGraphTransformer on synthetic chunks with
+fake_llm.FakeExtractionLLM (fixed latency per call, optional simulated 429s) and compares
+the sequential convert_to_graph_documents with graph_extraction's concurrent, rate-limited
+stage at several concurrency levels.
+
+    python benchmarks/bench_extraction.py --chunks 200 --latency 0.5 --concurrency 1 8 32
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import warnings
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(BENCH_DIR, "..")
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "04_graph_rag+symantic_rag"))
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+from langchain_core.documents import Document
+from langchain_experimental.graph_transformers import LLMGraphTransformer
+
+from fake_llm import FakeExtractionLLM
+from graph_extraction import aextract_graph_documents
+
+NAMES = ["Augustus", "Julius Caesar", "Mark Antony", "Cleopatra", "Tiberius", "Nero", "Trajan", "Hadrian",
+         "Rome", "Egypt", "Gaul", "Carthage", "Senate", "Praetorian Guard", "Constantinople"]
+VERBS = ["defeated", "allied with", "ruled", "succeeded", "founded", "governed"]
+
+
+def synthetic_chunks(count, sentences=12, seed=0):
+    rng = random.Random(seed)
+    return [
+        Document(
+            page_content=" ".join(
+                f"{rng.choice(NAMES)} {rng.choice(VERBS)} {rng.choice(NAMES)}." for _ in range(sentences)
+            ),
+            metadata={"chunk": i},
+        )
+        for i in range(count)
+    ]
+
+
+def run_sequential(transformer, documents):
+    start = time.perf_counter()
+    graph_documents = transformer.convert_to_graph_documents(documents)
+    elapsed = time.perf_counter() - start
+    return graph_documents, {"seconds": elapsed, "documents_per_sec": len(documents) / elapsed, "retries": 0}
+
+
+def print_table(results):
+    print("| path | concurrency | chunks | seconds | chunks/sec | retries | rate-limit wait s | ordered |")
+    print("|---|---|---|---|---|---|---|---|")
+    for r in results:
+        print(
+            f"| {r['path']} | {r['concurrency']} | {r['chunks']} | {r['seconds']:.2f} | "
+            f"{r['documents_per_sec']:.2f} | {r['retries']} | {r.get('rate_limit_wait_seconds', 0.0):.1f} | "
+            f"{r['ordered']} |"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark concurrent graph extraction with a fake LLM.")
+    parser.add_argument("--chunks", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per fake LLM call")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of calls that raise a 429")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests-per-minute", type=int, default=3000)
+    parser.add_argument("--tokens-per-minute", type=int, default=2000000)
+    parser.add_argument("--sequential", action="store_true", help="also time convert_to_graph_documents")
+    args = parser.parse_args()
+
+    documents = synthetic_chunks(args.chunks)
+    results = []
+    if args.sequential:
+        transformer = LLMGraphTransformer(llm=FakeExtractionLLM(latency=args.latency))
+        graph_documents, stats = run_sequential(transformer, documents)
+        results.append({"path": "sequential", "concurrency": 1, "chunks": len(documents), "ordered": True, **stats})
+    for concurrency in args.concurrency:
+        llm = FakeExtractionLLM(latency=args.latency, rate_limit_rate=args.rate_limit_rate, seed=concurrency)
+        transformer = LLMGraphTransformer(llm=llm)
+        graph_documents, stats = asyncio.run(
+            aextract_graph_documents(
+                transformer,
+                documents,
+                max_concurrency=concurrency,
+                requests_per_minute=args.requests_per_minute,
+                tokens_per_minute=args.tokens_per_minute,
+            )
+        )
+        ordered = [g.source.metadata["chunk"] for g in graph_documents] == list(range(len(documents)))
+        results.append({"path": "concurrent", "concurrency": concurrency, "chunks": len(documents), "ordered": ordered, **stats})
+        print(f"concurrency {concurrency}: {stats['documents_per_sec']:.2f} chunks/sec", file=sys.stderr)
+    print_table(results)
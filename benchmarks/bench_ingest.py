@@ -0,0 +1,128 @@
+"""
+Offline ingest benchmark. Runs the healthcare loaders and the kg_simple writers against
+fake_neo4j.FakeDriver on synthetic CSV files and reports rows/sec, round trips/row,
+statements, parameter payload and peak Python memory.
+
+    python benchmarks/bench_ingest.py --rows 1000 100000 --latency-ms 1
+"""
+import argparse
+import contextlib
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(BENCH_DIR, "..")
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "01_simple_knowledge_graph"))
+sys.path.append(os.path.join(ROOT, "02_creating_knowledge_graph_using_csv"))
+
+import creating_healthcare_KG
+import kg_simple
+import neo4j_connection
+import streaming_ingest
+import triple_writer
+from fake_neo4j import FakeDriver
+from synthetic_csv import write_csv
+
+
+def healthcare_triples(csv_path):
+    """The healthcare CSV as triples, for the generic triple writer."""
+    with open(csv_path, mode="r", newline="") as file:
+        for row in csv.DictReader(file):
+            yield (row["Provider"], "HealthcareProvider", "TREATS", row["Patient"], "Patient")
+            yield (row["Provider"], "HealthcareProvider", "SPECIALIZES_IN", row["Specialization"], "Specialization")
+            yield (row["Provider"], "HealthcareProvider", "LOCATED_AT", row["Location"], "Location")
+
+
+# name -> (function(driver, csv_path, args), rows it writes for a CSV of n rows)
+PATHS = {
+    "row_by_row": (lambda driver, csv_path, args: creating_healthcare_KG.main(csv_path), lambda n: n),
+    "bulk": (
+        lambda driver, csv_path, args: creating_healthcare_KG.bulk_load(driver, csv_path, args.batch_size),
+        lambda n: n,
+    ),
+    "streaming": (
+        lambda driver, csv_path, args: streaming_ingest.streaming_load(
+            driver, csv_path, batch_size=args.batch_size, workers=args.workers
+        ),
+        lambda n: n,
+    ),
+    "triples": (
+        lambda driver, csv_path, args: triple_writer.write_triples(
+            driver, healthcare_triples(csv_path), args.batch_size, progress_every=0
+        ),
+        lambda n: n,
+    ),
+    "kg_simple": (lambda driver, csv_path, args: kg_simple.build_knowledge_graph(), lambda n: 4),
+    "kg_simple_batched": (lambda driver, csv_path, args: kg_simple.build_knowledge_graph_batched(), lambda n: 4),
+}
+
+
+def run_path(name, csv_path, rows, args):
+    function, rows_written = PATHS[name]
+    driver = FakeDriver(latency=args.latency_ms / 1000)
+    neo4j_connection.set_driver(driver)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        function(driver, csv_path, args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    written = rows_written(rows)
+    stats = driver.stats.as_dict()
+    return {
+        "path": name,
+        "rows": written,
+        "seconds": elapsed,
+        "rows_per_sec": written / elapsed if elapsed else 0.0,
+        "round_trips_per_row": stats["round_trips"] / written,
+        "statements": stats["statements"],
+        "payload_bytes": stats["payload_bytes"],
+        "peak_mib": peak / 2**20,
+    }
+
+
+def print_table(results):
+    print("| path | rows | rows/sec | round trips/row | statements | payload (KiB) | peak memory (MiB) |")
+    print("|---|---|---|---|---|---|---|")
+    for r in results:
+        print(
+            f"| {r['path']} | {r['rows']} | {r['rows_per_sec']:.0f} | {r['round_trips_per_row']:.3f} "
+            f"| {r['statements']} | {r['payload_bytes'] / 1024:.0f} | {r['peak_mib']:.1f} |"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the ingest paths against a fake Neo4j driver.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--paths", nargs="+", default=list(PATHS), choices=list(PATHS))
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated latency per round trip")
+    parser.add_argument("--batch-size", type=int, default=creating_healthcare_KG.DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=streaming_ingest.DEFAULT_WORKERS)
+    parser.add_argument(
+        "--row-by-row-limit", type=int, default=100000, help="skip row_by_row above this many rows"
+    )
+    parser.add_argument("--csv-dir", default=None, help="where synthetic CSV files are generated")
+    args = parser.parse_args()
+
+    csv_dir = args.csv_dir or tempfile.mkdtemp(prefix="healthcare-bench-")
+    results = []
+    for rows in args.rows:
+        csv_path = os.path.join(csv_dir, f"healthcare_{rows}.csv")
+        if not os.path.exists(csv_path):
+            write_csv(csv_path, rows)
+        for name in args.paths:
+            if name == "row_by_row" and rows > args.row_by_row_limit:
+                continue
+            if name.startswith("kg_simple") and rows != args.rows[0]:
+                continue
+            results.append(run_path(name, csv_path, rows, args))
+            print(f"{name} @ {rows} rows: {results[-1]['rows_per_sec']:.0f} rows/sec", file=sys.stderr)
+    print_table(results)
@@ -0,0 +1,129 @@
+"""
+Offline benchmark of the Wikipedia ingest: the old materialize-everything flow (split all
+pages, extract all chunks, then one add_graph_documents call) against ingest_pipeline's
+streaming stages. Uses synthetic pages, fake_llm.FakeExtractionLLM and a fake graph whose
+writes take a fixed time, and reports total time, time to the first write and peak Python
+memory.
+
+    python benchmarks/bench_ingest_pipeline.py --pages 100 1000 --latency 0.05
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import tracemalloc
+import warnings
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(BENCH_DIR, "..")
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "04_graph_rag+symantic_rag"))
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+from langchain_core.documents import Document
+from langchain_experimental.graph_transformers import LLMGraphTransformer
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from bench_extraction import NAMES, VERBS
+from fake_llm import FakeExtractionLLM
+from fake_neo4j import FakeDriver
+from graph_extraction import RateLimiter, aextract_graph_documents
+from ingest_pipeline import run_pipeline
+
+UNLIMITED = {"requests_per_minute": 10**9, "tokens_per_minute": 10**12}
+
+
+class FakeGraph:
+    """Neo4jGraph stand-in: add_graph_documents only sleeps write_latency and counts."""
+
+    def __init__(self, write_latency=0.0):
+        self.write_latency = write_latency
+        self._driver = FakeDriver()
+        self.writes = 0
+        self.documents = 0
+        self.first_write_at = None
+
+    def add_graph_documents(self, graph_documents, include_source=False, baseEntityLabel=False):
+        time.sleep(self.write_latency)
+        self.writes += 1
+        self.documents += len(graph_documents)
+        if self.first_write_at is None:
+            self.first_write_at = time.perf_counter()
+
+
+def synthetic_pages(count, chars=4000, seed=0):
+    """Yields pages about the size WikipediaLoader returns (doc_content_chars_max=4000)."""
+    rng = random.Random(seed)
+    for i in range(count):
+        sentences = []
+        while sum(len(s) + 1 for s in sentences) < chars:
+            sentences.append(f"{rng.choice(NAMES)} {rng.choice(VERBS)} {rng.choice(NAMES)} in year {rng.randint(1, 500)}.")
+        yield Document(page_content=" ".join(sentences), metadata={"page": i})
+
+
+def splitter_for(name):
+    if name == "tokens":
+        # Same splitter as roman_emp_graph_rag.py; tiktoken downloads its encoding on first use
+        from langchain_text_splitters import TokenTextSplitter
+
+        return TokenTextSplitter(chunk_size=512, chunk_overlap=24)
+    return RecursiveCharacterTextSplitter(chunk_size=2000, chunk_overlap=96)
+
+
+async def materialized(pages, splitter, transformer, graph, workers):
+    documents = splitter.split_documents(list(pages))
+    graph_documents, _ = await aextract_graph_documents(transformer, documents, max_concurrency=workers, **UNLIMITED)
+    graph.add_graph_documents(graph_documents, include_source=True, baseEntityLabel=True)
+
+
+async def streaming(pages, splitter, transformer, graph, workers):
+    await run_pipeline(pages, splitter, transformer, graph, extract_workers=workers, limiter=RateLimiter(**UNLIMITED))
+
+
+def run(path, page_count, args):
+    graph = FakeGraph(args.write_latency)
+    transformer = LLMGraphTransformer(llm=FakeExtractionLLM(latency=args.latency))
+    tracemalloc.start()
+    start = time.perf_counter()
+    asyncio.run(path(synthetic_pages(page_count), splitter_for(args.splitter), transformer, graph, args.workers))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "path": path.__name__,
+        "pages": page_count,
+        "chunks": graph.documents,
+        "seconds": elapsed,
+        "first_write": graph.first_write_at - start,
+        "writes": graph.writes,
+        "peak_mib": peak / 2**20,
+    }
+
+
+def print_table(results):
+    print("| path | pages | chunks | seconds | first write s | writes | peak memory (MiB) |")
+    print("|---|---|---|---|---|---|---|")
+    for r in results:
+        print(
+            f"| {r['path']} | {r['pages']} | {r['chunks']} | {r['seconds']:.2f} | {r['first_write']:.2f} | "
+            f"{r['writes']} | {r['peak_mib']:.1f} |"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the streaming ingest pipeline offline.")
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per fake LLM call")
+    parser.add_argument("--write-latency", type=float, default=0.05, help="seconds per add_graph_documents call")
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--splitter", choices=["chars", "tokens"], default="chars")
+    args = parser.parse_args()
+
+    results = []
+    for page_count in args.pages:
+        for path in (materialized, streaming):
+            results.append(run(path, page_count, args))
+            print(f"{path.__name__} @ {page_count} pages: {results[-1]['seconds']:.2f}s", file=sys.stderr)
+    print_table(results)
@@ -0,0 +1,98 @@
+"""
+Measures single-row MERGE latency against graph size with and without the schema from
+neo4j_schema.py. Runs against the database in .env and only touches nodes with the
+BenchProvider label, which it deletes when it is done.
+
+    python benchmarks/bench_merge_latency.py --sizes 1000 10000 100000 --samples 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from dotenv import load_dotenv
+from neo4j import GraphDatabase
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from neo4j_schema import drop_schema, ensure_schema
+
+load_dotenv()
+
+NEO4J_URI = os.environ["NEO4J_URI"]
+AUTH = (os.environ["NEO4J_USERNAME"], os.environ["NEO4J_PASSWORD"])
+
+BENCH_SCHEMA = {
+    "bench_provider_name": "CREATE CONSTRAINT bench_provider_name IF NOT EXISTS "
+    "FOR (n:BenchProvider) REQUIRE n.name IS UNIQUE",
+}
+
+
+def clear(driver):
+    with driver.session() as session:
+        session.run(
+            "MATCH (n:BenchProvider) CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS"
+        ).consume()
+
+
+def grow(driver, start, end, batch_size=10000):
+    """Adds BenchProvider nodes bench-<start> .. bench-<end - 1>."""
+    with driver.session() as session:
+        for offset in range(start, end, batch_size):
+            names = [f"bench-{i}" for i in range(offset, min(offset + batch_size, end))]
+            session.run("UNWIND $names AS name CREATE (:BenchProvider {name: name})", {"names": names}).consume()
+
+
+def merge_latencies(driver, size, samples):
+    """Times MERGEs on existing names (hits) and new names (misses) at the current size."""
+    latencies = []
+    with driver.session() as session:
+        for i in range(samples):
+            # Alternate between a name already in the graph and one that is not
+            name = f"bench-{(i * 7919) % size}" if i % 2 == 0 else f"bench-new-{size}-{i}"
+            start = time.perf_counter()
+            session.run("MERGE (n:BenchProvider {name: $name})", {"name": name}).consume()
+            latencies.append((time.perf_counter() - start) * 1000)
+        session.run("MATCH (n:BenchProvider) WHERE n.name STARTS WITH 'bench-new-' DELETE n").consume()
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+
+def run(driver, sizes, samples):
+    results = []
+    for indexed in (False, True):
+        clear(driver)
+        drop_schema(driver, BENCH_SCHEMA)
+        if indexed:
+            ensure_schema(driver, BENCH_SCHEMA)
+        current = 0
+        for size in sizes:
+            grow(driver, current, size)
+            current = size
+            p50, p95 = merge_latencies(driver, size, samples)
+            results.append((indexed, size, p50, p95))
+            print(f"indexed={indexed!s:5} nodes={size:>9} p50={p50:8.2f}ms p95={p95:8.2f}ms")
+    clear(driver)
+    drop_schema(driver, BENCH_SCHEMA)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MERGE latency vs graph size, with and without indexes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args()
+
+    driver = GraphDatabase.driver(NEO4J_URI, auth=AUTH)
+    try:
+        results = run(driver, sorted(args.sizes), args.samples)
+    finally:
+        driver.close()
+
+    print("\n| nodes | p50 no index (ms) | p50 indexed (ms) | speed-up |")
+    print("|---|---|---|---|")
+    by_size = {}
+    for indexed, size, p50, _ in results:
+        by_size.setdefault(size, {})[indexed] = p50
+    for size, p50 in sorted(by_size.items()):
+        print(f"| {size} | {p50[False]:.2f} | {p50[True]:.2f} | {p50[False] / p50[True]:.1f}x |")
@@ -0,0 +1,106 @@
+"""
+Compares the storage modes of quantized_index.QuantizedVectorIndex: memory per vector,
+batched queries/sec and recall@k against the exact cosine top-k (what the
+health_providers_embeddings queryNodes call in app.py returns). Offline it uses clustered
+synthetic vectors; with --live it uses the provider vectors of the database in .env.
+
+    python benchmarks/bench_quantized_search.py --size 50000 --queries 200 --top-k 10
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(BENCH_DIR, "..")
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "03_simple_rag_using_neo4jDB"))
+
+from local_vector_index import LocalVectorIndex, normalize
+from quantized_index import MODES, QuantizedVectorIndex
+
+
+def clustered_index(size, dimensions, clusters=64, seed=0):
+    """Vectors drawn around a few topics, closer to real embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dimensions), dtype=np.float32)
+    matrix = centres[rng.integers(clusters, size=size)] + 0.6 * rng.standard_normal((size, dimensions), dtype=np.float32)
+    return LocalVectorIndex([f"provider-{i}" for i in range(size)], [""] * size, [None] * size, normalize(matrix))
+
+
+def recall(results, exact):
+    fractions = []
+    for found, expected in zip(results, exact):
+        expected = {row["healthcare_provider.name"] for row in expected}
+        fractions.append(len(expected & {row["healthcare_provider.name"] for row in found}) / len(expected))
+    return statistics.mean(fractions)
+
+
+def run_mode(index, mode, queries, exact, top_k, rerank_factor, batch_size):
+    start = time.perf_counter()
+    quantized = QuantizedVectorIndex(index, mode, rerank_factor=rerank_factor)
+    build_seconds = time.perf_counter() - start
+    results = []
+    start = time.perf_counter()
+    for offset in range(0, len(queries), batch_size):
+        results += quantized.search_many(queries[offset : offset + batch_size], top_k)
+    elapsed = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "rerank": rerank_factor,
+        "bytes_per_vector": quantized.bytes_per_vector(),
+        "build_seconds": build_seconds,
+        "qps": len(queries) / elapsed,
+        "recall": recall(results, exact),
+    }
+
+
+def print_table(results, top_k):
+    print(f"| mode | rerank factor | bytes/vector | build s | queries/sec | recall@{top_k} |")
+    print("|---|---|---|---|---|---|")
+    for r in results:
+        print(
+            f"| {r['mode']} | {r['rerank']} | {r['bytes_per_vector']:.0f} | {r['build_seconds']:.2f} | "
+            f"{r['qps']:.0f} | {r['recall']:.3f} |"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark quantized vector storage modes.")
+    parser.add_argument("--size", type=int, default=50000)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    parser.add_argument("--rerank-factors", type=int, nargs="+", default=[0, 4])
+    parser.add_argument("--batch-size", type=int, default=64, help="queries per search_many call")
+    parser.add_argument("--live", action="store_true", help="use the provider vectors of the database in .env")
+    args = parser.parse_args()
+
+    if args.live:
+        from neo4j_connection import close_driver, get_driver
+
+        try:
+            index = LocalVectorIndex.open(get_driver())
+        finally:
+            close_driver()
+    else:
+        index = clustered_index(args.size, args.dimensions)
+
+    # Questions are perturbed copies of stored vectors, so each has real near neighbours
+    rng = np.random.default_rng(1)
+    picks = rng.integers(len(index), size=args.queries)
+    queries = normalize(
+        np.asarray(index.matrix[picks]) + 0.05 * rng.standard_normal((args.queries, index.matrix.shape[1]), dtype=np.float32)
+    )
+    exact = index.search_many(queries, args.top_k)
+
+    results = []
+    for mode in args.modes:
+        for rerank_factor in args.rerank_factors:
+            results.append(run_mode(index, mode, queries, exact, args.top_k, rerank_factor, args.batch_size))
+            print(f"{mode} (rerank {rerank_factor}): recall {results[-1]['recall']:.3f}", file=sys.stderr)
+    print_table(results, args.top_k)
@@ -0,0 +1,139 @@
+"""
+Structured-retrieval latency against the number of entities in a question: one fulltext
+lookup + neighborhood query per entity (the previous structured_retriever) versus the single
+UNWIND query of graph_rag.entity_neighborhoods. Offline it runs on the fake driver with a
+simulated round-trip latency; with --live it samples __Entity__ ids from the database in
+.env (ingested by roman_emp_graph_rag.py) and also checks both return the same triples.
+
+    python benchmarks/bench_structured_retrieval.py --entities 1 2 4 8 16 --latency 0.02
+    python benchmarks/bench_structured_retrieval.py --entities 1 2 4 8 16 --live
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import warnings
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(BENCH_DIR, "..")
+sys.path.append(BENCH_DIR)
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "04_graph_rag+symantic_rag"))
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+from fake_neo4j import FakeDriver
+from graph_rag import ENTITY_TRIPLE_LIMIT, entity_neighborhoods, generate_full_text_query
+
+# The query structured_retriever used to send once per entity
+PER_ENTITY_QUERY = """CALL db.index.fulltext.queryNodes('entity', $query, {limit:2})
+YIELD node,score
+CALL {
+  WITH node
+  MATCH (node)-[r:!MENTIONS]->(neighbor)
+  RETURN node.id + ' - ' + type(r) + ' -> ' + neighbor.id AS output
+  UNION ALL
+  WITH node
+  MATCH (node)<-[r:!MENTIONS]-(neighbor)
+  RETURN neighbor.id + ' - ' + type(r) + ' -> ' +  node.id AS output
+}
+RETURN output LIMIT 50
+"""
+
+SAMPLE_ENTITIES_QUERY = """
+MATCH (e:__Entity__)
+WHERE size(e.id) > 3
+RETURN e.id AS id ORDER BY rand() LIMIT $limit
+"""
+
+
+class FakeGraph:
+    """The kg.query() surface of Neo4jGraph on top of a FakeDriver."""
+
+    def __init__(self, driver):
+        self._driver = driver
+
+    def query(self, query, params=None):
+        with self._driver.session() as session:
+            return session.run(query, params or {}).data()
+
+
+def fake_triples(query):
+    return [f"{query} - RELATED_TO -> Neighbor {i}" for i in range(ENTITY_TRIPLE_LIMIT)]
+
+
+def fake_driver(latency):
+    driver = FakeDriver(latency=latency)
+    driver.respond(
+        "UNWIND $entities",
+        ["index", "outputs"],
+        lambda params: [(entity["index"], fake_triples(entity["query"])) for entity in params["entities"]],
+    )
+    driver.respond("$query", ["output"], lambda params: [(triple,) for triple in fake_triples(params["query"])])
+    return driver
+
+
+def per_entity_neighborhoods(kg, names):
+    return {name: [row["output"] for row in kg.query(PER_ENTITY_QUERY, {"query": generate_full_text_query(name)})]
+            for name in names}
+
+
+def time_retrieval(retrieve, kg, names, repeats):
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = retrieve(kg, names)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies), result
+
+
+def triples(neighborhoods):
+    return {output for outputs in neighborhoods.values() for output in outputs}
+
+
+def print_table(results):
+    print("| entities | per-entity ms | batched ms | speedup | per-entity triples | batched triples | same triples |")
+    print("|---|---|---|---|---|---|---|")
+    for r in results:
+        print(
+            f"| {r['entities']} | {r['per_entity_ms']:.1f} | {r['batched_ms']:.1f} | "
+            f"{r['per_entity_ms'] / r['batched_ms']:.1f}x | {r['per_entity_triples']} | {r['batched_triples']} | "
+            f"{r['same_triples']} |"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per-entity vs batched structured retrieval.")
+    parser.add_argument("--entities", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02, help="fake driver seconds per round trip")
+    parser.add_argument("--live", action="store_true", help="run against the database in .env")
+    args = parser.parse_args()
+
+    if args.live:
+        from neo4j_connection import close_driver, get_graph
+
+        kg = get_graph(refresh_schema=False)
+        sample = [row["id"] for row in kg.query(SAMPLE_ENTITIES_QUERY, {"limit": max(args.entities)})]
+    else:
+        kg = FakeGraph(fake_driver(args.latency))
+        sample = [f"Entity {i}" for i in range(max(args.entities))]
+
+    try:
+        results = []
+        for count in args.entities:
+            names = sample[:count]
+            per_entity_ms, per_entity = time_retrieval(per_entity_neighborhoods, kg, names, args.repeats)
+            batched_ms, batched = time_retrieval(entity_neighborhoods, kg, names, args.repeats)
+            results.append({
+                "entities": len(names),
+                "per_entity_ms": per_entity_ms,
+                "batched_ms": batched_ms,
+                "per_entity_triples": sum(len(outputs) for outputs in per_entity.values()),
+                "batched_triples": sum(len(outputs) for outputs in batched.values()),
+                "same_triples": triples(per_entity) == triples(batched),
+            })
+        print_table(results)
+    finally:
+        if args.live:
+            close_driver()
@@ -0,0 +1,119 @@
+"""
+Compares top-k provider search in the local vector index (03_simple_rag_using_neo4jDB/
+local_vector_index.py) with db.index.vector.queryNodes. Offline it times the local index on
+random synthetic vectors; with --live it also runs the same query vectors against the
+health_providers_embeddings index of the database in .env and reports the top-k overlap.
+
+    python benchmarks/bench_vector_search.py --sizes 1000 10000 100000 --queries 256
+    python benchmarks/bench_vector_search.py --live --queries 64
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(BENCH_DIR, "..")
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "03_simple_rag_using_neo4jDB"))
+
+from local_vector_index import LocalVectorIndex, normalize
+
+QUERY_NODES = """
+CALL db.index.vector.queryNodes('health_providers_embeddings', $top_k, $question_embedding)
+YIELD node AS healthcare_provider, score
+RETURN healthcare_provider.name, healthcare_provider.bio, score
+"""
+
+
+def synthetic_index(size, dimensions, seed=0):
+    rng = np.random.default_rng(seed)
+    names = [f"provider-{i}" for i in range(size)]
+    matrix = normalize(rng.standard_normal((size, dimensions), dtype=np.float32))
+    return LocalVectorIndex(names, [""] * size, [None] * size, matrix)
+
+
+def time_local(index, queries, top_k, batch_size):
+    """Returns (p50 ms per single query, queries/sec when searched batch_size at a time)."""
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+    start = time.perf_counter()
+    for offset in range(0, len(queries), batch_size):
+        index.search_many(queries[offset : offset + batch_size], top_k)
+    elapsed = time.perf_counter() - start
+    return statistics.median(latencies), len(queries) / elapsed
+
+
+def time_database(driver, queries, top_k):
+    """Returns (p50 ms per query, result rows per query) for queryNodes with a client-side vector."""
+    latencies, results = [], []
+    with driver.session() as session:
+        for query in queries:
+            start = time.perf_counter()
+            rows = session.run(QUERY_NODES, {"top_k": top_k, "question_embedding": query.tolist()}).data()
+            latencies.append((time.perf_counter() - start) * 1000)
+            results.append(rows)
+    return statistics.median(latencies), results
+
+
+def overlap(local_results, database_results):
+    """Mean fraction of the database's top-k names that the local index also returned."""
+    fractions = []
+    for local, database in zip(local_results, database_results):
+        expected = {row["healthcare_provider.name"] for row in database}
+        found = {row["healthcare_provider.name"] for row in local}
+        fractions.append(len(expected & found) / len(expected) if expected else 1.0)
+    return statistics.mean(fractions)
+
+
+def print_table(results):
+    print("| source | vectors | p50 ms/query | batched queries/sec | top-k overlap with DB |")
+    print("|---|---|---|---|---|")
+    for r in results:
+        print(
+            f"| {r['source']} | {r['vectors']} | {r['p50_ms']:.3f} | "
+            f"{r['qps']:.0f} | {r.get('overlap', '')} |"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the local vector index against queryNodes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=256)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=64, help="queries per search_many call")
+    parser.add_argument("--live", action="store_true", help="benchmark the database in .env instead")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    results = []
+    if args.live:
+        from neo4j_connection import close_driver, get_driver
+
+        try:
+            driver = get_driver()
+            index = LocalVectorIndex.open(driver)
+            queries = normalize(rng.standard_normal((args.queries, index.matrix.shape[1]), dtype=np.float32))
+            p50, qps = time_local(index, queries, args.top_k, args.batch_size)
+            db_p50, db_results = time_database(driver, queries, args.top_k)
+            agreement = overlap(index.search_many(queries, args.top_k), db_results)
+            results.append({"source": "local", "vectors": len(index), "p50_ms": p50, "qps": qps,
+                            "overlap": f"{agreement:.3f}"})
+            results.append({"source": "queryNodes", "vectors": len(index), "p50_ms": db_p50,
+                            "qps": 1000 / db_p50 if db_p50 else 0.0})
+        finally:
+            close_driver()
+    else:
+        queries = normalize(rng.standard_normal((args.queries, args.dimensions), dtype=np.float32))
+        for size in args.sizes:
+            p50, qps = time_local(synthetic_index(size, args.dimensions), queries, args.top_k, args.batch_size)
+            results.append({"source": "local", "vectors": size, "p50_ms": p50, "qps": qps})
+            print(f"local @ {size} vectors: {qps:.0f} queries/sec", file=sys.stderr)
+    print_table(results)
@@ -0,0 +1,168 @@
+"""
+A local stand-in for the neo4j driver, used by the benchmarks to measure ingest paths
+without a database. It implements the parts of the driver API the scripts use and records
+every round trip, statement and parameter payload instead of executing Cypher.
+"""
+import json
+import threading
+import time
+
+from neo4j import Record
+
+
+class FakeStats:
+    """Thread-safe counters shared by every session of a FakeDriver."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.round_trips = 0
+        self.statements = 0
+        self.transactions = 0
+        self.payload_bytes = 0
+
+    def add(self, round_trips=0, statements=0, transactions=0, payload_bytes=0):
+        with self._lock:
+            self.round_trips += round_trips
+            self.statements += statements
+            self.transactions += transactions
+            self.payload_bytes += payload_bytes
+
+    def as_dict(self):
+        return {
+            "round_trips": self.round_trips,
+            "statements": self.statements,
+            "transactions": self.transactions,
+            "payload_bytes": self.payload_bytes,
+        }
+
+
+class FakeResult:
+    def __init__(self, keys=(), rows=()):
+        self._keys = list(keys)
+        self._records = [Record(zip(self._keys, row)) for row in rows]
+
+    def keys(self):
+        return self._keys
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def single(self):
+        return self._records[0] if self._records else None
+
+    def data(self):
+        return [record.data() for record in self._records]
+
+    def consume(self):
+        return None
+
+
+class FakeTransaction:
+    def __init__(self, driver):
+        self._driver = driver
+        self.closed = False
+
+    def run(self, query, parameters=None, **kwargs):
+        return self._driver._execute(query, parameters or kwargs)
+
+    def commit(self):
+        self._driver.stats.add(round_trips=1, transactions=1)
+        self._driver._wait()
+        self.closed = True
+
+    def rollback(self):
+        self.closed = True
+
+    def close(self):
+        if not self.closed:
+            self.rollback()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None and not self.closed:
+            self.commit()
+        self.close()
+
+
+class FakeSession:
+    def __init__(self, driver, **config):
+        self._driver = driver
+        self.config = config
+
+    def run(self, query, parameters=None, **kwargs):
+        # An auto-commit transaction: the statement and its commit share one round trip.
+        self._driver.stats.add(transactions=1)
+        return self._driver._execute(query, parameters or kwargs)
+
+    def begin_transaction(self, **kwargs):
+        return FakeTransaction(self._driver)
+
+    def _execute_transaction(self, work, *args, **kwargs):
+        tx = FakeTransaction(self._driver)
+        result = work(tx, *args, **kwargs)
+        tx.commit()
+        return result
+
+    execute_write = _execute_transaction
+    execute_read = _execute_transaction
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class FakeDriver:
+    """
+    Records round trips, statements and JSON-encoded parameter sizes, and sleeps latency
+    seconds per round trip to imitate network distance. respond() registers canned rows for
+    statements that contain a given text; SHOW INDEXES reports every requested index as ONLINE."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.stats = FakeStats()
+        self.statements = {}
+        self._responses = []
+        self._lock = threading.Lock()
+
+    def respond(self, contains, keys, rows):
+        """Returns keys/rows (or rows(parameters) if callable) for statements containing `contains`."""
+        self._responses.append((contains, keys, rows))
+
+    def session(self, **config):
+        return FakeSession(self, **config)
+
+    def verify_connectivity(self):
+        self.stats.add(round_trips=1)
+
+    def close(self):
+        pass
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _execute(self, query, parameters):
+        payload = len(json.dumps(parameters, default=str)) if parameters else 0
+        self.stats.add(round_trips=1, statements=1, payload_bytes=payload)
+        key = " ".join(query.split())
+        with self._lock:
+            self.statements[key] = self.statements.get(key, 0) + 1
+        self._wait()
+
+        if "SHOW INDEXES" in query:
+            names = (parameters or {}).get("names", [])
+            return FakeResult(["name", "state"], [(name, "ONLINE") for name in names])
+        for contains, keys, rows in self._responses:
+            if contains in query:
+                return FakeResult(keys, rows(parameters) if callable(rows) else rows)
+        return FakeResult()
@@ -0,0 +1,79 @@
+"""
+Generates healthcare CSV files of any size with the columns and value pools of
+02_creating_knowledge_graph_using_csv/healthcare.csv.
+
+    python benchmarks/synthetic_csv.py 1000000 /tmp/healthcare_1m.csv
+"""
+import argparse
+import csv
+import os
+import random
+
+HEALTHCARE_CSV = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "02_creating_knowledge_graph_using_csv", "healthcare.csv"
+)
+FIELDS = [
+    "Provider",
+    "Patient",
+    "Specialization",
+    "Location",
+    "Bio",
+    "Patient_Age",
+    "Patient_Gender",
+    "Patient_Condition",
+]
+ROWS_PER_PROVIDER = 200
+ROWS_PER_PATIENT = 3
+
+
+def value_pools(source=HEALTHCARE_CSV):
+    """Distinct values of each column in the sample CSV."""
+    pools = {field: set() for field in FIELDS}
+    with open(source, mode="r", newline="") as file:
+        for row in csv.DictReader(file):
+            for field in FIELDS:
+                pools[field].add(row[field])
+    return {field: sorted(values) for field, values in pools.items()}
+
+
+def synthetic_rows(rows, seed=0, source=HEALTHCARE_CSV):
+    """
+    Yields rows shaped like the sample CSV. The number of providers and patients grows with
+    rows, so the graph keeps a realistic ratio of distinct nodes to rows at every size."""
+    rng = random.Random(seed)
+    pools = value_pools(source)
+    providers = max(len(pools["Provider"]), rows // ROWS_PER_PROVIDER)
+    patients = max(len(pools["Patient"]), rows // ROWS_PER_PATIENT)
+    for _ in range(rows):
+        provider = rng.randrange(providers)
+        patient = rng.randrange(patients)
+        # A patient's attributes depend only on the patient, like a real extract
+        patient_rng = random.Random(patient)
+        yield {
+            "Provider": f"Dr. Provider {provider}",
+            "Patient": f"Patient {patient}",
+            "Specialization": pools["Specialization"][provider % len(pools["Specialization"])],
+            "Location": rng.choice(pools["Location"]),
+            "Bio": f"Dr. Provider {provider} {pools['Bio'][provider % len(pools['Bio'])].split(' ', 3)[-1]}",
+            "Patient_Age": str(patient_rng.randint(18, 90)),
+            "Patient_Gender": patient_rng.choice(pools["Patient_Gender"]),
+            "Patient_Condition": patient_rng.choice(pools["Patient_Condition"]),
+        }
+
+
+def write_csv(path, rows, seed=0):
+    """Writes a synthetic CSV with rows rows to path (streamed, so any size fits in memory)."""
+    with open(path, mode="w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(synthetic_rows(rows, seed))
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic healthcare CSV.")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("path")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_csv(args.path, args.rows, args.seed)
@@ -0,0 +1,90 @@
+import hashlib
+import math
+import os
+import re
+
+from dotenv import load_dotenv
+from langchain_core.embeddings import Embeddings
+
+load_dotenv()
+
+DEFAULT_OPENAI_MODEL = "text-embedding-ada-002"  # the model genai.vector.encode uses for "OpenAI"
+DEFAULT_DIMENSIONS = 1536
+
+TOKEN = re.compile(r"\w+")
+
+
+class OpenAIEmbedder:
+    """Embeds texts with the OpenAI embeddings API, one request per call to embed()."""
+
+    def __init__(self, model=DEFAULT_OPENAI_MODEL, dimensions=DEFAULT_DIMENSIONS, api_key=None, endpoint=None):
+        from langchain_openai import OpenAIEmbeddings
+
+        endpoint = endpoint or os.getenv("OPENAI_ENDPOINT")
+        # OPENAI_ENDPOINT is the full embeddings URL used by genai.vector.encode
+        base_url = re.sub(r"/embeddings/?$", "", endpoint) if endpoint else None
+        self.model = model
+        self.dimensions = dimensions
+        self._client = OpenAIEmbeddings(
+            model=model,
+            api_key=api_key or os.getenv("OPENAI_API_KEY"),
+            base_url=base_url,
+            # ada-002 has a fixed size; newer models are shortened to the index's dimensions
+            dimensions=None if model == DEFAULT_OPENAI_MODEL else dimensions,
+            chunk_size=2048,
+        )
+
+    def embed(self, texts):
+        return self._client.embed_documents(list(texts))
+
+
+class HashEmbedder:
+    """
+    Deterministic local stand-in for an embedding model. Words are hashed into a fixed number
+    of signed buckets and the vector is L2-normalized, so texts that share words are close
+    in cosine similarity. No network calls; used for offline runs and benchmarks."""
+
+    def __init__(self, dimensions=DEFAULT_DIMENSIONS, model="local-hash"):
+        self.model = model
+        self.dimensions = dimensions
+
+    def embed_one(self, text):
+        vector = [0.0] * self.dimensions
+        for token in TOKEN.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    def embed(self, texts):
+        return [self.embed_one(text) for text in texts]
+
+
+class LangChainEmbeddings(Embeddings):
+    """
+    Exposes an embedder through LangChain's Embeddings interface, e.g. for Neo4jVector. With
+    a question cache (see embedding_cache.QuestionEmbeddingCache), query embeddings go
+    through it."""
+
+    def __init__(self, embedder, question_cache=None):
+        self.embedder = embedder
+        self.question_cache = question_cache
+
+    def embed_documents(self, texts):
+        return self.embedder.embed(texts)
+
+    def embed_query(self, text):
+        if self.question_cache is not None:
+            return self.question_cache.embed_query(text)
+        return self.embedder.embed([text])[0]
+
+
+def get_embedder(name=None, **kwargs):
+    """Returns the embedder selected by name or the EMBEDDER environment variable ("openai" or "local")."""
+    name = (name or os.getenv("EMBEDDER", "openai")).lower()
+    if name == "openai":
+        return OpenAIEmbedder(**kwargs)
+    if name == "local":
+        return HashEmbedder(**kwargs)
+    raise ValueError(f"Unknown embedder: {name!r}")
@@ -0,0 +1,342 @@
+import atexit
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.getenv(
+    "EMBEDDING_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "embeddings")
+)
+DEFAULT_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "1000000"))
+INITIAL_CAPACITY = 1024
+# Seconds a process waits for another one's cache write to finish
+LOCK_TIMEOUT = 60
+TAG_BYTES = 16
+DEFAULT_QUESTION_ENTRIES = int(os.getenv("QUESTION_CACHE_MAX_ENTRIES", "4096"))
+DEFAULT_QUESTION_TTL = float(os.getenv("QUESTION_CACHE_TTL", "86400"))
+# Unset by default: the question cache then only lives as long as the process
+DEFAULT_QUESTION_CACHE_PATH = os.getenv("QUESTION_CACHE_PATH")
+
+
+def key_tag(key):
+    """The TAG_BYTES-byte tag stored next to a cached vector to check which key it belongs to."""
+    return np.frombuffer(hashlib.blake2b(key.encode("utf-8"), digest_size=TAG_BYTES).digest(), dtype=np.uint8)
+
+
+def content_key_prefix(model, dimensions):
+    """content_key(model, dimensions, text) is the SHA-256 hex digest of this prefix followed by text."""
+    return f"{model}\x1f{dimensions}\x1f"
+
+
+def content_key(model, dimensions, text):
+    """The cache key of a text: the same text embedded by the same model always maps to it."""
+    return hashlib.sha256(f"{content_key_prefix(model, dimensions)}{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    On-disk, content-addressed embedding store. Vectors of each dimension live in one
+    memory-mapped float32 file (vectors-<dimensions>.f32, one row per slot) and a SQLite
+    table maps content keys to slots. When a dimension holds max_entries vectors, the least
+    recently used slots are reused. Safe to share between threads of one process and between
+    processes using the same path: slots are allocated and written inside a SQLite write
+    transaction (BEGIN IMMEDIATE), so two writers never get the same slot, and every slot
+    carries a tag of the key its vector belongs to (tags-<dimensions>.u8). A reader only
+    returns a vector whose tag matches before and after it is copied, so a slot overwritten
+    meanwhile, or by a write that was rolled back, is a miss rather than a wrong vector."""
+
+    def __init__(self, path=DEFAULT_CACHE_DIR, max_entries=DEFAULT_MAX_ENTRIES):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._matrices = {}
+        self._db = sqlite3.connect(
+            os.path.join(path, "index.sqlite"), timeout=LOCK_TIMEOUT, check_same_thread=False
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, dimensions INTEGER NOT NULL, slot INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (dimensions, last_used)")
+        self._db.commit()
+
+    def _matrix(self, dimensions, rows=0):
+        """
+        Returns the (vectors, tags) memory maps for dimensions, growing the files to hold at
+        least rows rows. tags[slot] is the key_tag of the key whose vector is in vectors[slot]."""
+        maps = self._matrices.get(dimensions)
+        if maps is not None and maps[0].shape[0] >= rows:
+            return maps
+        vectors_file = os.path.join(self.path, f"vectors-{dimensions}.f32")
+        tags_file = os.path.join(self.path, f"tags-{dimensions}.u8")
+        row_bytes = dimensions * 4
+        size = os.path.getsize(vectors_file) if os.path.exists(vectors_file) else 0
+        capacity = size // row_bytes
+        if capacity < max(rows, 1):
+            capacity = max(rows, capacity * 2, INITIAL_CAPACITY)
+            if maps is not None:
+                for matrix in maps:
+                    matrix.flush()
+            with open(vectors_file, "ab") as file:
+                file.truncate(capacity * row_bytes)
+        # Files never shrink; slots of a file written before tags existed start untagged (misses)
+        if (os.path.getsize(tags_file) if os.path.exists(tags_file) else 0) < capacity * TAG_BYTES:
+            with open(tags_file, "ab") as file:
+                file.truncate(capacity * TAG_BYTES)
+        maps = (
+            np.memmap(vectors_file, dtype=np.float32, mode="r+", shape=(capacity, dimensions)),
+            np.memmap(tags_file, dtype=np.uint8, mode="r+", shape=(capacity, TAG_BYTES)),
+        )
+        self._matrices[dimensions] = maps
+        return maps
+
+    def _slots(self, keys, dimensions):
+        """Returns {key: slot} for the cached keys, querying in chunks below SQLite's variable limit."""
+        found = {}
+        for offset in range(0, len(keys), 500):
+            chunk = keys[offset : offset + 500]
+            found.update(
+                self._db.execute(
+                    f"SELECT key, slot FROM entries WHERE dimensions = ? AND key IN ({','.join('?' * len(chunk))})",
+                    [dimensions, *chunk],
+                ).fetchall()
+            )
+        return found
+
+    def get_many(self, keys, dimensions):
+        """Returns {key: vector} for the keys that are cached, and marks them as recently used."""
+        with self._lock:
+            found = self._slots(list(keys), dimensions)
+            if not found:
+                return {}
+            # Another process may have grown the files since they were mapped here
+            vectors, tags = self._matrix(dimensions, max(found.values()) + 1)
+            result = {}
+            for key, slot in found.items():
+                tag = key_tag(key)
+                if np.array_equal(tags[slot], tag):
+                    vector = np.array(vectors[slot])
+                    if np.array_equal(tags[slot], tag):
+                        result[key] = vector
+            if result:
+                now = time.time()
+                self._db.executemany("UPDATE entries SET last_used = ? WHERE key = ?", [(now, key) for key in result])
+                self._db.commit()
+            return result
+
+    def put_many(self, items, dimensions):
+        """Stores (key, vector) pairs, evicting the least recently used vectors when full."""
+        items = dict(items)
+        if not items:
+            return
+        with self._lock:
+            # Holds SQLite's write lock until commit, so other processes sharing the cache
+            # wait here instead of counting the same entries and taking the same slots
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._put_many(items, dimensions)
+                self._db.commit()
+            except BaseException:
+                self._db.rollback()
+                raise
+
+    def _put_many(self, items, dimensions):
+        """Allocates slots and writes the vectors; runs inside put_many's write transaction."""
+        slots = self._slots(list(items), dimensions)
+        new_keys = [key for key in items if key not in slots]
+        count = self._db.execute("SELECT count(*) FROM entries WHERE dimensions = ?", (dimensions,)).fetchone()[0]
+
+        # Slots stay dense: new vectors take the next free rows, then rows of evicted vectors
+        free = min(len(new_keys), max(self.max_entries - count, 0))
+        slots.update(zip(new_keys[:free], range(count, count + free)))
+        if len(new_keys) > free:
+            candidates = self._db.execute(
+                "SELECT key, slot FROM entries WHERE dimensions = ? ORDER BY last_used LIMIT ?",
+                (dimensions, len(new_keys) - free + len(slots)),
+            ).fetchall()
+            victims = [(key, slot) for key, slot in candidates if key not in items][: len(new_keys) - free]
+            self._db.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key, _ in victims])
+            slots.update(zip(new_keys[free:], (slot for _, slot in victims)))
+
+        vectors, tags = self._matrix(dimensions, max(slots.values()) + 1)
+        # Untag, write, retag: a reader copying a slot meanwhile sees its tag change and misses.
+        # If the transaction does not commit, the evicted keys still point at these slots but
+        # their tags no longer match, so they read as misses too.
+        rows = list(slots.values())
+        tags[rows] = 0
+        tags.flush()
+        for key, slot in slots.items():
+            vectors[slot] = items[key]
+        vectors.flush()
+        for key, slot in slots.items():
+            tags[slot] = key_tag(key)
+        tags.flush()
+        now = time.time()
+        self._db.executemany(
+            "INSERT OR REPLACE INTO entries (key, dimensions, slot, last_used) VALUES (?, ?, ?, ?)",
+            [(key, dimensions, slot, now) for key, slot in slots.items()],
+        )
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT count(*) FROM entries").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            for maps in self._matrices.values():
+                for matrix in maps:
+                    matrix.flush()
+            self._matrices.clear()
+            self._db.close()
+
+
+class CachedEmbedder:
+    """
+    Wraps an embedder (see embedders.py) with an EmbeddingCache. Only texts that are not in
+    the cache are sent to the wrapped embedder, once each, in a single call."""
+
+    def __init__(self, embedder, cache=None):
+        self.embedder = embedder
+        self.cache = cache if cache is not None else get_embedding_cache()
+        self.model = embedder.model
+        self.dimensions = embedder.dimensions
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def key(self, text):
+        return content_key(self.model, self.dimensions, text)
+
+    def embed(self, texts):
+        texts = list(texts)
+        keys = [self.key(text) for text in texts]
+        cached = self.cache.get_many(list(dict.fromkeys(keys)), self.dimensions)
+        missing = {key: text for key, text in zip(keys, texts) if key not in cached}
+        if missing:
+            vectors = self.embedder.embed(list(missing.values()))
+            fresh = dict(zip(missing, vectors))
+            self.cache.put_many(list(fresh.items()), self.dimensions)
+            cached.update(fresh)
+        misses = sum(1 for key in keys if key in missing)
+        with self._lock:
+            self.hits += len(texts) - misses
+            self.misses += misses
+        return [[float(value) for value in cached[key]] for key in keys]
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.cache)}
+
+
+def normalize_question(question):
+    """Case, surrounding punctuation and runs of whitespace do not change what is asked."""
+    return re.sub(r"\s+", " ", question.lower()).strip(" \t\n?!.,;:")
+
+
+class QuestionEmbeddingCache:
+    """
+    In-memory LRU cache from normalized question text to its embedding, in front of an
+    embedder. Entries expire after ttl seconds. With a path, the entries are loaded from
+    and saved to a .npz file, so a restart keeps the cache warm. stats() reports the hit
+    rate and the embedding time saved (hits times the mean time of a miss)."""
+
+    def __init__(
+        self,
+        embedder,
+        max_entries=DEFAULT_QUESTION_ENTRIES,
+        ttl=DEFAULT_QUESTION_TTL,
+        path=DEFAULT_QUESTION_CACHE_PATH,
+    ):
+        self.embedder = embedder
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self._entries = OrderedDict()  # normalized question -> (vector, expires_at as wall-clock time)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.miss_seconds = 0.0
+        if path:
+            self.load()
+            atexit.register(self.save)
+
+    def embed_query(self, question):
+        key = normalize_question(question)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(entry[0])
+            self._entries.pop(key, None)
+
+        start = time.perf_counter()
+        vector = self.embedder.embed([question])[0]
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.misses += 1
+            self.miss_seconds += elapsed
+            self._entries[key] = (vector, time.time() + self.ttl)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return list(vector)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with np.load(self.path) as data:
+            # Only entries for the current model are reused
+            if str(data["model"]) != f"{self.embedder.model}/{self.embedder.dimensions}":
+                return
+            now = time.time()
+            with self._lock:
+                for key, vector, expires_at in zip(data["keys"], data["vectors"], data["expires_at"]):
+                    if expires_at > now:
+                        self._entries[str(key)] = ([float(value) for value in vector], float(expires_at))
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            entries = list(self._entries.items())
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = os.path.join(directory, f".{os.path.basename(self.path)}.tmp.npz")
+        np.savez(
+            tmp_path,
+            model=np.array(f"{self.embedder.model}/{self.embedder.dimensions}"),
+            keys=np.array([key for key, _ in entries], dtype=str),
+            vectors=np.array([vector for _, (vector, _) in entries], dtype=np.float32).reshape(len(entries), self.embedder.dimensions),
+            expires_at=np.array([expires_at for _, (_, expires_at) in entries], dtype=np.float64),
+        )
+        os.replace(tmp_path, self.path)
+
+    def stats(self):
+        total = self.hits + self.misses
+        mean_miss = self.miss_seconds / self.misses if self.misses else 0.0
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+            "mean_miss_ms": mean_miss * 1000,
+            "saved_seconds": self.hits * mean_miss,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache():
+    """Returns the process-wide cache in EMBEDDING_CACHE_DIR, shared by every embedding path."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = EmbeddingCache()
+        return _cache
@@ -0,0 +1,89 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from embedding_cache import content_key
+
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_MAX_RETRIES = 5
+
+
+def stale_items(items, embedder, stats):
+    """
+    Takes (key, text, stored hash) tuples and yields (key, text, hash) for the ones whose stored
+    vector was not made from their current text by this embedder; the rest are counted as skipped."""
+    for key, text, embedding_hash in items:
+        text_hash = content_key(embedder.model, embedder.dimensions, text)
+        if text_hash == embedding_hash:
+            stats["skipped"] += 1
+        else:
+            yield key, text, text_hash
+
+
+def batches(items, batch_size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def embed_with_retries(embedder, texts, max_retries=DEFAULT_MAX_RETRIES):
+    """Calls embedder.embed(texts), retrying with exponential backoff (rate limits, timeouts)."""
+    for attempt in range(max_retries + 1):
+        try:
+            return embedder.embed(texts)
+        except Exception as e:
+            if attempt == max_retries:
+                raise
+            delay = min(2 ** attempt, 30)
+            print(f"Embedding batch failed ({e}); retrying in {delay}s")
+            time.sleep(delay)
+
+
+def run_embedding_job(
+    items,
+    embedder,
+    write_rows,
+    batch_size=DEFAULT_BATCH_SIZE,
+    max_concurrency=DEFAULT_MAX_CONCURRENCY,
+    max_retries=DEFAULT_MAX_RETRIES,
+):
+    """
+    Embeds the stale (key, text, stored hash) items in batches of batch_size and hands each
+    batch to write_rows as [{key, vector, hash}] rows. At most max_concurrency batches are being
+    embedded at once, and no more batches than that are read ahead. Returns the totals:
+    embedded, skipped, batches, seconds and embeddings/sec."""
+    stats = {"embedded": 0, "skipped": 0, "batches": 0}
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    def work(batch):
+        vectors = embed_with_retries(embedder, [text for _, text, _ in batch], max_retries)
+        rows = [{"key": key, "vector": vector, "hash": text_hash} for (key, _, text_hash), vector in zip(batch, vectors)]
+        write_rows(rows)
+        with lock:
+            stats["embedded"] += len(rows)
+            stats["batches"] += 1
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        pending = set()
+        for batch in batches(stale_items(items, embedder, stats), batch_size):
+            if len(pending) >= max_concurrency:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            pending.add(pool.submit(work, batch))
+        for future in pending:
+            future.result()
+
+    elapsed = time.perf_counter() - start
+    stats["seconds"] = elapsed
+    stats["embeddings_per_sec"] = stats["embedded"] / elapsed if elapsed else 0.0
+    if hasattr(embedder, "stats"):
+        stats["cache"] = embedder.stats()
+    return stats
@@ -0,0 +1,142 @@
+import atexit
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+from dotenv import load_dotenv
+from neo4j import GraphDatabase
+
+load_dotenv()
+
+# Pool settings, overridable from .env or with configure() before the first get_driver()
+SETTINGS = {
+    "max_connection_pool_size": int(os.getenv("NEO4J_MAX_POOL_SIZE", "50")),
+    "max_connection_lifetime": float(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "3000")),
+    "connection_acquisition_timeout": float(os.getenv("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", "60")),
+    "warm_up_connections": int(os.getenv("NEO4J_WARM_UP_CONNECTIONS", "1")),
+}
+
+# Where ingest stores the Neo4jGraph schema, so serving processes can skip the apoc.meta refresh
+SCHEMA_SNAPSHOT_PATH = os.getenv(
+    "GRAPH_SCHEMA_SNAPSHOT", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "graph_schema.json")
+)
+
+_driver = None
+_graph = None
+_lock = threading.Lock()
+
+
+def configure(**settings):
+    """
+    Overrides pool settings (max_connection_pool_size, max_connection_lifetime,
+    connection_acquisition_timeout, warm_up_connections). Must run before the driver is created."""
+    unknown = set(settings) - set(SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown connection settings: {sorted(unknown)}")
+    with _lock:
+        if _driver is not None:
+            raise RuntimeError("configure() must be called before the shared driver is created")
+        SETTINGS.update(settings)
+
+
+def warm_up(driver, connections):
+    """
+    Verifies connectivity and opens connections up front, so the first queries do not pay
+    for the TLS and auth handshakes."""
+    driver.verify_connectivity()
+    sessions = []
+    try:
+        for _ in range(max(connections, 0)):
+            session = driver.session() #database=NEO4J_DATABASE
+            sessions.append(session)
+            # The open transaction keeps its connection checked out, so the next one opens a new connection
+            session.begin_transaction().run("RETURN 1").consume()
+    finally:
+        for session in sessions:
+            session.close()
+
+
+def get_driver():
+    """Returns the process-wide pooled driver, creating and warming it up on first use."""
+    global _driver
+    if _driver is None:
+        with _lock:
+            if _driver is None:
+                driver = GraphDatabase.driver(
+                    os.environ["NEO4J_URI"],
+                    auth=(os.environ["NEO4J_USERNAME"], os.environ["NEO4J_PASSWORD"]),
+                    max_connection_pool_size=SETTINGS["max_connection_pool_size"],
+                    max_connection_lifetime=SETTINGS["max_connection_lifetime"],
+                    connection_acquisition_timeout=SETTINGS["connection_acquisition_timeout"],
+                )
+                warm_up(driver, SETTINGS["warm_up_connections"])
+                _driver = driver
+    return _driver
+
+
+def set_driver(driver):
+    """Installs an existing driver (or a stand-in with the same API) as the shared driver."""
+    global _driver, _graph
+    with _lock:
+        _driver = driver
+        _graph = None
+
+
+@contextmanager
+def session(**kwargs):
+    """Opens a session on the shared driver. Closing it returns the connection to the pool."""
+    with get_driver().session(**kwargs) as neo4j_session: #database=NEO4J_DATABASE
+        yield neo4j_session
+
+
+def get_graph(**kwargs):
+    """
+    Returns a process-wide LangChain Neo4jGraph that sends its queries through the shared
+    driver (see shared_graph.py). kwargs (refresh_schema, database, ...) are passed to
+    SharedDriverGraph the first time it is created."""
+    global _graph
+    if _graph is None:
+        from shared_graph import SharedDriverGraph
+
+        driver = get_driver()
+        with _lock:
+            if _graph is None:
+                _graph = SharedDriverGraph(driver, **kwargs) #database=NEO4J_DATABASE,
+    return _graph
+
+
+def save_schema_snapshot(graph, path=SCHEMA_SNAPSHOT_PATH):
+    """Writes graph.structured_schema and graph.schema to path (atomically), after a refresh_schema()."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"structured_schema": graph.structured_schema, "schema": graph.schema}, f)
+    os.replace(tmp, path)
+
+
+def load_schema_snapshot(graph, path=SCHEMA_SNAPSHOT_PATH):
+    """
+    Sets graph.structured_schema and graph.schema from a snapshot written by
+    save_schema_snapshot, for a graph created with refresh_schema=False. Returns False when
+    there is no snapshot (the schema stays empty)."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except FileNotFoundError:
+        return False
+    graph.structured_schema = snapshot["structured_schema"]
+    graph.schema = snapshot["schema"]
+    return True
+
+
+def close_driver():
+    """Closes the shared driver. The next get_driver() call opens a new one."""
+    global _driver, _graph
+    with _lock:
+        driver, _driver, _graph = _driver, None, None
+    if driver is not None:
+        driver.close()
+
+
+atexit.register(close_driver)
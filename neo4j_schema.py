@@ -0,0 +1,72 @@
+import time
+
+# Uniqueness constraints come with a backing range index, so MERGE and MATCH on these
+# properties become index seeks instead of label scans.
+HEALTHCARE_SCHEMA = {
+    "healthcare_provider_name": "CREATE CONSTRAINT healthcare_provider_name IF NOT EXISTS "
+    "FOR (n:HealthcareProvider) REQUIRE n.name IS UNIQUE",
+    "specialization_name": "CREATE CONSTRAINT specialization_name IF NOT EXISTS "
+    "FOR (n:Specialization) REQUIRE n.name IS UNIQUE",
+    "location_name": "CREATE CONSTRAINT location_name IF NOT EXISTS "
+    "FOR (n:Location) REQUIRE n.name IS UNIQUE",
+    # Patients are MERGEd on name, age, gender and condition. The composite constraint keeps
+    # concurrent writers (streaming_ingest.py routes rows by provider, not patient) from
+    # creating the same patient twice; several patients can still share a name, and the
+    # plain index serves lookups by name alone.
+    "patient_key": "CREATE CONSTRAINT patient_key IF NOT EXISTS "
+    "FOR (n:Patient) REQUIRE (n.name, n.age, n.gender, n.condition) IS UNIQUE",
+    "patient_name": "CREATE INDEX patient_name IF NOT EXISTS FOR (n:Patient) ON (n.name)",
+}
+
+KG_SIMPLE_SCHEMA = {
+    "person_name": "CREATE CONSTRAINT person_name IF NOT EXISTS FOR (n:Person) REQUIRE n.name IS UNIQUE",
+    "subject_name": "CREATE CONSTRAINT subject_name IF NOT EXISTS FOR (n:Subject) REQUIRE n.name IS UNIQUE",
+    "country_name": "CREATE CONSTRAINT country_name IF NOT EXISTS FOR (n:Country) REQUIRE n.name IS UNIQUE",
+    "nobel_prize_name": "CREATE CONSTRAINT nobel_prize_name IF NOT EXISTS "
+    "FOR (n:NobelPrize) REQUIRE n.name IS UNIQUE",
+}
+
+DEFAULT_TIMEOUT = 300
+
+
+def index_states(driver, names):
+    """Returns {index name: state} for the given index or constraint names."""
+    with driver.session() as session: #database=NEO4J_DATABASE
+        result = session.run(
+            """
+            SHOW INDEXES YIELD name, owningConstraint, state
+            WHERE name IN $names OR owningConstraint IN $names
+            RETURN coalesce(owningConstraint, name) AS name, state
+            """,
+            {"names": list(names)},
+        )
+        return {record["name"]: record["state"] for record in result}
+
+
+def ensure_schema(driver, schema, timeout=DEFAULT_TIMEOUT):
+    """
+    Creates the constraints and indexes in schema (a {name: statement} dict) if they do not
+    exist yet, waits for them to populate and checks that every one of them is ONLINE.
+    Safe to call before every load. Raises RuntimeError if an index is not ONLINE in time."""
+    with driver.session() as session: #database=NEO4J_DATABASE
+        for name, statement in schema.items():
+            session.run(statement).consume()
+
+    deadline = time.monotonic() + timeout
+    while True:
+        states = index_states(driver, schema)
+        pending = {name: states.get(name, "MISSING") for name in schema if states.get(name) != "ONLINE"}
+        if not pending:
+            print(f"Schema ready: {len(schema)} indexes ONLINE")
+            return states
+        if any(state == "FAILED" for state in pending.values()) or time.monotonic() > deadline:
+            raise RuntimeError(f"Indexes are not ONLINE: {pending}")
+        time.sleep(0.5)
+
+
+def drop_schema(driver, schema):
+    """Drops the constraints and indexes in schema. Used by the benchmarks to compare runs."""
+    with driver.session() as session: #database=NEO4J_DATABASE
+        for name, statement in schema.items():
+            kind = "CONSTRAINT" if statement.startswith("CREATE CONSTRAINT") else "INDEX"
+            session.run(f"DROP {kind} {name} IF EXISTS").consume()
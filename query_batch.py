@@ -0,0 +1,36 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+def run_queries(graph, queries, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+    """
+    Runs independent read queries concurrently on a thread pool of at most max_concurrency
+    threads. queries maps a name to a Cypher string or a (Cypher, params) pair, and graph is
+    anything with a Neo4jGraph-style query(cypher, params) method; each call borrows its own
+    pooled connection, so wall-clock time approaches that of the slowest query.
+
+    Returns (results, timings, wall_seconds): results and timings are dicts keyed by query
+    name, with the rows and the seconds each query took. The first failing query's exception
+    is raised after the others have finished."""
+    timings = {}
+    lock = threading.Lock()
+
+    def run(name, query):
+        cypher, params = query if isinstance(query, tuple) else (query, None)
+        start = time.perf_counter()
+        try:
+            return graph.query(cypher, params)
+        finally:
+            with lock:
+                timings[name] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(queries)))) as pool:
+        futures = {name: pool.submit(run, name, query) for name, query in queries.items()}
+    wall_seconds = time.perf_counter() - start
+
+    results = {name: future.result() for name, future in futures.items()}
+    return results, {name: timings[name] for name in queries}, wall_seconds
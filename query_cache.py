@@ -0,0 +1,196 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 64 * 2**20
+DEFAULT_TTL = 300.0
+DEFAULT_EPOCH_CHECK_INTERVAL = 5.0
+
+# The write epoch is shared through a small SQLite file next to the other caches, so ingest
+# scripts running in other processes invalidate the caches of every reader without storing
+# anything in the graph itself.
+DEFAULT_EPOCH_PATH = os.getenv(
+    "WRITE_EPOCH_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "write_epoch.sqlite")
+)
+
+WRITE_CLAUSES = re.compile(
+    r"\b(CREATE|MERGE|SET|DELETE|REMOVE|DROP|LOAD\s+CSV|FOREACH)\b|\bCALL\s+(db\.create|db\.index\.fulltext\.create|apoc\.(create|merge|refactor))",
+    re.IGNORECASE,
+)
+STRING_LITERALS = re.compile(r"('(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\")")
+
+_local_epoch = 0
+_epoch_lock = threading.Lock()
+
+
+def _epoch_db(path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    db = sqlite3.connect(path, timeout=60)
+    db.execute("CREATE TABLE IF NOT EXISTS epoch (id INTEGER PRIMARY KEY CHECK (id = 0), value INTEGER NOT NULL)")
+    db.execute("INSERT OR IGNORE INTO epoch (id, value) VALUES (0, 0)")
+    db.commit()
+    return db
+
+
+def read_write_epoch(path=DEFAULT_EPOCH_PATH):
+    """The shared write epoch: it only grows, by one for every bump_write_epoch in any process."""
+    with closing(_epoch_db(path)) as db:
+        return db.execute("SELECT value FROM epoch WHERE id = 0").fetchone()[0]
+
+
+def bump_write_epoch(path=DEFAULT_EPOCH_PATH):
+    """
+    Marks the graph as changed. Every cache in this process is invalidated immediately, and
+    the shared epoch in path is bumped, which invalidates caches in other processes within
+    their epoch check interval. Ingest paths call this after writing."""
+    global _local_epoch
+    with _epoch_lock:
+        _local_epoch += 1
+    with closing(_epoch_db(path)) as db, db:
+        db.execute("UPDATE epoch SET value = value + 1 WHERE id = 0")
+
+
+def normalize_cypher(query):
+    """Collapses whitespace outside string literals, so formatting does not split cache keys."""
+    parts = STRING_LITERALS.split(query)
+    return "".join(part if index % 2 else re.sub(r"\s+", " ", part) for index, part in enumerate(parts)).strip()
+
+
+def is_write_query(query):
+    return bool(WRITE_CLAUSES.search(STRING_LITERALS.sub("''", query)))
+
+
+class CachedGraph:
+    """
+    Wraps a LangChain Neo4jGraph and caches the results of read queries, keyed by normalized
+    Cypher, parameters and session parameters. Entries are evicted least-recently-used when max_entries or
+    max_bytes (approximate JSON size) is exceeded, expire after ttl seconds and are dropped
+    when the write epoch changes. Write queries pass through and bump the epoch. Other
+    attributes are forwarded to the wrapped graph."""
+
+    def __init__(
+        self,
+        graph,
+        max_entries=DEFAULT_MAX_ENTRIES,
+        max_bytes=DEFAULT_MAX_BYTES,
+        ttl=DEFAULT_TTL,
+        epoch_check_interval=DEFAULT_EPOCH_CHECK_INTERVAL,
+        epoch_path=DEFAULT_EPOCH_PATH,
+    ):
+        self.graph = graph
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.epoch_check_interval = epoch_check_interval
+        self.epoch_path = epoch_path
+        self._entries = OrderedDict()  # key -> (result, size, expires_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._epoch = None
+        self._remote_epoch = None
+        self._remote_checked_at = float("-inf")
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __getattr__(self, name):
+        return getattr(self.graph, name)
+
+    def _current_epoch(self):
+        """
+        Returns (local epoch, shared epoch). The shared epoch is read at most every
+        epoch_check_interval seconds, and never while holding self._lock."""
+        now = time.monotonic()
+        with self._lock:
+            remote = self._remote_epoch
+            due = self.epoch_check_interval is not None and (
+                remote is None or now - self._remote_checked_at >= self.epoch_check_interval
+            )
+            if due:
+                # Other threads keep using the last epoch until this check returns
+                self._remote_checked_at = now
+        if due:
+            remote = read_write_epoch(self.epoch_path)
+            with self._lock:
+                # A check that started before a newer one finished must not move it back
+                remote = self._remote_epoch = max(remote, self._remote_epoch or 0)
+        return (_local_epoch, remote or 0)
+
+    def _check_epoch(self, epoch):
+        """Moves self._epoch forward to epoch, dropping the entries if it changed; never moves it back."""
+        if self._epoch is not None:
+            epoch = tuple(max(new, old) for new, old in zip(epoch, self._epoch))
+        if epoch != self._epoch:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._epoch = epoch
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, size, _) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def query(self, query, params=None, session_params=None):
+        if is_write_query(query):
+            result = self.graph.query(query, params, session_params)
+            bump_write_epoch(self.epoch_path)
+            return result
+
+        key = (
+            normalize_cypher(query),
+            json.dumps(params or {}, sort_keys=True, default=str),
+            json.dumps(session_params or {}, sort_keys=True, default=str),
+        )
+        epoch = self._current_epoch()
+        with self._lock:
+            self._check_epoch(epoch)
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return [dict(row) for row in entry[0]]
+            if entry is not None:
+                self._bytes -= entry[1]
+                del self._entries[key]
+            self.misses += 1
+            epoch = self._epoch
+
+        result = self.graph.query(query, params, session_params)
+        size = len(json.dumps(result, default=str))
+        with self._lock:
+            # Results read while the epoch changed may be stale, so they are not cached
+            if size <= self.max_bytes and epoch == self._epoch:
+                previous = self._entries.pop(key, None)
+                if previous is not None:
+                    self._bytes -= previous[1]
+                self._entries[key] = (result, size, time.monotonic() + self.ttl)
+                self._bytes += size
+                self._evict()
+        return [dict(row) for row in result]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
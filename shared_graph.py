@@ -0,0 +1,30 @@
+import os
+
+from langchain_neo4j import Neo4jGraph
+
+
+class SharedDriverGraph(Neo4jGraph):
+    """
+    Neo4jGraph on an existing driver. Neo4jGraph.__init__ always opens, authenticates and
+    verifies a driver of its own; this sets up the same state on the shared pool instead,
+    so creating the graph costs no round trip unless refresh_schema is set. close() leaves
+    the driver open: it belongs to whoever created it (see neo4j_connection.close_driver)."""
+
+    def __init__(self, driver, database=None, timeout=None, sanitize=False, refresh_schema=True, enhanced_schema=False):
+        self._driver = driver
+        self._database = database or os.getenv("NEO4J_DATABASE", "neo4j")
+        self.timeout = timeout
+        self.sanitize = sanitize
+        self._enhanced_schema = enhanced_schema
+        self.schema = ""
+        self.structured_schema = {}
+        if refresh_schema:
+            self.refresh_schema()
+
+    @property
+    def driver(self):
+        return self._driver
+
+    def close(self):
+        if hasattr(self, "_driver"):
+            del self._driver
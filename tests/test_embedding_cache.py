@@ -0,0 +1,77 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from embedding_cache import EmbeddingCache
+
+
+def vector(value, dimensions=4):
+    return np.full(dimensions, value, dtype=np.float32)
+
+
+class FailingCommit:
+    """Wraps a sqlite3 connection and fails the next commit, like a crash before it."""
+
+    def __init__(self, db):
+        self._db = db
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+    def commit(self):
+        raise RuntimeError("crash before commit")
+
+
+def test_put_and_get(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put_many([("a", vector(1)), ("b", vector(2))], 4)
+
+    found = cache.get_many(["a", "b", "c"], 4)
+
+    assert set(found) == {"a", "b"}
+    np.testing.assert_array_equal(found["b"], vector(2))
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), max_entries=2)
+    cache.put_many([("a", vector(1))], 4)
+    cache.put_many([("b", vector(2))], 4)
+    cache.get_many(["a"], 4)  # b is now the least recently used
+    cache.put_many([("c", vector(3))], 4)
+
+    found = cache.get_many(["a", "b", "c"], 4)
+
+    assert set(found) == {"a", "c"}
+    np.testing.assert_array_equal(found["a"], vector(1))
+    np.testing.assert_array_equal(found["c"], vector(3))
+    assert len(cache) == 2
+
+
+def test_rolled_back_put_never_returns_the_wrong_vector(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), max_entries=1)
+    cache.put_many([("a", vector(1))], 4)
+    db = cache._db
+    cache._db = FailingCommit(db)
+    with pytest.raises(RuntimeError):
+        # Reuses a's slot, then fails before the index change is committed
+        cache.put_many([("b", vector(2))], 4)
+    cache._db = db
+
+    # The index still maps a to the slot, which now holds b's vector: a miss, not b's vector
+    assert cache.get_many(["a", "b"], 4) == {}
+
+
+def test_caches_sharing_a_path_see_each_others_vectors(tmp_path):
+    writer = EmbeddingCache(str(tmp_path), max_entries=1)
+    reader = EmbeddingCache(str(tmp_path), max_entries=1)
+    writer.put_many([("a", vector(1))], 4)
+    assert set(reader.get_many(["a"], 4)) == {"a"}
+
+    writer.put_many([("b", vector(2))], 4)
+
+    found = reader.get_many(["a", "b"], 4)
+    assert set(found) == {"b"}
+    np.testing.assert_array_equal(found["b"], vector(2))
@@ -0,0 +1,37 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "04_graph_rag+symantic_rag"))
+import entity_gazetteer
+from entity_gazetteer import EntityGazetteer
+
+
+class EntityGraph:
+    """Answers ENTITY_IDS_QUERY with whatever ids it currently holds."""
+
+    def __init__(self, ids):
+        self.ids = list(ids)
+
+    def query(self, query, params=None):
+        return [{"id": entity_id} for entity_id in self.ids]
+
+
+def test_extract_finds_names_and_corrects_typos():
+    gazetteer = EntityGazetteer(["Augustus", "Roman Empire"])
+    assert gazetteer.extract("When did agustus rule the Roman Empire?") == ["Augustus", "Roman Empire"]
+
+
+def test_refresh_replaces_the_automaton(monkeypatch):
+    epoch = [0]
+    monkeypatch.setattr(entity_gazetteer, "read_write_epoch", lambda: epoch[0])
+    monkeypatch.setattr(entity_gazetteer, "DEFAULT_EPOCH_CHECK_INTERVAL", 0)
+    kg = EntityGraph(["Augustus", "Nero"])
+    gazetteer = EntityGazetteer.from_graph(kg)
+    assert gazetteer.extract("Augustus and Nero") == ["Augustus", "Nero"]
+
+    kg.ids = ["Augustus", "Trajan"]
+    assert gazetteer.refresh(kg) is None  # epoch unchanged
+    epoch[0] = 1
+    assert gazetteer.refresh(kg) == 2
+    assert gazetteer.extract("Augustus, Nero and Trajan") == ["Augustus", "Trajan"]
+    assert len(gazetteer) == 2
@@ -0,0 +1,49 @@
+import csv
+import io
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "02_creating_knowledge_graph_using_csv"))
+from export_admin_import import CSV_PATH, MemoryDeduper, SpillingDeduper, export
+
+# Duplicate keys whose first occurrence is not the lexicographically smallest row
+ROWS = [
+    ["p2", "Zoe", "later bio"],
+    ["p1", "Ann", "first"],
+    ["p2", "Alice", "smaller but later"],
+    ["p3", "Bob", ""],
+    ["p1", "Aaron", "smaller but later"],
+    ["p4", "Cy", "x"],
+    ["p3", "Al", "y"],
+    ["p2", "Zed", "z"],
+]
+
+
+def deduplicate(deduper_class, rows, key_columns, **kwargs):
+    output = io.StringIO()
+    deduper = deduper_class(csv.writer(output), key_columns, **kwargs)
+    for row in rows:
+        deduper.add(row)
+    deduper.close()
+    return output.getvalue(), deduper.written
+
+
+def test_spilling_deduper_matches_memory_deduper(tmp_path):
+    expected = deduplicate(MemoryDeduper, ROWS, 1)
+    assert expected[1] == 4
+    for max_rows in (1, 2, 3, len(ROWS), 100):
+        assert deduplicate(SpillingDeduper, ROWS, 1, max_rows=max_rows, tmp_dir=str(tmp_path)) == expected
+
+
+def test_spilling_deduper_relationship_keys(tmp_path):
+    rows = [["a", "b"], ["a", "c"], ["a", "b"], ["b", "a"], ["a", "c"]]
+    expected = deduplicate(MemoryDeduper, rows, 2)
+    assert deduplicate(SpillingDeduper, rows, 2, max_rows=2, tmp_dir=str(tmp_path)) == expected
+
+
+def test_export_modes_write_identical_files(tmp_path):
+    memory_dir, spill_dir = tmp_path / "memory", tmp_path / "spill"
+    counts = export(CSV_PATH, str(memory_dir))
+    assert export(CSV_PATH, str(spill_dir), spill=True, spill_rows=7) == counts
+    for file_name in os.listdir(memory_dir):
+        assert (spill_dir / file_name).read_text(encoding="utf-8") == (memory_dir / file_name).read_text(encoding="utf-8")
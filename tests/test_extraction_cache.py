@@ -0,0 +1,61 @@
+import inspect
+import os
+import sys
+import warnings
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "04_graph_rag+symantic_rag"))
+from langchain_core.documents import Document
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_experimental.graph_transformers import LLMGraphTransformer
+
+from extraction_cache import ExtractionCache, transformer_config
+from fake_llm import FakeExtractionLLM
+
+CHUNK = Document(page_content="Augustus was the first emperor of Rome.")
+
+
+def key(tmp_path, llm=None, **transformer_kwargs):
+    cache = ExtractionCache.for_transformer(llm or FakeExtractionLLM(), str(tmp_path), **transformer_kwargs)
+    try:
+        return cache.key(CHUNK)
+    finally:
+        cache.close()
+
+
+def test_key_is_stable_for_the_same_settings(tmp_path):
+    settings = {"allowed_nodes": ["Person", "Place"], "allowed_relationships": [("Person", "RULED", "Place")]}
+
+    assert key(tmp_path, **settings) == key(tmp_path, **settings)
+    assert key(tmp_path) == key(tmp_path)
+
+
+def test_key_changes_with_each_setting(tmp_path):
+    prompt = ChatPromptTemplate.from_messages([("system", "Extract people only."), ("human", "{input}")])
+    keys = [
+        key(tmp_path),
+        key(tmp_path, allowed_nodes=["Person"]),
+        key(tmp_path, allowed_relationships=["RULED"]),
+        key(tmp_path, prompt=prompt),
+        key(tmp_path, additional_instructions="Ignore dates."),
+        key(tmp_path, node_properties=["born"]),
+        key(tmp_path, strict_mode=False),
+        key(tmp_path, ignore_tool_usage=True),
+    ]
+
+    assert len(set(keys)) == len(keys)
+
+
+def test_key_changes_with_the_chunk_text(tmp_path):
+    cache = ExtractionCache.for_transformer(FakeExtractionLLM(), str(tmp_path))
+
+    assert cache.key(CHUNK) != cache.key(Document(page_content="Tiberius succeeded Augustus."))
+
+
+def test_config_arguments_are_llm_graph_transformer_arguments():
+    # The key is only meaningful if the same arguments build the transformer
+    transformer_parameters = set(inspect.signature(LLMGraphTransformer.__init__).parameters)
+    config_parameters = set(inspect.signature(transformer_config).parameters)
+
+    assert config_parameters <= transformer_parameters
+    assert transformer_parameters - config_parameters == {"self", "llm"}
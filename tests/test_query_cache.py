@@ -0,0 +1,88 @@
+import os
+import sqlite3
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from query_cache import CachedGraph, bump_write_epoch, read_write_epoch
+
+
+class CountingGraph:
+    def __init__(self):
+        self.calls = []
+
+    def query(self, query, params=None, session_params=None):
+        self.calls.append((query, params, session_params))
+        return [{"calls": len(self.calls)}]
+
+
+def cached(tmp_path, **kwargs):
+    graph = CountingGraph()
+    kwargs.setdefault("epoch_check_interval", 0)
+    return graph, CachedGraph(graph, epoch_path=str(tmp_path / "epoch.sqlite"), **kwargs)
+
+
+def test_read_queries_are_cached_by_normalized_cypher(tmp_path):
+    graph, cache = cached(tmp_path)
+
+    first = cache.query("MATCH (n)  RETURN n")
+    second = cache.query("MATCH (n)\nRETURN n")
+
+    assert first == second
+    assert len(graph.calls) == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_parameters_and_session_parameters_are_part_of_the_key(tmp_path):
+    graph, cache = cached(tmp_path)
+
+    cache.query("MATCH (n {name: $name}) RETURN n", {"name": "a"})
+    cache.query("MATCH (n {name: $name}) RETURN n", {"name": "b"})
+    cache.query("MATCH (n {name: $name}) RETURN n", {"name": "b"}, {"database": "other"})
+
+    assert len(graph.calls) == 3
+
+
+def test_write_query_invalidates(tmp_path):
+    graph, cache = cached(tmp_path)
+    cache.query("MATCH (n) RETURN n")
+
+    cache.query("CREATE (n:Person {name: 'x'})")
+    cache.query("MATCH (n) RETURN n")
+
+    assert len(graph.calls) == 3
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_another_process_bumping_the_shared_epoch_invalidates(tmp_path):
+    graph, cache = cached(tmp_path)
+    cache.query("MATCH (n) RETURN n")
+    # What bump_write_epoch does in another process: only the shared file changes
+    with sqlite3.connect(cache.epoch_path) as db:
+        db.execute("UPDATE epoch SET value = value + 1 WHERE id = 0")
+
+    cache.query("MATCH (n) RETURN n")
+
+    assert len(graph.calls) == 2
+
+
+def test_epoch_is_only_moved_forward(tmp_path):
+    graph, cache = cached(tmp_path, epoch_check_interval=3600)
+    bump_write_epoch(cache.epoch_path)
+    cache.query("MATCH (n) RETURN n")
+    current = cache._epoch
+
+    # A check that read the epoch before the bump finishes late
+    cache._check_epoch((current[0] - 1, current[1] - 1))
+    cache.query("MATCH (n) RETURN n")
+
+    assert cache._epoch == current
+    assert len(graph.calls) == 1
+
+
+def test_shared_epoch_grows_with_every_bump(tmp_path):
+    path = str(tmp_path / "epoch.sqlite")
+    before = read_write_epoch(path)
+    bump_write_epoch(path)
+    bump_write_epoch(path)
+
+    assert read_write_epoch(path) == before + 2
@@ -0,0 +1,75 @@
+import os
+import sys
+
+import numpy as np
+from neo4j import Record
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "01_simple_knowledge_graph"))
+from result_streams import field_names, stream_columns, stream_records
+
+
+class FakeResult:
+    def __init__(self, keys, rows):
+        self._keys = list(keys)
+        self._records = [Record(zip(self._keys, row)) for row in rows]
+
+    def keys(self):
+        return self._keys
+
+    def __iter__(self):
+        return iter(self._records)
+
+
+class FakeSession:
+    def __init__(self, result):
+        self._result = result
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, parameters=None):
+        return self._result
+
+
+class FakeDriver:
+    def __init__(self, keys, rows):
+        self._result = FakeResult(keys, rows)
+
+    def session(self, **kwargs):
+        return FakeSession(self._result)
+
+
+def test_field_names_are_valid_attributes():
+    assert field_names(["n.name", "count(*)", "class", "1st", "n_name"]) == (
+        "n_name", "count", "f_class", "f_1st", "n_name_2",
+    )
+
+
+def test_slots_projection_accepts_unaliased_keys():
+    driver = FakeDriver(["n.name", "count(*)"], [("Marie Curie", 2), ("Pierre Curie", 1)])
+    records = list(stream_records("MATCH (n) RETURN n.name, count(*)", projection="slots", driver=driver))
+
+    assert [record.n_name for record in records] == ["Marie Curie", "Pierre Curie"]
+    assert [record.count for record in records] == [2, 1]
+    assert records[0]._keys == ("n.name", "count(*)")
+    assert tuple(records[0]) == ("Marie Curie", 2)
+
+
+def test_mixed_numpy_column_keeps_python_values():
+    driver = FakeDriver(["value"], [(1,), ("a",)])
+    (batch,) = stream_columns("RETURN value", driver=driver)
+
+    assert batch["value"].dtype == object
+    assert batch["value"].tolist() == [1, "a"]
+
+
+def test_uniform_numpy_columns_are_typed():
+    driver = FakeDriver(["count", "score", "name"], [(1, 0.5, "a"), (2, 1, "b")])
+    (batch,) = stream_columns("RETURN count, score, name", driver=driver)
+
+    assert batch["count"].dtype == np.int64
+    assert batch["score"].dtype == np.float64
+    assert batch["name"].dtype.kind == "U"
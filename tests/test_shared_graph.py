@@ -0,0 +1,52 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from shared_graph import SharedDriverGraph
+
+
+class FakeRecord:
+    def __init__(self, data):
+        self._data = data
+
+    def data(self):
+        return dict(self._data)
+
+
+class FakeDriver:
+    def __init__(self):
+        self.queries = []
+        self.closed = False
+
+    def execute_query(self, query, database_=None, parameters_=None):
+        self.queries.append((query.text, database_, parameters_))
+        return [FakeRecord({"answer": 42})], None, ["answer"]
+
+    def close(self):
+        self.closed = True
+
+
+def test_creating_the_graph_does_not_touch_the_driver():
+    driver = FakeDriver()
+    SharedDriverGraph(driver, refresh_schema=False)
+
+    assert driver.queries == []
+
+
+def test_queries_run_on_the_shared_driver():
+    driver = FakeDriver()
+    graph = SharedDriverGraph(driver, database="neo4j", refresh_schema=False)
+
+    assert graph.query("RETURN $x AS answer", {"x": 42}) == [{"answer": 42}]
+    assert driver.queries == [("RETURN $x AS answer", "neo4j", {"x": 42})]
+    assert graph.driver is driver
+
+
+def test_close_leaves_the_shared_driver_open():
+    driver = FakeDriver()
+    graph = SharedDriverGraph(driver, refresh_schema=False)
+
+    graph.close()
+    del graph
+
+    assert not driver.closed